@@ -12,15 +12,68 @@ Features:
 - Map folder hierarchy to tree structure
 - Visualize connections and structure
 - Validate links and detect issues
+- Read (and optionally parse) files in parallel on large or remote vaults
 """
 
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, Sequence, Set, Tuple, Optional
 from collections import defaultdict
 import json
 
+from vault_walker import IGNORE_FILES, walk_vault
+
+
+# Match [[link]] or [[link|display text]]
+LINK_PATTERN = re.compile(r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]')
+
+# Files per task sent to a parsing process
+PARSE_BATCH = 64
+
+
+def parse_links(content: str) -> List[str]:
+    """
+    Extract [[bracket]] style link targets from markdown text.
+    
+    Args:
+        content: Markdown text
+        
+    Returns:
+        Link targets in order of appearance, stripped and without .md
+    """
+    targets = []
+    for match in LINK_PATTERN.findall(content):
+        # Clean up the link
+        target = match.strip()
+        
+        # Normalize the target (remove .md if present, handle paths)
+        if target.endswith('.md'):
+            target = target[:-3]
+        targets.append(target)
+    return targets
+
+
+def _parse_batch(contents: List[str]) -> List[List[str]]:
+    """Link targets of several files (one task for a parsing process)."""
+    return [parse_links(content) for content in contents]
+
+
+def _read_text(path: Path) -> Tuple[str, Optional[Exception]]:
+    """Content of a file, or the error raised while reading it."""
+    try:
+        return path.read_text(encoding='utf-8'), None
+    except Exception as e:
+        return '', e
+
+
+def _read_links(path: Path) -> Tuple[List[str], Optional[Exception]]:
+    """Link targets of a file, or the error raised while reading it."""
+    content, error = _read_text(path)
+    return parse_links(content), error
+
 
 class MarkdownVault:
     """Represents a collection of markdown files with bracket-style links."""
@@ -37,32 +90,67 @@ class MarkdownVault:
         self.links: Dict[str, Set[str]] = defaultdict(set)  # source -> {targets}
         self.backlinks: Dict[str, Set[str]] = defaultdict(set)  # target -> {sources}
         self.folder_tree: Dict[str, List[str]] = defaultdict(list)  # folder -> [files]
+        self.stats: Dict[str, os.stat_result] = {}  # filename -> stat of the file
+        self.throughput: Dict[str, float] = {}  # measurements of the last scan
         
-    def scan(self, exclude_dirs: Optional[Set[str]] = None) -> None:
+    def scan(self, exclude_dirs: Optional[Set[str]] = None,
+             ignore_files: Sequence[str] = IGNORE_FILES,
+             jobs: Optional[int] = 1, processes: bool = False) -> None:
         """
         Scan the vault directory for markdown files and extract links.
         
+        Excluded and ignored directories are pruned before they are entered
+        (see vault_walker.walk_vault). With jobs other than 1, files are
+        read by a thread pool (scans of network filesystems wait on I/O,
+        not on the CPU); links are merged in walk order, so the result is
+        the same as a serial scan.
+        
         Args:
             exclude_dirs: Set of directory names to exclude (e.g., {'.git', 'node_modules'})
+            ignore_files: Ignore files to honor in every directory (empty to
+                          honor none)
+            jobs: Reader threads (None for the pool default, 1 to read
+                  inline)
+            processes: Also parse the links in a pool of jobs processes
+                       (for vaults of large files)
         """
         if exclude_dirs is None:
             exclude_dirs = {'.git', '.github', 'node_modules', '__pycache__'}
         
+        start = time.perf_counter()
+        found: List[Tuple[str, Path]] = []
+        
         # Find all markdown files
-        for md_file in self.root.rglob('*.md'):
-            if any(excluded in md_file.parts for excluded in exclude_dirs):
-                continue
-                
-            rel_path = md_file.relative_to(self.root)
+        for rel, entry in walk_vault(self.root, '.md', exclude_dirs, ignore_files):
+            md_file = Path(entry.path)
+            rel_path = Path(rel)
             file_key = self._path_to_key(rel_path)
             self.files[file_key] = md_file
+            # Stat data of the directory entry, no second system call
+            self.stats[file_key] = entry.stat()
             
             # Track folder structure
             folder = str(rel_path.parent) if rel_path.parent != Path('.') else ''
             self.folder_tree[folder].append(file_key)
-            
-            # Extract links from file
-            self._extract_links(file_key, md_file)
+            found.append((file_key, md_file))
+        
+        # Extract links from files
+        if jobs == 1 and not processes:
+            for file_key, md_file in found:
+                self._extract_links(file_key, md_file)
+        else:
+            self._extract_links_parallel(found, jobs, processes)
+        
+        elapsed = time.perf_counter() - start
+        size = sum(self.stats[file_key].st_size for file_key, _ in found)
+        self.throughput = {
+            'files': len(found),
+            'bytes': size,
+            'seconds': elapsed,
+            'files_per_sec': len(found) / elapsed if elapsed else 0.0,
+            'mb_per_sec': size / 1e6 / elapsed if elapsed else 0.0,
+            'jobs': jobs,
+        }
     
     def _path_to_key(self, path: Path) -> str:
         """Convert path to a standard key (without .md extension)."""
@@ -82,26 +170,62 @@ class MarkdownVault:
         """
         try:
             content = file_path.read_text(encoding='utf-8')
-            
-            # Match [[link]] or [[link|display text]]
-            pattern = r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]'
-            matches = re.findall(pattern, content)
-            
-            for match in matches:
-                # Clean up the link
-                target = match.strip()
-                
-                # Normalize the target (remove .md if present, handle paths)
-                if target.endswith('.md'):
-                    target = target[:-3]
-                
-                # Store link
-                self.links[source_key].add(target)
-                self.backlinks[target].add(source_key)
-                
+            self._add_links(source_key, parse_links(content))
         except Exception as e:
             print(f"Warning: Could not read {file_path}: {e}")
     
+    def _extract_links_parallel(self, found: List[Tuple[str, Path]],
+                                jobs: Optional[int], processes: bool) -> None:
+        """
+        Extract links from many files with reader threads (and parser processes).
+        
+        Args:
+            found: (key, path) of every file, in the order to merge them
+            jobs: Workers per pool (None for the pool default)
+            processes: Parse in worker processes instead of the reader threads
+        """
+        paths = [md_file for _, md_file in found]
+        with ThreadPoolExecutor(max_workers=jobs) as readers:
+            if not processes:
+                results = list(readers.map(_read_links, paths))
+            else:
+                # Batches go to the parsers while later files are still read
+                with ProcessPoolExecutor(max_workers=jobs) as parsers:
+                    batches = []
+                    errors: List[Optional[Exception]] = []
+                    contents: List[str] = []
+                    for content, error in readers.map(_read_text, paths):
+                        contents.append(content)
+                        errors.append(error)
+                        if len(contents) == PARSE_BATCH:
+                            batches.append(parsers.submit(_parse_batch, contents))
+                            contents = []
+                    if contents:
+                        batches.append(parsers.submit(_parse_batch, contents))
+                    parsed = [targets for batch in batches for targets in batch.result()]
+                results = list(zip(parsed, errors))
+        
+        # Merge in walk order, like a serial scan
+        for (file_key, md_file), (targets, error) in zip(found, results):
+            if error is not None:
+                print(f"Warning: Could not read {md_file}: {error}")
+            else:
+                self._add_links(file_key, targets)
+    
+    def _add_links(self, source_key: str, targets: List[str]) -> None:
+        """Store the links of a file and the matching backlinks."""
+        for target in targets:
+            self.links[source_key].add(target)
+            self.backlinks[target].add(source_key)
+    
+    def print_throughput(self, file=None) -> None:
+        """Print the file and byte rate of the last scan."""
+        t = self.throughput
+        if not t:
+            return
+        print(f"⏱️  Scanned {t['files']} files ({t['bytes'] / 1e6:.2f} MB) in {t['seconds']:.3f}s: "
+              f"{t['files_per_sec']:.0f} files/sec, {t['mb_per_sec']:.2f} MB/sec", file=file)
+    
     def get_broken_links(self) -> Dict[str, List[str]]:
         """
         Find broken links (links to non-existent files).
@@ -351,6 +475,29 @@ class MarkdownVault:
         return suggestions
 
 
+def add_scan_arguments(parser) -> None:
+    """Add the --jobs and --processes scan options to an argparse parser."""
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Threads reading files during the scan (default: 1, 0 for the pool default)'
+    )
+    parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Also parse links in --jobs worker processes'
+    )
+
+
+def scan_from_args(vault: MarkdownVault, args, file=None) -> None:
+    """Scan a vault with the options of add_scan_arguments and report throughput."""
+    if args.jobs < 0:
+        raise SystemExit("--jobs must not be negative")
+    vault.scan(jobs=args.jobs or None, processes=args.processes)
+    vault.print_throughput(file)
+
+
 def main():
     """CLI interface for the vault tool."""
     import argparse
@@ -399,13 +546,14 @@ def main():
         action='store_true',
         help='Suggest folder structure based on links'
     )
+    add_scan_arguments(parser)
     
     args = parser.parse_args()
     
     # Create and scan vault
     print(f"🔍 Scanning vault at: {args.path}")
     vault = MarkdownVault(args.path)
-    vault.scan()
+    scan_from_args(vault, args)
     
     # Default: show everything if no specific option selected
     show_all = not any([args.tree, args.stats, args.broken, args.orphaned, args.export, args.suggest])
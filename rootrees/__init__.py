@@ -0,0 +1,87 @@
+"""
+Enumeration, counting and representations of unlabeled rooted trees.
+
+Submodules, and the main functions and classes re-exported here, are only
+imported on first use, so ``import rootrees`` costs next to nothing:
+
+    import rootrees
+
+    rootrees.count_rooted_trees(20)                  # loads rootrees.optimized
+    for levels in rootrees.generate_level_sequences(8):
+        ...
+
+The command line interface is ``python3 -m rootrees`` (see rootrees.cli).
+"""
+
+import sys
+
+
+_SUBMODULES = (
+    'benchmark', 'bulkwrite', 'butcher', 'cli', 'deltastream', 'enumerator',
+    'forests', 'freetrees', 'functional', 'genstats', 'grafting', 'graycode',
+    'hopf', 'levelseq', 'optimized', 'patterns', 'planetrees', 'psystem',
+    'ranking', 'treemasks', 'treeparse', 'verify',
+)
+
+# name -> submodule that defines it
+_EXPORTS = {
+    'count_rooted_trees': 'optimized',
+    'generate_rooted_trees': 'optimized',
+    'tree_to_string': 'optimized',
+    'generate_level_sequences': 'levelseq',
+    'tree_to_level_sequence': 'levelseq',
+    'level_sequence_to_tree': 'levelseq',
+    'level_sequence_to_parents': 'levelseq',
+    'level_sequence_to_string': 'levelseq',
+    'canonical_form': 'levelseq',
+    'rank_tree': 'ranking',
+    'unrank_tree': 'ranking',
+    'random_tree': 'ranking',
+    'count_free_trees': 'freetrees',
+    'generate_free_trees': 'freetrees',
+    'parse_tree': 'treeparse',
+    'TreeParseError': 'treeparse',
+    'BulkTreeWriter': 'bulkwrite',
+    'DeltaStreamReader': 'deltastream',
+    'DeltaStreamWriter': 'deltastream',
+    'ForestEngine': 'forests',
+    'RootedTreeEnumerator': 'enumerator',
+    'EnumerationStats': 'genstats',
+    'TreeFunctional': 'functional',
+    'generate_gray_code': 'graycode',
+    'OrderConditions': 'butcher',
+    'check_order': 'butcher',
+    'HopfEngine': 'hopf',
+    'GraftingEngine': 'grafting',
+    'graft': 'grafting',
+    'PSystem': 'psystem',
+    'tree_masks': 'treemasks',
+    'bucket_plane_trees': 'planetrees',
+    'generate_dyck_words': 'planetrees',
+    'PatternCounter': 'patterns',
+    'count_pattern': 'patterns',
+    'count_patterns': 'patterns',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def _submodule(name):
+    # __import__ rather than importlib, which would add to the import time
+    qualified = f"{__name__}.{name}"
+    __import__(qualified)
+    return sys.modules[qualified]
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return _submodule(name)
+    if name in _EXPORTS:
+        value = getattr(_submodule(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
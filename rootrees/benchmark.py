@@ -1,81 +1,505 @@
+#!/usr/bin/env python3
 """
-Benchmark script to compare different rooted tree implementations.
+Benchmark harness comparing the rooted tree implementations.
 
-Compares performance and correctness of various algorithms.
+Every (implementation, n) case runs in its own Python subprocess, so caches,
+module-global state (such as the treeid dict of list-rooted-trees.py) and
+memory from one case cannot affect another.  Inside the worker each case is
+warmed up, then timed over several repetitions; a repetition loops the case
+until it has run for at least --min-time seconds, like timeit.
+
+Results are throughput in trees per second (a(n) / seconds per run),
+reported as median and interquartile range, and written as JSON:
+
+    {
+      "schema": 1,
+      "python": "3.12.1", "platform": "...", "timestamp": "...",
+      "settings": {"warmup": 1, "repeat": 7, "min_time": 0.05},
+      "cases": [
+        {"case": "levelseq", "n": 12, "trees": 4766, "ok": true,
+         "loops": 12, "times": [...], "median_s": ..., "iqr_s": ...,
+         "trees_per_sec": ..., "trees_per_sec_iqr": ...}
+      ]
+    }
+
+With --memory each case instead runs once with memory accounting, and the
+"cases" entries carry memory fields ("settings" has "mode": "memory"):
+
+        {"case": "original", "n": 12, "trees": 4766, "ok": true,
+         "tracemalloc_peak_bytes": ..., "rss_peak_bytes": ...,
+         "rss_before_bytes": ..., "bytes_per_tree": ...,
+         "treeid_entries": ...}
+
+The tracemalloc peak counts the Python objects allocated by the run itself;
+the RSS high-water mark is measured on a separate run without tracemalloc
+and includes the interpreter.  "treeid_entries" is the size of the
+implementation's tree id or memo table after the run (null when it has none
+or it is not reachable from outside).
+
+With --baseline the run is compared against an earlier JSON file and the
+exit status is 1 if any case lost more than --max-regression percent of its
+median throughput, or in memory mode grew its tracemalloc peak by more than
+that.  A baseline of the other mode (time vs memory), or one that shares
+no case with the run, is an error too, so a comparison never passes
+without comparing anything.
+
+Usage:
+    python3 -m rootrees.benchmark --json results.json
+    python3 -m rootrees.benchmark --baseline results.json --max-regression 15
+    python3 -m rootrees.benchmark --memory --sizes 10 12 14 --json memory.json
 """
 
-import time
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
 import sys
+import time
+import tracemalloc
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
-def benchmark_count(func, name, max_n=15):
-    """Benchmark a tree counting function."""
-    print(f"\n{name}")
-    print("-" * 60)
-    print(f"{'n':<5} {'count':<10} {'time (ms)':<15} {'per tree (μs)':<15}")
-    print("-" * 60)
-    
-    for n in range(1, max_n + 1):
-        start = time.perf_counter()
-        count = func(n)
-        elapsed = time.perf_counter() - start
-        
-        elapsed_ms = elapsed * 1000
-        per_tree_us = (elapsed / count * 1000000) if count > 0 else 0
-        
-        print(f"{n:<5} {count:<10} {elapsed_ms:<15.3f} {per_tree_us:<15.3f}")
-    
-    print("-" * 60)
-
-
-def benchmark_generate(func, name, max_n=10):
-    """Benchmark a tree generation function."""
-    print(f"\n{name}")
-    print("-" * 60)
-    print(f"{'n':<5} {'count':<10} {'time (ms)':<15} {'per tree (μs)':<15}")
-    print("-" * 60)
-    
-    for n in range(1, max_n + 1):
+
+SCHEMA_VERSION = 1
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = (8, 10, 12)
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_MAX_REGRESSION = 10.0
+
+
+def _load_script(filename):
+    """
+    Load a fresh copy of one of the standalone scripts in this directory, so
+    module-global state (treeid) is not shared with other imports of it.
+    """
+    path = os.path.join(HERE, filename)
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Case setups: each takes n and returns (run, cache_entries).  run is a
+# zero-argument callable that enumerates (or counts) the trees from a fresh
+# state and returns a(n); cache_entries reports the size of the tree id or
+# memo table after a run, or is None when there is none to observe.
+
+def _setup_optimized_count(n):
+    from . import optimized as module
+
+    def run():
+        module.count_rooted_trees.cache_clear()
+        return module.count_rooted_trees(n)
+    return run, lambda: module.count_rooted_trees.cache_info().currsize
+
+
+def _setup_optimized(n):
+    from . import optimized as module
+
+    def cache_entries():
+        # treeid is local to generate_rooted_trees; an instrumented run reports it
+        from .genstats import EnumerationStats
+        stats = EnumerationStats()
+        for _ in module.generate_rooted_trees(n, stats=stats):
+            pass
+        return stats.levels[n].treeid_size
+    return lambda: sum(1 for _ in module.generate_rooted_trees(n)), cache_entries
+
+
+def _setup_original(n):
+    module = _load_script('list-rooted-trees.py')
+
+    def run():
+        module.treeid = {(): 0}
+        return sum(1 for _ in module.trees(n))
+    return run, lambda: len(module.treeid)
+
+
+def _setup_bags(n):
+    module = _load_script('list-rooted-trees-1.py')
+    return lambda: len(module.bags(n)), None
+
+
+def _setup_original_2(n):
+    module = _load_script('list-rooted-trees-2.py')
+
+    def run():
+        module.treeid = {(): 0}
+        return sum(1 for _ in module.trees(n))
+    return run, lambda: len(module.treeid)
+
+
+def _setup_levelseq(n):
+    from .levelseq import generate_level_sequences
+    return lambda: sum(1 for _ in generate_level_sequences(n)), None
+
+
+def _setup_forests(n):
+    from .forests import ForestEngine
+    state = {}
+
+    def run():
+        state['engine'] = ForestEngine()
+        return sum(1 for _ in state['engine'].trees(n, 'ids'))
+    return run, lambda: len(state['engine'].sizes)
+
+
+def _setup_enumerator(n):
+    from .enumerator import RootedTreeEnumerator
+    state = {}
+
+    def run():
+        state['enumerator'] = RootedTreeEnumerator()
+        return sum(1 for _ in state['enumerator'].trees(n))
+
+    def cache_entries():
+        enumerator = state['enumerator']
+        return sum(enumerator.count(k) for k in enumerator.cache_info().levels)
+    return run, cache_entries
+
+
+# name -> (description, setup)
+CASES = {
+    'optimized-count': ("count_rooted_trees, Euler transform (cache cleared)", _setup_optimized_count),
+    'optimized': ("generate_rooted_trees in optimized.py", _setup_optimized),
+    'original': ("trees() in list-rooted-trees.py", _setup_original),
+    'bags': ("bags() in list-rooted-trees-1.py", _setup_bags),
+    'original-2': ("trees() in list-rooted-trees-2.py", _setup_original_2),
+    'levelseq': ("Beyer-Hedetniemi level sequences", _setup_levelseq),
+    'forests': ("ForestEngine tree ids", _setup_forests),
+    'enumerator': ("RootedTreeEnumerator, fresh cache", _setup_enumerator),
+}
+
+
+def summarize(values):
+    """Return (median, interquartile range) of a list of numbers."""
+    if len(values) < 2:
+        return (values[0] if values else 0.0), 0.0
+    q1, median, q3 = statistics.quantiles(values, n=4, method='inclusive')
+    return median, q3 - q1
+
+
+def _expected_count(n):
+    from .optimized import count_rooted_trees
+    return count_rooted_trees(n)
+
+
+def _max_rss():
+    """RSS high-water mark of this process in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure_memory(case, n):
+    """
+    Measure the memory use of one case in the current process.
+
+    Run this in a fresh process (see run_isolated): the RSS high-water mark
+    cannot be reset, so earlier work in the same process would hide it.
+
+    Args:
+        case: Name from CASES
+        n: Tree size
+
+    Returns:
+        Result dict with the memory fields of the JSON "cases" list
+    """
+    expected = _expected_count(n)
+    run, cache_entries = CASES[case][1](n)
+
+    rss_before = _max_rss()
+    trees = run()
+    rss_peak = _max_rss()
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'case': case,
+        'n': n,
+        'trees': trees,
+        'ok': trees == expected,
+        'tracemalloc_peak_bytes': peak,
+        'rss_peak_bytes': rss_peak,
+        'rss_before_bytes': rss_before,
+        'bytes_per_tree': peak / trees if trees else 0.0,
+        'treeid_entries': cache_entries() if cache_entries else None,
+    }
+
+
+def run_case(case, n, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT,
+             min_time=DEFAULT_MIN_TIME):
+    """
+    Time one case in the current process.
+
+    Args:
+        case: Name from CASES
+        n: Tree size
+        warmup: Untimed runs before measuring
+        repeat: Timed repetitions
+        min_time: Minimum seconds per repetition (the case is looped)
+
+    Returns:
+        Result dict as stored in the JSON "cases" list
+    """
+    expected = _expected_count(n)
+    run, _ = CASES[case][1](n)
+    trees = None
+    for _ in range(warmup):
+        trees = run()
+
+    # Calibrate the number of loops per repetition
+    start = time.perf_counter()
+    trees = run()
+    single = time.perf_counter() - start
+    loops = max(1, int(min_time / single) + 1) if single < min_time else 1
+
+    times = []
+    for _ in range(repeat):
         start = time.perf_counter()
-        trees = list(func(n))
-        elapsed = time.perf_counter() - start
-        count = len(trees)
-        
-        elapsed_ms = elapsed * 1000
-        per_tree_us = (elapsed / count * 1000000) if count > 0 else 0
-        
-        print(f"{n:<5} {count:<10} {elapsed_ms:<15.3f} {per_tree_us:<15.3f}")
-    
-    print("-" * 60)
+        for _ in range(loops):
+            run()
+        times.append((time.perf_counter() - start) / loops)
+
+    median_s, iqr_s = summarize(times)
+    rates = [expected / t for t in times if t > 0]
+    rate, rate_iqr = summarize(rates)
+    return {
+        'case': case,
+        'n': n,
+        'trees': trees,
+        'ok': trees == expected,
+        'loops': loops,
+        'times': times,
+        'median_s': median_s,
+        'iqr_s': iqr_s,
+        'trees_per_sec': rate,
+        'trees_per_sec_iqr': rate_iqr,
+    }
+
+
+def run_isolated(case, n, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT,
+                 min_time=DEFAULT_MIN_TIME, timeout=None, memory=False):
+    """
+    Time (or with memory=True, measure the memory of) one case in a fresh
+    Python subprocess.
+
+    Returns:
+        Result dict; on failure {'case', 'n', 'ok': False, 'error': ...}
+    """
+    command = [sys.executable, '-m', f'{__package__}.benchmark', '--worker', case, str(n),
+               '--warmup', str(warmup), '--repeat', str(repeat),
+               '--min-time', str(min_time)]
+    if memory:
+        command.append('--memory')
+    try:
+        proc = subprocess.run(command, cwd=os.path.dirname(HERE), capture_output=True,
+                              text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'case': case, 'n': n, 'ok': False, 'error': f"timed out after {timeout}s"}
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'case': case, 'n': n, 'ok': False,
+                'error': lines[-1] if lines else f"exit status {proc.returncode}"}
+    return json.loads(proc.stdout)
+
+
+def run_suite(cases, sizes, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT,
+              min_time=DEFAULT_MIN_TIME, timeout=None, progress=None, memory=False):
+    """
+    Run every case for every size, each in its own subprocess.
+
+    Args:
+        cases: Case names from CASES
+        sizes: Tree sizes
+        progress: Optional callable receiving each result as it finishes
+        memory: Measure memory instead of time
+
+    Returns:
+        Report dict in the JSON schema described in the module docstring
+    """
+    results = []
+    for case in cases:
+        for n in sizes:
+            result = run_isolated(case, n, warmup, repeat, min_time, timeout, memory)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'schema': SCHEMA_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {'mode': 'memory' if memory else 'time',
+                     'warmup': warmup, 'repeat': repeat, 'min_time': min_time},
+        'cases': results,
+    }
+
+
+def compare_to_baseline(report, baseline, max_regression=DEFAULT_MAX_REGRESSION):
+    """
+    Compare against a baseline report.
+
+    Timing reports compare median throughput (a drop is a regression),
+    memory reports the tracemalloc peak (a rise is a regression).  Cases are
+    matched by (case, n); cases missing from either side, lacking the metric
+    or that failed are skipped.
+
+    Args:
+        report: Current report dict
+        baseline: Baseline report dict
+        max_regression: Allowed change for the worse, in percent
+
+    Returns:
+        List of (case, n, baseline value, current value, change in percent,
+        regressed) tuples
+
+    Raises:
+        ValueError: If one report measures time and the other memory
+    """
+    mode = report.get('settings', {}).get('mode', 'time')
+    baseline_mode = baseline.get('settings', {}).get('mode', 'time')
+    if mode != baseline_mode:
+        raise ValueError(f"cannot compare a {mode} run with a {baseline_mode} baseline")
+    memory = mode == 'memory'
+    metric = 'tracemalloc_peak_bytes' if memory else 'trees_per_sec'
+    previous = {(r['case'], r['n']): r for r in baseline.get('cases', [])
+                if r.get('ok') and metric in r}
+    rows = []
+    for result in report['cases']:
+        old = previous.get((result['case'], result['n']))
+        if old is None or not result.get('ok'):
+            continue
+        before, after = old[metric], result[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        worse = change > max_regression if memory else change < -max_regression
+        rows.append((result['case'], result['n'], before, after, change, worse))
+    return rows
+
+
+def format_result(result):
+    """One table row for a result dict."""
+    if not result.get('ok'):
+        problem = result.get('error') or f"wrong count {result.get('trees')}"
+        return f"{result['case']:<16} {result['n']:>3}  FAILED: {problem}"
+    if 'tracemalloc_peak_bytes' in result:
+        rss = result['rss_peak_bytes']
+        entries = result['treeid_entries']
+        return (f"{result['case']:<16} {result['n']:>3} {result['trees']:>10} "
+                f"{result['tracemalloc_peak_bytes'] / 1024:>11,.1f} "
+                f"{(rss / 1048576 if rss else 0):>10.1f} {result['bytes_per_tree']:>10.1f} "
+                f"{'-' if entries is None else entries:>10}")
+    return (f"{result['case']:<16} {result['n']:>3} {result['trees']:>10} "
+            f"{result['median_s'] * 1000:>11.3f} {result['trees_per_sec']:>14,.0f} "
+            f"{result['trees_per_sec_iqr']:>12,.0f}")
+
+
+def main(argv=None, prog=None):
+    """Command line interface; returns the exit status."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Benchmark all rooted tree implementations in isolated subprocesses'
+    )
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES),
+                        help='Implementations to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='Tree sizes (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help='Untimed runs per case (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Timed repetitions per case (default: %(default)s)')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help='Minimum seconds per repetition (default: %(default)s)')
+    parser.add_argument('--timeout', type=float,
+                        help='Seconds before a case is abandoned')
+    parser.add_argument('--json', metavar='PATH',
+                        help='Write the results as JSON to PATH')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='Compare against a previous JSON report')
+    parser.add_argument('--max-regression', type=float, default=DEFAULT_MAX_REGRESSION,
+                        help='Fail if throughput drops by more than this many percent '
+                             '(default: %(default)s)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Measure tracemalloc peak, RSS high-water mark, bytes per '
+                             'tree and id table size instead of time')
+    parser.add_argument('--worker', nargs=2, metavar=('CASE', 'N'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        case, n = args.worker[0], int(args.worker[1])
+        if args.memory:
+            result = measure_memory(case, n)
+        else:
+            result = run_case(case, n, args.warmup, args.repeat, args.min_time)
+        json.dump(result, sys.stdout)
+        return 0
+
+    if args.memory:
+        print(f"{'case':<16} {'n':>3} {'trees':>10} {'peak (KiB)':>11} "
+              f"{'RSS (MiB)':>10} {'B/tree':>10} {'treeid':>10}")
+    else:
+        print(f"{'case':<16} {'n':>3} {'trees':>10} {'median (ms)':>11} "
+              f"{'trees/sec':>14} {'IQR':>12}")
+    print("-" * 72)
+    report = run_suite(args.cases, args.sizes, args.warmup, args.repeat,
+                       args.min_time, args.timeout,
+                       progress=lambda result: print(format_result(result), flush=True),
+                       memory=args.memory)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    failed = [r for r in report['cases'] if not r.get('ok')]
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.baseline} (max regression {args.max_regression}%):")
+        try:
+            rows = compare_to_baseline(report, baseline, args.max_regression)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        if not rows:
+            print("Error: no case of this run is in the baseline, nothing was compared",
+                  file=sys.stderr)
+            return 1
+        skipped = sum(1 for r in report['cases'] if r.get('ok')) - len(rows)
+        if skipped:
+            print(f"Warning: {skipped} case(s) not in the baseline were not compared",
+                  file=sys.stderr)
+        for case, n, before, after, change, bad in rows:
+            flag = "  REGRESSION" if bad else ""
+            print(f"{case:<16} {n:>3} {before:>14,.0f} -> {after:>14,.0f} "
+                  f"({change:+.1f}%){flag}")
+            if bad:
+                regressed.append((case, n))
+
+    if failed or regressed:
+        print(f"\n{len(failed)} failed case(s), {len(regressed)} regression(s)")
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    # Import the optimized version
-    sys.path.insert(0, '.')
-    exec(open('list-rooted-trees-optimized.py').read())
-    
-    print("=" * 60)
-    print("ROOTED TREE ALGORITHM BENCHMARKS")
-    print("=" * 60)
-    
-    # Benchmark counting
-    print("\n\n### COUNTING BENCHMARKS ###")
-    benchmark_count(count_rooted_trees, "Optimized Count (Euler Transform with Memoization)", max_n=20)
-    
-    # Benchmark generation
-    print("\n\n### GENERATION BENCHMARKS ###")
-    benchmark_generate(generate_rooted_trees, "Optimized Generation (Successor-based)", max_n=8)
-    
-    print("\n\n" + "=" * 60)
-    print("PERFORMANCE SUMMARY")
-    print("=" * 60)
-    print("\nThe optimized implementation uses:")
-    print("1. Euler transform with divisor-based recurrence (O(n²) for counting)")
-    print("2. LRU cache for memoization (avoids redundant computation)")
-    print("3. Successor-based generation (canonical ordering, no duplicates)")
-    print("4. Efficient divisor generation (O(√n) per divisor call)")
-    print("\nKey benefits:")
-    print("- Fast counting without generation (can compute a(20) quickly)")
-    print("- Efficient generation with automatic duplicate elimination")
-    print("- Memory-efficient through proper caching strategy")
-    print("=" * 60)
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+High-throughput bulk text output for rooted trees.
+
+Trees are rendered straight from level sequences using precomputed
+translation tables: the text emitted between node i-1 and node i depends
+only on their two depths, so every (previous depth, depth) pair maps to a
+fixed byte string.  The text for a prefix of a level sequence is also a
+prefix of the output, so when consecutive trees share a prefix (as they do
+in generation order) only the differing suffix is re-rendered.
+
+Output goes through one large bytearray that is handed to a binary stream in
+big chunks, instead of one print() per tree.
+
+Formats:
+    parens    (()(()))
+    brackets  ([][{}])   - bracket type cycles with depth, as tree_to_string
+    levels    0 1 1 2    - the level sequence itself
+"""
+
+import sys
+
+from .levelseq import tree_to_level_sequence
+
+
+FORMATS = ('parens', 'brackets', 'levels')
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+class _Tables:
+    """Translation tables for one output format."""
+
+    def __init__(self, style):
+        if style not in FORMATS:
+            raise ValueError(f"Unknown format: {style}")
+        self.style = style
+        # steps[a][b]: text between a node at depth a and a next node at depth b
+        self.steps = []
+        # tails[a]: text closing a tree whose last node is at depth a
+        self.tails = []
+        self.first = b"0" if style == 'levels' else b"("
+
+    def _open(self, depth):
+        if self.style == 'levels':
+            return b" %d" % depth
+        if self.style == 'brackets':
+            return b"([{"[depth % 3:depth % 3 + 1]
+        return b"("
+
+    def _close(self, depth):
+        if self.style == 'levels':
+            return b""
+        if self.style == 'brackets':
+            return b")]}"[depth % 3:depth % 3 + 1]
+        return b")"
+
+    def grow(self, max_depth):
+        """Extend the tables to cover depths up to max_depth."""
+        for a in range(len(self.steps), max_depth + 1):
+            row = []
+            closing = b""
+            for b in range(a, -1, -1):
+                closing += self._close(b)
+                row.append(closing + self._open(b))
+            row.reverse()
+            row.append(self._open(a + 1))
+            self.steps.append(row)
+            self.tails.append(closing + b"\n")
+
+
+class BulkTreeWriter:
+    """
+    Buffered writer rendering level sequences as text lines.
+
+    Example:
+        with BulkTreeWriter(sys.stdout.buffer, 'brackets') as writer:
+            writer.writemany(generate_level_sequences(12))
+    """
+
+    def __init__(self, stream, style='parens', buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Args:
+            stream: Writable binary file object
+            style: One of FORMATS
+            buffer_size: Bytes to accumulate before each write to the stream
+        """
+        self.stream = stream
+        self.style = style
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._tables = _Tables(style)
+        self._out = bytearray()
+        # Rendering of the previous tree without its tail, and the end
+        # offset of each node's text within it
+        self._text = bytearray()
+        self._ends = []
+
+    def write(self, levels):
+        """Render one tree given as a level sequence."""
+        self.writemany((levels,))
+
+    def write_tree(self, tree):
+        """Render one tree given as nested tuples."""
+        self.writemany((tree_to_level_sequence(tree),))
+
+    def write_trees(self, trees):
+        """Render every nested-tuple tree from an iterable."""
+        self.writemany(map(tree_to_level_sequence, trees))
+
+    def writemany(self, sequences):
+        """
+        Render every level sequence from an iterable.
+
+        Each tree is rendered in full with one table lookup per node; use
+        write_changes() when the shared prefix lengths are known.
+
+        Args:
+            sequences: Iterable of level sequences (tuples or lists of depths)
+        """
+        tables = self._tables
+        first = tables.first
+        out = self._out
+        limit = self.buffer_size
+        join = b"".join
+        count = 0
+
+        for levels in sequences:
+            try:
+                steps = tables.steps
+                line = first + join([steps[a][b] for a, b in zip(levels, levels[1:])])
+                line += tables.tails[levels[-1]]
+            except IndexError:
+                if not levels:
+                    raise ValueError("Cannot render an empty level sequence")
+                tables.grow(max(levels))
+                steps = tables.steps
+                line = first + join([steps[a][b] for a, b in zip(levels, levels[1:])])
+                line += tables.tails[levels[-1]]
+            out += line
+            count += 1
+            if len(out) >= limit:
+                self.stream.write(out)
+                del out[:]
+
+        # The incremental renderer cannot reuse a prefix it has not seen
+        del self._ends[:]
+        self.count += count
+
+    def write_changes(self, changes):
+        """
+        Render trees given as (shared prefix length, level sequence) pairs.
+
+        The prefix length says how many leading depths agree with the
+        previous tree, as yielded by generate_level_sequence_changes(); it
+        may underestimate but must not overestimate.
+
+        Args:
+            changes: Iterable of (prefix length, level sequence) pairs
+        """
+        tables = self._tables
+        steps = tables.steps
+        tails = tables.tails
+        first = tables.first
+        text = self._text
+        ends = self._ends
+        out = self._out
+        limit = self.buffer_size
+        count = 0
+
+        for k, levels in changes:
+            n = len(levels)
+            if not n:
+                raise ValueError("Cannot render an empty level sequence")
+            if k == 0 or not ends:
+                del text[:]
+                del ends[:]
+                text += first
+                ends.append(len(text))
+                k = 1
+            else:
+                k = min(k, n)
+                del text[ends[k - 1]:]
+                del ends[k:]
+
+            depth = levels[k - 1]
+            for i in range(k, n):
+                nxt = levels[i]
+                if depth >= len(steps):
+                    tables.grow(depth)
+                text += steps[depth][nxt]
+                ends.append(len(text))
+                depth = nxt
+            if depth >= len(tails):
+                tables.grow(depth)
+
+            out += text
+            out += tails[depth]
+            count += 1
+            if len(out) >= limit:
+                self.stream.write(out)
+                del out[:]
+
+        self.count += count
+
+    def flush(self):
+        """Hand all buffered output to the stream."""
+        if self._out:
+            self.stream.write(self._out)
+            del self._out[:]
+        if hasattr(self.stream, 'flush'):
+            self.stream.flush()
+
+    def close(self):
+        """Flush remaining output (the stream itself is left open)."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_level_sequences(sequences, stream=None, style='parens',
+                          buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Render level sequences to a binary stream in one buffered pass.
+
+    Args:
+        sequences: Iterable of level sequences
+        stream: Writable binary file object (default: sys.stdout.buffer)
+        style: One of FORMATS
+        buffer_size: Bytes to accumulate before each write
+
+    Returns:
+        Number of trees written
+    """
+    if stream is None:
+        stream = sys.stdout.buffer
+    with BulkTreeWriter(stream, style, buffer_size) as writer:
+        writer.writemany(sequences)
+    return writer.count
+
+
+if __name__ == '__main__':
+    import argparse
+    from .levelseq import generate_level_sequence_changes
+
+    parser = argparse.ArgumentParser(
+        description='Write all rooted trees with n nodes in bulk'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--format', choices=FORMATS, default='parens',
+                        help='Output format (default: parens)')
+    args = parser.parse_args()
+
+    with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+        writer.write_changes(generate_level_sequence_changes(args.n))
+    count = writer.count
+    print(f"Number of {args.n}-trees: {count}", file=sys.stderr)
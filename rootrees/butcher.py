@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Runge-Kutta order conditions over all rooted trees (Butcher series).
+
+A Runge-Kutta method (A, b, c) has order p when its elementary weights
+match the exact solution for every rooted tree with at most p nodes:
+
+    Phi(t) = 1 / gamma(t)
+
+With stage vectors Psi(leaf) = 1 and Psi([t1, ..., tm]) = prod_i A Psi(ti)
+(elementwise product), the elementary weight is Phi(t) = b . Psi(t).  The
+density gamma(t) = |t| prod_i gamma(ti) and symmetry
+sigma(t) = prod_i sigma(ti)^k_i k_i! follow the same recursion.
+
+Every tree other than the leaf is the Butcher product t = u o v: v (its
+last child) grafted onto the root of u (the tree without that child), so
+
+    Psi(t)   = (A Psi(v)) * Psi(u)
+    gamma(t) = |t| gamma(u) gamma(v) / |u|
+    sigma(t) = sigma(u) sigma(v) k        (k: copies of v among t's children)
+
+Trees are numbered by the forest engine, so every subtree is stored once and
+each size class is one vectorized gather-multiply plus one matrix product
+with A.  Several tableaus can be checked at once by stacking them.
+
+Requires NumPy.
+"""
+
+import sys
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+from .forests import ForestEngine
+
+
+DEFAULT_TOLERANCE = 1e-10
+
+# Classic explicit methods: name -> (A, b, c)
+TABLEAUS = {
+    'euler': ([[0]], [1], [0]),
+    'midpoint': ([[0, 0], [Fraction(1, 2), 0]], [0, 1], [0, Fraction(1, 2)]),
+    'heun': ([[0, 0], [1, 0]], [Fraction(1, 2), Fraction(1, 2)], [0, 1]),
+    'ralston': ([[0, 0], [Fraction(2, 3), 0]], [Fraction(1, 4), Fraction(3, 4)],
+                [0, Fraction(2, 3)]),
+    'kutta3': ([[0, 0, 0], [Fraction(1, 2), 0, 0], [-1, 2, 0]],
+               [Fraction(1, 6), Fraction(2, 3), Fraction(1, 6)], [0, Fraction(1, 2), 1]),
+    'rk4': ([[0, 0, 0, 0], [Fraction(1, 2), 0, 0, 0], [0, Fraction(1, 2), 0, 0], [0, 0, 1, 0]],
+            [Fraction(1, 6), Fraction(1, 3), Fraction(1, 3), Fraction(1, 6)],
+            [0, Fraction(1, 2), Fraction(1, 2), 1]),
+    '3/8': ([[0, 0, 0, 0], [Fraction(1, 3), 0, 0, 0], [Fraction(-1, 3), 1, 0, 0], [1, -1, 1, 0]],
+            [Fraction(1, 8), Fraction(3, 8), Fraction(3, 8), Fraction(1, 8)],
+            [0, Fraction(1, 3), Fraction(2, 3), 1]),
+}
+
+
+class OrderConditions:
+    """
+    All rooted trees with up to max_order nodes and their Butcher data.
+
+    Attributes:
+        max_order: Largest tree size covered
+        sizes, gamma, sigma: Arrays indexed by tree id
+        left, right, copies: Butcher product decomposition t = left o right,
+                             with copies of right among t's children
+        size_end: size_end[k] is the first id of a tree with more than k nodes
+
+    Example:
+        conditions = OrderConditions(6)
+        conditions.order(*TABLEAUS['rk4'][:2])    # 4
+    """
+
+    def __init__(self, max_order):
+        if max_order < 1:
+            raise ValueError(f"max_order must be positive, got {max_order}")
+        self.max_order = max_order
+        self._engine = engine = ForestEngine()
+        engine.build_trees(max_order)
+        self.size_end = np.array(engine.size_end[:max_order + 1])
+        count = int(self.size_end[max_order])
+
+        tree_id = {engine.children[i]: i for i in range(count)}
+        left = np.zeros(count, dtype=np.intp)
+        right = np.zeros(count, dtype=np.intp)
+        copies = np.zeros(count, dtype=np.int64)
+        for i in range(1, count):
+            children = engine.children[i]
+            last = children[-1]
+            left[i] = tree_id[children[:-1]]
+            right[i] = last
+            copies[i] = children.count(last)
+        self.left, self.right, self.copies = left, right, copies
+
+        # gamma(t) <= |t|! fits in int64 up to 20 nodes
+        dtype = np.int64 if max_order <= 20 else object
+        self.sizes = np.array(engine.sizes[:count], dtype=dtype)
+        self.gamma = np.ones(count, dtype=dtype)
+        self.sigma = np.ones(count, dtype=dtype)
+        for lo, hi in self._levels():
+            u, v = left[lo:hi], right[lo:hi]
+            self.gamma[lo:hi] = (self.gamma[u] // self.sizes[u]) * self.gamma[v] * self.sizes[lo:hi]
+            self.sigma[lo:hi] = self.sigma[u] * self.sigma[v] * copies[lo:hi].astype(dtype)
+
+    def __len__(self):
+        return int(self.size_end[self.max_order])
+
+    def _levels(self):
+        """(first id, end id) of each size class from 2 to max_order."""
+        for k in range(2, self.max_order + 1):
+            yield int(self.size_end[k - 1]), int(self.size_end[k])
+
+    def tree(self, tree_id, view='parens'):
+        """Return a tree by id as nested tuple ('tuple') or string ('parens')."""
+        return self._engine.tree(tree_id, view)
+
+    def elementary_weights(self, A, b, c=None):
+        """
+        Elementary weights Phi(t) of one or several tableaus for every tree.
+
+        Args:
+            A: Stage matrix, shape (s, s), or (k, s, s) for k tableaus
+            b: Weights, shape (s,) or (k, s)
+            c: Optional nodes; must equal the row sums of A
+
+        Returns:
+            Float array of shape (len(self),) or (k, len(self))
+
+        Raises:
+            ValueError: On mismatched shapes or if c is not A @ 1
+        """
+        A = np.asarray(A, dtype=float)
+        b = np.asarray(b, dtype=float)
+        if A.shape[-1] != A.shape[-2] or b.shape != A.shape[:-1]:
+            raise ValueError(f"shapes of A {A.shape} and b {b.shape} do not match")
+        row_sums = A.sum(axis=-1)
+        if c is not None and not np.allclose(np.asarray(c, dtype=float), row_sums):
+            raise ValueError("c must equal the row sums of A")
+
+        stages = A.shape[-1]
+        batch = A.shape[:-2]
+        psi = np.empty(batch + (len(self), stages))
+        a_psi = np.empty_like(psi)
+        psi[..., 0, :] = 1.0
+        a_psi[..., 0, :] = row_sums
+        a_t = np.swapaxes(A, -1, -2)
+        for lo, hi in self._levels():
+            psi[..., lo:hi, :] = a_psi[..., self.right[lo:hi], :] * psi[..., self.left[lo:hi], :]
+            a_psi[..., lo:hi, :] = psi[..., lo:hi, :] @ a_t
+        return np.einsum('...ns,...s->...n', psi, b)
+
+    def residuals(self, A, b, c=None):
+        """Phi(t) - 1/gamma(t) for every tree (zero where the condition holds)."""
+        return self.elementary_weights(A, b, c) - 1.0 / self.gamma.astype(float)
+
+    def order(self, A, b, c=None, tol=DEFAULT_TOLERANCE):
+        """
+        Order of a tableau: the largest p <= max_order such that every tree
+        with at most p nodes satisfies its condition within tol.
+
+        For stacked tableaus, returns an integer array of orders.
+        """
+        bad = np.abs(self.residuals(A, b, c)) > tol
+        order = np.full(bad.shape[:-1], self.max_order, dtype=int)
+        # Checked from the largest size down, so the smallest failure wins
+        for k in range(self.max_order, 0, -1):
+            lo, hi = int(self.size_end[k - 1]), int(self.size_end[k])
+            order[bad[..., lo:hi].any(axis=-1)] = k - 1
+        return int(order) if order.ndim == 0 else order
+
+    def failures(self, A, b, c=None, tol=DEFAULT_TOLERANCE):
+        """Ids of the trees whose condition fails for a single tableau."""
+        return np.flatnonzero(np.abs(self.residuals(A, b, c)) > tol)
+
+
+@lru_cache(maxsize=8)
+def order_conditions(max_order):
+    """Shared OrderConditions for trees up to max_order nodes."""
+    return OrderConditions(max_order)
+
+
+def check_order(A, b, c=None, max_order=10, tol=DEFAULT_TOLERANCE):
+    """
+    Return the order of a Runge-Kutta tableau, checked up to max_order.
+
+    Example:
+        >>> check_order(*TABLEAUS['rk4'])
+        4
+    """
+    return order_conditions(max_order).order(A, b, c, tol)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Check Runge-Kutta tableaus against the rooted tree order conditions'
+    )
+    parser.add_argument('methods', nargs='*', metavar='METHOD',
+                        help=f"Tableaus to check: {', '.join(TABLEAUS)} (default: all)")
+    parser.add_argument('--max-order', type=int, default=8,
+                        help='Largest tree size to check (default: %(default)s)')
+    parser.add_argument('--table', action='store_true',
+                        help='Print gamma, sigma and Phi for every tree (first method)')
+    args = parser.parse_args()
+    unknown = sorted(set(args.methods) - set(TABLEAUS))
+    if unknown:
+        parser.error(f"unknown method(s): {', '.join(unknown)}")
+    args.methods = args.methods or list(TABLEAUS)
+
+    conditions = order_conditions(args.max_order)
+    print(f"{len(conditions)} trees with up to {args.max_order} nodes")
+    for name in args.methods:
+        print(f"{name:<10} order {check_order(*TABLEAUS[name], args.max_order)}")
+
+    if args.table:
+        A, b, _ = TABLEAUS[args.methods[0]]
+        phi = conditions.elementary_weights(A, b)
+        print(f"\n{'tree':<24} {'gamma':>10} {'sigma':>8} {'Phi':>14} {'1/gamma':>14}")
+        out = sys.stdout
+        for i in range(len(conditions)):
+            gamma = conditions.gamma[i]
+            out.write(f"{conditions.tree(i):<24} {gamma:>10} {conditions.sigma[i]:>8} "
+                      f"{phi[i]:>14.10f} {1 / gamma:>14.10f}\n")
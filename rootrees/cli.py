@@ -0,0 +1,143 @@
+"""
+Unified command line interface: python3 -m rootrees <command> ...
+
+Commands:
+    count N [--all] [--free]      a(N) of A000081 (or A000055 with --free)
+    list N [--format F] [--free]  every tree with N nodes, in bulk
+    sample N [-k K] [--seed S]    uniformly random trees
+    rank TREE ... | --unrank N I  tree <-> (size, rank), see rootrees.ranking
+    bench [benchmark options]     the benchmark harness (rootrees.benchmark)
+
+Only argparse is imported up front; each command imports what it needs, so
+quick commands such as count start in a few milliseconds.
+"""
+
+import argparse
+import sys
+
+
+# bulkwrite.FORMATS, repeated so that parsing needs no other module
+FORMATS = ('parens', 'brackets', 'levels')
+
+
+def _count(args):
+    if args.free:
+        from .freetrees import count_free_trees as count
+    else:
+        from .optimized import count_rooted_trees as count
+    if args.all:
+        for n in range(args.n + 1):
+            print(f"{n} {count(n)}")
+    else:
+        print(count(args.n))
+    return 0
+
+
+def _list(args):
+    from .bulkwrite import BulkTreeWriter
+    if args.free:
+        from .freetrees import generate_free_trees as generate
+    else:
+        from .levelseq import generate_level_sequences as generate
+    with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+        writer.writemany(generate(args.n))
+    return 0
+
+
+def _sample(args):
+    import random
+    from .bulkwrite import BulkTreeWriter
+    from .levelseq import tree_to_level_sequence
+    from .ranking import random_tree
+    rng = random.Random(args.seed)
+    # Straight from the tuple: byte canonical forms stop at 255 levels
+    with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+        writer.writemany(tree_to_level_sequence(random_tree(args.n, rng))
+                         for _ in range(args.k))
+    return 0
+
+
+def _rank(args):
+    from .ranking import rank_tree, unrank_tree
+    if args.unrank:
+        from .levelseq import level_sequence_to_string, tree_to_level_sequence
+        n, index = args.unrank
+        try:
+            tree = unrank_tree(n, index)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        print(level_sequence_to_string(tree_to_level_sequence(tree), args.format))
+        return 0
+    from .treeparse import TreeParseError, parse_tree
+    status = 0
+    for text in args.trees:
+        try:
+            n, index = rank_tree(parse_tree(text))
+        except TreeParseError as e:
+            print(f"error: {e}", file=sys.stderr)
+            status = 2
+            continue
+        print(f"{n} {index}")
+    return status
+
+
+def build_parser():
+    """Return the argument parser for all commands."""
+    parser = argparse.ArgumentParser(
+        prog='rootrees',
+        description='Count, list, sample and rank unlabeled rooted trees'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    count = commands.add_parser('count', help='Count trees with n nodes')
+    count.add_argument('n', type=int, help='Number of nodes')
+    count.add_argument('--all', action='store_true', help='Print the counts for 0..n')
+    count.add_argument('--free', action='store_true', help='Count free (unrooted) trees')
+    count.set_defaults(run=_count)
+
+    listing = commands.add_parser('list', help='List every tree with n nodes')
+    listing.add_argument('n', type=int, help='Number of nodes')
+    listing.add_argument('--format', choices=FORMATS, default='parens',
+                         help='Output format (default: %(default)s)')
+    listing.add_argument('--free', action='store_true',
+                         help='List free trees, rooted at their center')
+    listing.set_defaults(run=_list)
+
+    sample = commands.add_parser('sample', help='Print uniformly random trees')
+    sample.add_argument('n', type=int, help='Number of nodes')
+    sample.add_argument('-k', type=int, default=1, help='Number of trees (default: 1)')
+    sample.add_argument('--seed', type=int, help='Random seed')
+    sample.add_argument('--format', choices=FORMATS, default='parens',
+                        help='Output format (default: %(default)s)')
+    sample.set_defaults(run=_sample)
+
+    rank = commands.add_parser('rank', help='Rank trees, or unrank with --unrank')
+    rank.add_argument('trees', nargs='*', help='Trees in parenthesis notation')
+    rank.add_argument('--unrank', nargs=2, type=int, metavar=('N', 'INDEX'),
+                      help='Print the tree with N nodes and this rank')
+    rank.add_argument('--format', choices=FORMATS, default='parens',
+                      help='Output format for --unrank (default: %(default)s)')
+    rank.set_defaults(run=_rank)
+
+    # Handled in main(): everything after "bench" goes to the benchmark
+    commands.add_parser('bench', help='Run the benchmark harness (see bench --help)',
+                        add_help=False)
+    return parser
+
+
+def main(argv=None):
+    """Run the command line interface; returns the exit status."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['bench']:
+        from .benchmark import main as bench
+        return bench(argv[1:], prog='rootrees bench')
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'rank' and not args.unrank and not args.trees:
+        parser.error("rank needs trees or --unrank N INDEX")
+    if getattr(args, 'n', 0) < 0:
+        parser.error("n must not be negative")
+    if args.command == 'sample' and args.n < 1:
+        parser.error("sample needs n >= 1 (there is no tree with 0 nodes)")
+    return args.run(args)
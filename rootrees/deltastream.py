@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Delta-compressed stream format for enumerated rooted trees.
+
+Consecutive trees in canonical generation order share long common prefixes
+of their level sequences, so instead of archiving one parentheses string per
+tree we store each tree as (common-prefix length, suffix) relative to the
+previous one.
+
+Stream layout:
+
+    header   MAGIC, version, compression code, n, sync interval (varints)
+    blocks   varint tree count, varint payload length, payload
+    end      varint 0
+    index    varint block count, varint offset delta per block
+    trailer  8-byte little-endian index offset, INDEX_MAGIC
+
+Every block starts with a full tree (a sync point) and is compressed on its
+own, so a reader can seek to any block through the index and decode from
+there.  Inside a block the first tree is stored as n depth values and every
+following tree as a varint prefix length plus the remaining depths.
+"""
+
+import io
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+
+from .levelseq import common_prefix_length, generate_level_sequences
+
+
+MAGIC = b'RTDS'
+INDEX_MAGIC = b'RTDX'
+VERSION = 1
+
+DEFAULT_SYNC_INTERVAL = 4096
+
+COMPRESSION_CODES = {'none': 0, 'zlib': 1, 'lzma': 2}
+COMPRESSION_NAMES = {code: name for name, code in COMPRESSION_CODES.items()}
+
+_TRAILER = struct.Struct('<Q')
+
+
+def _write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray."""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    """Decode an unsigned LEB128 varint from data at pos; return (value, pos)."""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_stream_varint(stream):
+    """Decode an unsigned LEB128 varint from a binary stream."""
+    result = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise EOFError("Truncated delta stream")
+        result |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return result
+        shift += 7
+
+
+def _depth_width(n):
+    """Number of bytes needed to store one depth of an n-node tree."""
+    if n <= 0x100:
+        return 1
+    if n <= 0x10000:
+        return 2
+    return 4
+
+
+def _compress(payload, compression, level):
+    if compression == 'zlib':
+        return zlib.compress(payload, 9 if level is None else level)
+    if compression == 'lzma':
+        return lzma.compress(payload, preset=6 if level is None else level)
+    return payload
+
+
+def _decompress(payload, compression):
+    if compression == 'zlib':
+        return zlib.decompress(payload)
+    if compression == 'lzma':
+        return lzma.decompress(payload)
+    return payload
+
+
+class DeltaStreamWriter:
+    """
+    Streaming encoder for level sequences of a fixed tree size.
+
+    Example:
+        with open('trees-12.rtds', 'wb') as f:
+            with DeltaStreamWriter(f, 12, compression='lzma') as writer:
+                writer.writemany(generate_level_sequences(12))
+    """
+
+    def __init__(self, stream, n, compression='zlib',
+                 sync_interval=DEFAULT_SYNC_INTERVAL, level=None):
+        """
+        Args:
+            stream: Writable binary file object
+            n: Number of nodes of every tree in the stream
+            compression: 'none', 'zlib' or 'lzma' (applied per block)
+            sync_interval: Number of trees per independently decodable block
+            level: Compression level/preset (None for the codec default)
+        """
+        if compression not in COMPRESSION_CODES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if n < 1:
+            raise ValueError("n must be positive")
+        if sync_interval < 1:
+            raise ValueError("sync_interval must be positive")
+
+        self.stream = stream
+        self.n = n
+        self.compression = compression
+        self.sync_interval = sync_interval
+        self.level = level
+        self.width = _depth_width(n)
+
+        self.trees = 0
+        self.raw_bytes = 0
+        self.bytes_written = 0
+        self._block = bytearray()
+        self._block_count = 0
+        self._prev = None
+        self._offsets = []
+        self._closed = False
+
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        header.append(COMPRESSION_CODES[compression])
+        _write_varint(header, n)
+        _write_varint(header, sync_interval)
+        self._write(header)
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+
+    def _encode(self, levels):
+        if self.width == 1:
+            return bytes(levels)
+        encoded = array('H' if self.width == 2 else 'I', levels)
+        if sys.byteorder != 'little':
+            encoded.byteswap()
+        return encoded.tobytes()
+
+    def write(self, levels):
+        """
+        Append one tree given as a level sequence.
+
+        Args:
+            levels: Sequence of n node depths in preorder
+        """
+        if len(levels) != self.n:
+            raise ValueError(f"Expected a level sequence of length {self.n}, got {len(levels)}")
+
+        current = self._encode(levels)
+        block = self._block
+        if self._prev is None:
+            block += current
+        else:
+            k = common_prefix_length(self._prev, current)
+            k -= k % self.width
+            _write_varint(block, k // self.width)
+            block += current[k:]
+        self._prev = current
+        self._block_count += 1
+        self.trees += 1
+
+        if self._block_count == self.sync_interval:
+            self._flush_block()
+
+    def writemany(self, sequences):
+        """Append every level sequence from an iterable."""
+        for levels in sequences:
+            self.write(levels)
+
+    def _flush_block(self):
+        if not self._block_count:
+            return
+        self.raw_bytes += len(self._block)
+        payload = _compress(bytes(self._block), self.compression, self.level)
+
+        self._offsets.append(self.bytes_written)
+        frame = bytearray()
+        _write_varint(frame, self._block_count)
+        _write_varint(frame, len(payload))
+        self._write(frame)
+        self._write(payload)
+
+        self._block = bytearray()
+        self._block_count = 0
+        self._prev = None
+
+    def close(self):
+        """Flush the last block and write the end marker, index and trailer."""
+        if self._closed:
+            return
+        self._flush_block()
+
+        tail = bytearray()
+        _write_varint(tail, 0)
+        self._write(tail)
+
+        index_offset = self.bytes_written
+        index = bytearray()
+        _write_varint(index, len(self._offsets))
+        prev = 0
+        for offset in self._offsets:
+            _write_varint(index, offset - prev)
+            prev = offset
+        index += _TRAILER.pack(index_offset)
+        index += INDEX_MAGIC
+        self._write(index)
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DeltaStreamReader:
+    """
+    Decoder for streams written by DeltaStreamWriter.
+
+    Iterating yields level sequences as tuples.  When the underlying file is
+    seekable the block index is available, enabling len(), random access by
+    tree number and iteration from an arbitrary position.
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Readable binary file object positioned at the header
+        """
+        self.stream = stream
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a rooted-tree delta stream")
+        version = stream.read(1)
+        if not version or version[0] != VERSION:
+            raise ValueError(f"Unsupported delta stream version: {version!r}")
+        code = stream.read(1)
+        if not code or code[0] not in COMPRESSION_NAMES:
+            raise ValueError(f"Unknown compression code: {code!r}")
+
+        self.compression = COMPRESSION_NAMES[code[0]]
+        self.n = _read_stream_varint(stream)
+        self.sync_interval = _read_stream_varint(stream)
+        self.width = _depth_width(self.n)
+        self._data_start = stream.tell() if stream.seekable() else None
+        self._index = None
+
+    def _decode(self, data):
+        if self.width == 1:
+            return tuple(data)
+        decoded = array('H' if self.width == 2 else 'I')
+        decoded.frombytes(data)
+        if sys.byteorder != 'little':
+            decoded.byteswap()
+        return tuple(decoded)
+
+    def _read_block(self):
+        """Read one block frame; return (count, payload) or None at the end."""
+        count = _read_stream_varint(self.stream)
+        if count == 0:
+            return None
+        length = _read_stream_varint(self.stream)
+        payload = self.stream.read(length)
+        if len(payload) != length:
+            raise EOFError("Truncated delta stream")
+        return count, _decompress(payload, self.compression)
+
+    def _iter_block(self, count, payload, skip=0):
+        """Decode the trees of one block, dropping the first skip of them."""
+        size = self.n * self.width
+        prev = payload[:size]
+        pos = size
+        if not skip:
+            yield self._decode(prev)
+        for i in range(1, count):
+            k, pos = _read_varint(payload, pos)
+            k *= self.width
+            end = pos + size - k
+            current = prev[:k] + payload[pos:end]
+            pos = end
+            prev = current
+            if i >= skip:
+                yield self._decode(current)
+
+    def __iter__(self):
+        if self._data_start is not None:
+            self.stream.seek(self._data_start)
+        while True:
+            block = self._read_block()
+            if block is None:
+                return
+            yield from self._iter_block(*block)
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        if self._data_start is None:
+            raise io.UnsupportedOperation("Random access needs a seekable stream")
+
+        trailer_size = _TRAILER.size + len(INDEX_MAGIC)
+        self.stream.seek(-trailer_size, io.SEEK_END)
+        trailer = self.stream.read(trailer_size)
+        if trailer[_TRAILER.size:] != INDEX_MAGIC:
+            raise ValueError("Delta stream has no index (was the writer closed?)")
+        (index_offset,) = _TRAILER.unpack(trailer[:_TRAILER.size])
+
+        self.stream.seek(index_offset)
+        blocks = _read_stream_varint(self.stream)
+        offsets = []
+        offset = 0
+        for _ in range(blocks):
+            offset += _read_stream_varint(self.stream)
+            offsets.append(offset)
+
+        # All blocks but the last hold exactly sync_interval trees
+        total = 0
+        if offsets:
+            self.stream.seek(offsets[-1])
+            total = (len(offsets) - 1) * self.sync_interval + _read_stream_varint(self.stream)
+        self._index = (offsets, total)
+        return self._index
+
+    def __len__(self):
+        if self._data_start is None:
+            # TypeError keeps list(reader) working on pipes
+            raise TypeError("len() of an unseekable delta stream")
+        return self._load_index()[1]
+
+    @property
+    def blocks(self):
+        """Number of independently decodable blocks in the stream."""
+        return len(self._load_index()[0])
+
+    def iter_from(self, start):
+        """
+        Iterate over the trees starting at tree number start (0-based).
+
+        Only the block containing start is decoded partially; earlier blocks
+        are skipped through the index.
+        """
+        offsets, total = self._load_index()
+        if not 0 <= start <= total:
+            raise IndexError("tree index out of range")
+        if start == total:
+            return
+        block, skip = divmod(start, self.sync_interval)
+        self.stream.seek(offsets[block])
+        first = True
+        while True:
+            frame = self._read_block()
+            if frame is None:
+                return
+            yield from self._iter_block(*frame, skip=skip if first else 0)
+            first = False
+
+    def __getitem__(self, index):
+        total = len(self)
+        if index < 0:
+            index += total
+        for levels in self.iter_from(index):
+            return levels
+        raise IndexError("tree index out of range")
+
+
+def encode_level_sequences(sequences, stream, n, **options):
+    """
+    Encode an iterable of level sequences into a delta stream.
+
+    Args:
+        sequences: Iterable of level sequences, all of length n
+        stream: Writable binary file object
+        n: Number of nodes per tree
+        **options: Passed on to DeltaStreamWriter
+
+    Returns:
+        The closed DeltaStreamWriter, for its size statistics
+    """
+    with DeltaStreamWriter(stream, n, **options) as writer:
+        writer.writemany(sequences)
+    return writer
+
+
+def decode_level_sequences(stream):
+    """Yield the level sequences stored in a delta stream."""
+    yield from DeltaStreamReader(stream)
+
+
+def main():
+    """CLI for encoding enumerations to delta streams and decoding them."""
+    import argparse
+    import gzip
+    from .bulkwrite import FORMATS, BulkTreeWriter
+    from .levelseq import level_sequence_to_string
+
+    parser = argparse.ArgumentParser(
+        description='Delta-compressed archive format for rooted tree enumerations'
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    enc = sub.add_parser('encode', help='Enumerate all n-node trees into a delta stream')
+    enc.add_argument('n', type=int, help='Number of nodes')
+    enc.add_argument('output', help='Output file')
+    enc.add_argument('--compression', choices=sorted(COMPRESSION_CODES), default='zlib',
+                     help='Per-block compression (default: zlib)')
+    enc.add_argument('--sync', type=int, default=DEFAULT_SYNC_INTERVAL,
+                     help=f'Trees per seekable block (default: {DEFAULT_SYNC_INTERVAL})')
+    enc.add_argument('--compare-gzip', action='store_true',
+                     help='Also report the gzip size of the equivalent parentheses text')
+
+    dec = sub.add_parser('decode', help='Print the trees stored in a delta stream')
+    dec.add_argument('input', help='Input file')
+    dec.add_argument('--format', choices=FORMATS, default='parens',
+                     help='Output format (default: parens)')
+    dec.add_argument('--start', type=int, default=0, help='First tree to print')
+
+    info = sub.add_parser('info', help='Show stream header and size information')
+    info.add_argument('input', help='Input file')
+
+    args = parser.parse_args()
+
+    if args.command == 'encode':
+        if args.n < 1:
+            parser.error("n must be positive")
+        with open(args.output, 'wb') as f:
+            writer = encode_level_sequences(
+                generate_level_sequences(args.n), f, args.n,
+                compression=args.compression, sync_interval=args.sync
+            )
+        per_tree = writer.bytes_written / writer.trees
+        print(f"Encoded {writer.trees} trees into {writer.bytes_written} bytes "
+              f"({per_tree:.3f} bytes/tree, {writer.raw_bytes} bytes before compression)",
+              file=sys.stderr)
+        if args.compare_gzip:
+            text = "".join(level_sequence_to_string(levels) + "\n"
+                           for levels in generate_level_sequences(args.n)).encode()
+            packed = len(gzip.compress(text, 9))
+            print(f"gzip -9 of parentheses text: {packed} bytes "
+                  f"({packed / writer.bytes_written:.1f}x larger)", file=sys.stderr)
+
+    elif args.command == 'decode':
+        with open(args.input, 'rb') as f:
+            reader = DeltaStreamReader(f)
+            trees = reader.iter_from(args.start) if args.start else reader
+            with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+                writer.writemany(trees)
+
+    elif args.command == 'info':
+        with open(args.input, 'rb') as f:
+            reader = DeltaStreamReader(f)
+            total = len(reader)
+            blocks = reader.blocks
+            f.seek(0, io.SEEK_END)
+            size = f.tell()
+        print(f"n: {reader.n}")
+        print(f"compression: {reader.compression}")
+        print(f"sync interval: {reader.sync_interval}")
+        print(f"blocks: {blocks}")
+        print(f"trees: {total}")
+        print(f"bytes: {size} ({size / total if total else 0:.3f} bytes/tree)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Re-entrant rooted tree enumerator with a shared, bounded level cache.
+
+Uses the successor rule of list-rooted-trees.py (every tree with n nodes is
+a successor of exactly one tree with n-1 nodes), but keeps its tree ids per
+enumerator instead of in a module-global dict, so independent enumerators
+and concurrent iterations do not interfere.
+
+Each completed level (all trees of one size, plus their ids) is cached, and
+a request for a larger n continues from the largest cached level instead of
+starting over.  Levels are evicted least-recently-used first once their
+estimated size exceeds the memory budget.  A tree's id is its rank within
+its level plus the number of smaller trees (from the A000081 counts), so an
+evicted level regenerates with exactly the same ids.
+"""
+
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+from .optimized import count_rooted_trees as _count_rooted_trees
+
+
+DEFAULT_MEMORY_BUDGET = 256 << 20
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'levels',
+                                     'currsize', 'budget'])
+
+# Rough per-tree footprint of a level (tuple, index entry, id int), used
+# to decide up front whether a level can be cached at all
+_BYTES_PER_TREE = 100
+
+
+def _level_size(trees, index):
+    """Estimate the memory held by a level (subtrees are shared with lower levels)."""
+    return (sys.getsizeof(trees) + sys.getsizeof(index)
+            + sum(map(sys.getsizeof, trees)))
+
+
+class RootedTreeEnumerator:
+    """
+    Thread-safe generator of unlabeled rooted trees as nested tuples.
+
+    Example:
+        enumerator = RootedTreeEnumerator(memory_budget=64 << 20)
+        for tree in enumerator.trees(10):
+            ...
+        enumerator.count(11)    # reuses the cached level 10
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Args:
+            memory_budget: Approximate bytes of cached levels to keep
+        """
+        self.memory_budget = memory_budget
+        self._lock = threading.RLock()
+        # n -> (trees tuple, {tree: id}, estimated bytes), least recently used first
+        self._levels = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def id_offset(n):
+        """Id of the first tree with n nodes: the number of smaller trees."""
+        return sum(_count_rooted_trees(k) for k in range(n))
+
+    def _lookup(self, n):
+        """Return a cached level and mark it as recently used."""
+        level = self._levels.get(n)
+        if level is not None:
+            self._levels.move_to_end(n)
+            self._hits += 1
+        return level
+
+    def _store(self, n, trees, index):
+        size = _level_size(trees, index)
+        if size > self.memory_budget:
+            return
+        self._levels[n] = (trees, index, size)
+        self._size += size
+        while self._size > self.memory_budget:
+            _, (_, _, evicted) = self._levels.popitem(last=False)
+            self._size -= evicted
+            self._evictions += 1
+
+    def _level(self, n):
+        """Return (trees, index) for size n, building and caching it if needed."""
+        with self._lock:
+            level = self._lookup(n)
+            if level is not None:
+                return level[0], level[1]
+            self._misses += 1
+            if n == 1:
+                trees, index = ((),), {(): 0}
+            else:
+                trees = tuple(self._successors(n))
+                offset = self.id_offset(n)
+                index = {tree: offset + rank for rank, tree in enumerate(trees)}
+            self._store(n, trees, index)
+            return trees, index
+
+    def _successors(self, n):
+        """Stream the trees with n nodes from the level below."""
+        with self._lock:
+            previous, _ = self._level(n - 1)
+            # Ids of every smaller tree; lower levels are tiny next to level n
+            treeid = {}
+            for k in range(1, n):
+                treeid.update(self._level(k)[1])
+
+        def succ(x):
+            yield ((),) + x
+            if not x:
+                return
+            if len(x) == 1:
+                for i in succ(x[0]):
+                    yield (i,)
+                return
+            head, rest = x[0], x[1:]
+            top = treeid[rest[0]]
+            for i in succ(head):
+                if treeid[i] <= top:
+                    yield (i,) + rest
+
+        for x in previous:
+            yield from succ(x)
+
+    def trees(self, n):
+        """
+        Generate all rooted trees with n nodes.
+
+        Cached levels are replayed; otherwise the level is built from the
+        level below and cached, or streamed without caching when it would
+        not fit in the memory budget.  Each call returns an independent
+        iterator, so several threads may iterate at once.
+
+        Args:
+            n: Number of nodes
+
+        Yields:
+            Trees as nested tuples, in the order of list-rooted-trees.py
+        """
+        if n < 1:
+            return iter(())
+        if n > 1 and _count_rooted_trees(n) * _BYTES_PER_TREE > self.memory_budget:
+            with self._lock:
+                level = self._lookup(n)
+            if level is None:
+                return self._successors(n)
+            return iter(level[0])
+        return iter(self._level(n)[0])
+
+    def count(self, n):
+        """Number of trees with n nodes (from the cache when available)."""
+        with self._lock:
+            level = self._lookup(n)
+        if level is not None:
+            return len(level[0])
+        return _count_rooted_trees(n) if n > 0 else 0
+
+    def tree_id(self, tree, n=None):
+        """
+        Return the id of a tree produced by this enumerator.
+
+        Args:
+            tree: Tree as nested tuple, in the enumerator's canonical order
+            n: Number of nodes, if known (saves counting them)
+
+        Raises:
+            KeyError: If the tree is not canonical for this enumerator
+        """
+        if n is None:
+            n, stack = 0, [tree]
+            while stack:
+                node = stack.pop()
+                n += 1
+                stack.extend(node)
+        return self._level(n)[1][tree]
+
+    def cache_info(self):
+        """Return hit/miss/eviction counts, cached level sizes and memory use."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             tuple(self._levels), self._size, self.memory_budget)
+
+    def clear(self):
+        """Drop all cached levels."""
+        with self._lock:
+            self._levels.clear()
+            self._size = 0
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Enumerate rooted trees with a cached, re-entrant enumerator'
+    )
+    parser.add_argument('n', type=int, nargs='+', help='Tree sizes, in request order')
+    parser.add_argument('--budget', type=int, default=DEFAULT_MEMORY_BUDGET >> 20,
+                        help='Cache budget in MiB (default: %(default)s)')
+    args = parser.parse_args()
+
+    enumerator = RootedTreeEnumerator(args.budget << 20)
+    for n in args.n:
+        start = time.perf_counter()
+        count = sum(1 for _ in enumerator.trees(n))
+        elapsed = time.perf_counter() - start
+        print(f"n={n}: {count} trees in {elapsed:.3f}s")
+    info = enumerator.cache_info()
+    print(f"Cache: {info.hits} hits, {info.misses} misses, {info.evictions} evictions, "
+          f"levels {list(info.levels)}, {info.currsize / (1 << 20):.1f} MiB")
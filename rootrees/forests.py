@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Memoized enumeration of forests (multisets of rooted trees).
+
+A rooted tree with n nodes is a root above a forest with n-1 nodes, and a
+forest is a multiset of smaller trees, so both can be enumerated from the
+same tables.  Every tree gets an integer id, assigned in canonical order:
+by size, then by rank among the trees of that size.  A forest is the
+non-decreasing tuple of the ids of its trees, and forests are listed in
+lexicographic order of those tuples.
+
+The forests of total size r whose parts are all >= some id p form a suffix
+of the sorted list of all forests of size r, so the memo table
+F(remaining size, smallest allowed part) is stored as one list per size plus
+a bisect on the first parts.  Only the forests below the requested size are
+kept; the top level is streamed.
+
+This replaces the bags()/bagchain() approach of list-rooted-trees-1.py,
+which rebuilds every smaller size on each call and materializes all results.
+"""
+
+import sys
+from bisect import bisect_left
+
+
+VIEWS = ('ids', 'tuple', 'parens')
+
+
+class ForestEngine:
+    """
+    Enumerates forests and trees, keeping the tables between calls.
+
+    Example:
+        engine = ForestEngine()
+        for tree in engine.trees(12, 'parens'):
+            ...
+    """
+
+    def __init__(self):
+        # Per tree id: size, children (a forest) and the cached views
+        self.sizes = [1]
+        self.children = [()]
+        self._tuples = [()]
+        self._parens = ["()"]
+        # size_end[k]: first id of a tree with more than k nodes
+        self.size_end = [0, 1]
+        # forests_by_size[r]: all forests of total size r in order;
+        # firsts[r]: their first parts
+        self.forests_by_size = [[()]]
+        self.firsts = [[]]
+
+    def _build(self, r):
+        """Store the forests of total size up to r and the trees up to size r+1."""
+        for size in range(len(self.forests_by_size), r + 1):
+            table = list(self._stream(size))
+            self.forests_by_size.append(table)
+            self.firsts.append([forest[0] for forest in table])
+            self._register(table, size + 1)
+
+    def build_trees(self, n):
+        """
+        Store every tree with up to n nodes.
+
+        Afterwards sizes, children and tree() cover the ids below
+        size_end[n].
+        """
+        self._build(n - 1)
+
+    def _register(self, table, size):
+        """Give ids to the trees of the given size, whose child forests are in table."""
+        sizes = self.sizes
+        tuples = self._tuples
+        parens = self._parens
+        for forest in table:
+            sizes.append(size)
+            self.children.append(forest)
+            tuples.append(tuple([tuples[c] for c in forest]))
+            parens.append("(" + "".join([parens[c] for c in forest]) + ")")
+        self.size_end.append(len(sizes))
+
+    def _suffix(self, r, smallest):
+        """Memoized F(r, smallest): forests of size r with every part >= smallest."""
+        if r == 0:
+            return ((),)
+        table = self.forests_by_size[r]
+        return table[bisect_left(self.firsts[r], smallest):]
+
+    def _stream(self, r):
+        """Yield the forests of size r in order, given the tables below r."""
+        sizes = self.sizes
+        suffix = self._suffix
+        # A first part with more than r/2 nodes leaves no room for another,
+        # since later parts are at least as large
+        for part in range(self.size_end[r // 2]):
+            for tail in suffix(r - sizes[part], part):
+                yield (part,) + tail
+        for part in range(self.size_end[r - 1], self.size_end[r]):
+            yield (part,)
+
+    def forests(self, r, view='ids'):
+        """
+        Generate every forest with r nodes in total.
+
+        Args:
+            r: Total number of nodes
+            view: 'ids' (tuple of tree ids), 'tuple' (tuple of nested-tuple
+                  trees) or 'parens' (concatenated tree strings)
+
+        Yields:
+            Forests in canonical order
+        """
+        if view not in VIEWS:
+            raise ValueError(f"Unknown view: {view}")
+        if r < 0:
+            return
+        if r == 0:
+            yield self.forest_view((), view)
+            return
+        self._build(r - 1)
+        if view == 'ids':
+            yield from self._stream(r)
+        else:
+            for forest in self._stream(r):
+                yield self.forest_view(forest, view)
+
+    def trees(self, n, view='tuple'):
+        """
+        Generate every rooted tree with n nodes as a root above a forest.
+
+        Args:
+            n: Number of nodes
+            view: 'ids' (the child forest as tree ids), 'tuple' (nested
+                  tuple) or 'parens' (string)
+
+        Yields:
+            Trees in canonical order: from the star to the path
+        """
+        if view not in VIEWS:
+            raise ValueError(f"Unknown view: {view}")
+        if n < 1:
+            return
+        for forest in self.forests(n - 1, 'ids'):
+            yield self.tree_view(forest, view)
+
+    def forest_view(self, forest, view='tuple'):
+        """Convert a forest given as tree ids into the requested view."""
+        if view == 'ids':
+            return forest
+        if view == 'tuple':
+            tuples = self._tuples
+            return tuple([tuples[c] for c in forest])
+        if view == 'parens':
+            parens = self._parens
+            return "".join([parens[c] for c in forest])
+        raise ValueError(f"Unknown view: {view}")
+
+    def tree_view(self, forest, view='tuple'):
+        """Convert a tree given as the tree ids of its child forest into a view."""
+        if view == 'parens':
+            return "(" + self.forest_view(forest, 'parens') + ")"
+        return self.forest_view(forest, view)
+
+    def tree(self, tree_id, view='tuple'):
+        """Return a stored tree by id."""
+        return self.tree_view(self.children[tree_id], view)
+
+    def count_forests(self, r):
+        """Number of forests with r nodes, a(r+1) of A000081."""
+        if r == 0:
+            return 1
+        if r < len(self.forests_by_size):
+            return len(self.forests_by_size[r])
+        return sum(1 for _ in self.forests(r))
+
+
+_default_engine = ForestEngine()
+
+
+def generate_forests(r, view='tuple'):
+    """
+    Generate every forest (multiset of rooted trees) with r nodes in total.
+
+    Uses a module-level engine, so the tables are shared between calls.
+
+    Args:
+        r: Total number of nodes
+        view: One of VIEWS
+
+    Yields:
+        Forests in canonical order
+    """
+    return _default_engine.forests(r, view)
+
+
+def generate_trees(n, view='tuple'):
+    """
+    Generate every rooted tree with n nodes.
+
+    Args:
+        n: Number of nodes
+        view: One of VIEWS
+
+    Yields:
+        Trees in canonical order
+    """
+    return _default_engine.trees(n, view)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Enumerate rooted trees or forests with the memoized forest engine'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--forests', action='store_true',
+                        help='List forests with n nodes instead of trees')
+    args = parser.parse_args()
+
+    items = generate_forests(args.n, 'parens') if args.forests else generate_trees(args.n, 'parens')
+    count = 0
+    out = sys.stdout
+    for item in items:
+        out.write(item + "\n")
+        count += 1
+    kind = "forests" if args.forests else "trees"
+    print(f"Number of {args.n}-node {kind}: {count}", file=sys.stderr)
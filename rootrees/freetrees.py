@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Generation and counting of free (unrooted) trees, OEIS A000055.
+
+Every free tree has a center (one node) or a bicenter (an edge) that is
+fixed by all its automorphisms.  Rooting each tree at its center turns the
+free trees into a subset of the rooted trees, which the
+Wright-Richmond-Odlyzko-McKay algorithm walks in constant amortized time:
+it steps through canonical level sequences with the Beyer-Hedetniemi
+successor rule, keeping only those whose root is a center and jumping over
+whole runs of non-central rootings at once.
+
+Trees are produced in the same forms as the rooted engines: canonical
+level sequences (rooted at the center; for a bicentral tree at one end of
+the central edge) and parent arrays.
+
+The count follows from Otter's dissymmetry theorem:
+
+    f(n) = r(n) - (sum_{i=1..n-1} r(i) r(n-i) - [n even] r(n/2)) / 2
+
+with r(n) the rooted-tree counts (A000081).
+"""
+
+import sys
+
+from .levelseq import level_sequence_to_parents
+
+
+def count_free_trees(n):
+    """
+    Count the unlabeled free trees with n nodes (OEIS A000055).
+
+    Args:
+        n: Number of nodes
+
+    Returns:
+        Number of distinct unrooted trees with n nodes
+
+    Examples:
+        >>> [count_free_trees(n) for n in range(1, 9)]
+        [1, 1, 1, 2, 3, 6, 11, 23]
+    """
+    if n <= 1:
+        return 1
+    from .optimized import count_rooted_trees as rooted
+    pairs = sum(rooted(i) * rooted(n - i) for i in range(1, n))
+    if n % 2 == 0:
+        pairs -= rooted(n // 2)
+    return rooted(n) - pairs // 2
+
+
+def _advance(layout, p):
+    """Beyer-Hedetniemi step at position p: repeat the subtree pattern of p's parent."""
+    target = layout[p] - 1
+    q = p - 1
+    while layout[q] != target:
+        q -= 1
+    shift = p - q
+    for i in range(p, len(layout)):
+        layout[i] = layout[i - shift]
+
+
+def _second_child(layout):
+    """Index of the root's second child, or len(layout) if it has only one."""
+    try:
+        return layout.index(1, 2)
+    except ValueError:
+        return len(layout)
+
+
+def generate_free_trees(n):
+    """
+    Generate every free tree with n nodes exactly once.
+
+    Each tree is the canonical level sequence of the tree rooted at its
+    center.  The first subtree of the root is the "left" part and the rest
+    of the tree, re-rooted, the "rest"; a rooting is central and canonical
+    exactly when the rest is at least as high as the left part (and, when
+    they are equally high, not smaller in the WROM ordering).  Sequences
+    that fail the test are replaced by the next one that passes.
+
+    Args:
+        n: Number of nodes in the trees
+
+    Yields:
+        Level sequences as tuples of depths
+
+    Examples:
+        >>> list(generate_free_trees(5))
+        [(0, 1, 2, 1, 2), (0, 1, 2, 1, 1), (0, 1, 1, 1, 1)]
+    """
+    if n <= 2:
+        if n >= 0:
+            yield tuple(range(n))
+        return
+
+    # The path rooted at its center
+    layout = list(range(n // 2 + 1)) + list(range(1, (n + 1) // 2))
+    while True:
+        # Split at the second child of the root
+        m = _second_child(layout)
+        left_height = max(layout[1:m]) - 1
+        rest_height = max(layout[m:], default=0)
+
+        valid = rest_height >= left_height
+        if valid and rest_height == left_height:
+            left_size, rest_size = m - 1, n - m + 1
+            if left_size > rest_size:
+                valid = False
+            elif left_size == rest_size:
+                valid = [d - 1 for d in layout[1:m]] <= [0] + layout[m:]
+
+        if not valid:
+            # Skip every rooting whose left part is still too heavy
+            p = m - 1
+            jump = layout[p] > 2
+            _advance(layout, p)
+            if jump:
+                m = _second_child(layout)
+                left_height = max(layout[1:m]) - 1
+                layout[n - left_height - 1:] = range(1, left_height + 2)
+
+        yield tuple(layout)
+
+        p = n - 1
+        while layout[p] == 1:
+            p -= 1
+        if p == 0:
+            return
+        _advance(layout, p)
+
+
+def generate_free_tree_parents(n):
+    """
+    Generate every free tree with n nodes as a parent array.
+
+    Args:
+        n: Number of nodes in the trees
+
+    Yields:
+        Lists where entry i is the parent of node i in preorder (-1 for
+        the root, which is a center of the tree)
+    """
+    for levels in generate_free_trees(n):
+        yield level_sequence_to_parents(levels)
+
+
+if __name__ == '__main__':
+    import argparse
+    from .bulkwrite import FORMATS, BulkTreeWriter
+
+    parser = argparse.ArgumentParser(
+        description='Generate and count free (unrooted) trees (OEIS A000055)'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--format', choices=FORMATS, default='levels',
+                        help='Output format, rooted at the center (default: levels)')
+    parser.add_argument('--count', action='store_true',
+                        help='Only print the count from Otter\'s formula')
+    args = parser.parse_args()
+
+    if args.count:
+        print(count_free_trees(args.n))
+        sys.exit(0)
+
+    with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+        writer.writemany(generate_free_trees(args.n))
+    print(f"Number of free {args.n}-trees: {writer.count}", file=sys.stderr)
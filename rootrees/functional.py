@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Memoized bottom-up evaluation of tree functionals.
+
+A tree functional is defined recursively: a leaf has a fixed value and an
+inner node combines the values of its children.  Because children are
+unordered, the combine function receives the multiset of child values as
+(value, multiplicity) pairs:
+
+    size = TreeFunctional(1, lambda children: 1 + sum(v * m for v, m in children))
+
+Each subtree is evaluated once per distinct shape.  Subtrees are interned
+as in grafting.py and hopf.py: a node is identified by the sorted tuple of
+its children's integer ids, so a memo lookup hashes a few small integers
+instead of the whole nested tuple, and isomorphic subtrees get the same id
+whatever the order of their children.  Values are kept per id in a bounded
+LRU table.
+
+Named functionals are kept in a registry, so command-line tools and callers
+can refer to them by name:
+
+    >>> values = evaluate_trees('symmetry', 5)
+"""
+
+import sys
+from collections import Counter, OrderedDict, namedtuple
+from math import factorial, prod
+
+from .levelseq import generate_level_sequences, level_sequence_to_tree
+
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class TreeFunctional:
+    """
+    Recursive functional over unordered rooted trees with a memo cache.
+
+    Example:
+        height = TreeFunctional(0, lambda children: 1 + max(v for v, _ in children))
+        height(((),))   # 1
+    """
+
+    def __init__(self, leaf, combine, cache_size=DEFAULT_CACHE_SIZE, name=None):
+        """
+        Args:
+            leaf: Value of a single-node tree
+            combine: Function mapping a list of (child value, multiplicity)
+                     pairs to the value of the parent
+            cache_size: Maximum number of cached subtree values between
+                        evaluations (None for unbounded)
+            name: Optional name used in reports
+        """
+        self.leaf = leaf
+        self.combine = combine
+        self.name = name
+        self.maxsize = cache_size
+        # Sorted child ids -> (id, value), least recently used first.  The
+        # table is trimmed between evaluations only, so a shape keeps its id
+        # within one tree; ids are never reused, so a subtree evicted
+        # earlier comes back under a new id and stale parents just miss
+        self._table = OrderedDict()
+        self._next_id = 0
+        self._hits = self._misses = 0
+
+    def _intern(self, children):
+        """(id, value) of the node with the given (id, value) children."""
+        key = tuple(sorted(c for c, _ in children))
+        table = self._table
+        entry = table.get(key)
+        if entry is not None:
+            self._hits += 1
+            table.move_to_end(key)
+            return entry
+        self._misses += 1
+        if key:
+            values = dict(children)
+            value = self.combine([(values[c], m) for c, m in Counter(key).items()])
+        else:
+            value = self.leaf
+        entry = table[key] = (self._next_id, value)
+        self._next_id += 1
+        return entry
+
+    def _trim(self):
+        """Evict least recently used entries down to the cache size."""
+        table = self._table
+        if self.maxsize is not None:
+            while len(table) > self.maxsize:
+                table.popitem(last=False)
+
+    def __call__(self, tree):
+        """Evaluate the functional on a nested-tuple tree (children in any order)."""
+        # Iterative post-order, so deep paths do not hit the recursion limit
+        results = []
+        stack = [(tree, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                k = len(node)
+                children = results[len(results) - k:] if k else []
+                del results[len(results) - k:]
+                results.append(self._intern(children))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node)
+        self._trim()
+        return results[0][1]
+
+    def evaluate_levels(self, levels):
+        """Evaluate the functional on a level sequence, without building tuples."""
+        # Open nodes from the root down, each with its finished children
+        stack = [[]]
+        for depth in levels[1:]:
+            while len(stack) > depth:
+                finished = stack.pop()
+                stack[-1].append(self._intern(finished))
+            stack.append([])
+        while len(stack) > 1:
+            finished = stack.pop()
+            stack[-1].append(self._intern(finished))
+        value = self._intern(stack[0])[1]
+        self._trim()
+        return value
+
+    def map(self, trees):
+        """Evaluate the functional on every nested-tuple tree from an iterable."""
+        return map(self, trees)
+
+    def cache_info(self):
+        """Memo table statistics as a CacheInfo (hits, misses, maxsize, currsize)."""
+        return CacheInfo(self._hits, self._misses, self.maxsize, len(self._table))
+
+    def cache_clear(self):
+        """Drop all cached values and reset the statistics."""
+        self._table.clear()
+        self._hits = self._misses = 0
+
+    def __repr__(self):
+        return f"TreeFunctional({self.name or '<anonymous>'})"
+
+
+def canonical_tree(tree):
+    """
+    Normalize a nested-tuple tree so isomorphic trees become equal tuples.
+
+    Children are sorted by tuple comparison at every node; works without
+    recursion.
+
+    Args:
+        tree: Tree represented as nested tuple, children in any order
+
+    Returns:
+        Canonical nested tuple
+    """
+    # Post-order over (node, done) pairs; results collects finished subtrees
+    results = []
+    stack = [(tree, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            k = len(node)
+            children = results[len(results) - k:] if k else []
+            del results[len(results) - k:]
+            results.append(tuple(sorted(children, reverse=True)))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node)
+    return results[0]
+
+
+# Registry of named functionals: name -> (leaf value, combine function)
+_REGISTRY = {}
+
+
+def register_functional(name, leaf, combine):
+    """
+    Register a named functional.
+
+    Args:
+        name: Registry key
+        leaf: Value of a single-node tree
+        combine: Function over a list of (child value, multiplicity) pairs
+    """
+    _REGISTRY[name] = (leaf, combine)
+
+
+def available_functionals():
+    """Return the registered functional names in sorted order."""
+    return sorted(_REGISTRY)
+
+
+def get_functional(name, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Create a fresh TreeFunctional (with its own cache) for a registered name.
+
+    Raises:
+        KeyError: If the name is not registered
+    """
+    if name not in _REGISTRY:
+        raise KeyError(f"Unknown functional: {name}")
+    leaf, combine = _REGISTRY[name]
+    return TreeFunctional(leaf, combine, cache_size, name)
+
+
+def evaluate_trees(functional, n):
+    """
+    Evaluate a functional over every rooted tree with n nodes.
+
+    Args:
+        functional: TreeFunctional or registered name
+        n: Number of nodes in the trees
+
+    Yields:
+        (tree, value) pairs, trees as canonical nested tuples
+    """
+    if isinstance(functional, str):
+        functional = get_functional(functional)
+    for levels in generate_level_sequences(n):
+        tree = level_sequence_to_tree(levels)
+        yield tree, functional(tree)
+
+
+def _size(children):
+    return 1 + sum(v * m for v, m in children)
+
+
+def _height(children):
+    return 1 + max(v for v, _ in children)
+
+
+def _leaves(children):
+    return sum(v * m for v, m in children)
+
+
+def _symmetry(children):
+    # sigma(t) = prod sigma(t_i)^m_i * m_i! over distinct children t_i
+    return prod(v ** m * factorial(m) for v, m in children)
+
+
+def _density(children):
+    # (size, gamma) with gamma(t) = |t| * prod gamma(t_i)
+    size = 1 + sum(s * m for (s, _), m in children)
+    return size, size * prod(g ** m for (_, g), m in children)
+
+
+register_functional('size', 1, _size)
+register_functional('height', 0, _height)
+register_functional('leaves', 1, _leaves)
+register_functional('symmetry', 1, _symmetry)
+register_functional('density', (1, 1), _density)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Evaluate registered tree functionals over all trees with n nodes'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('functionals', nargs='*', default=['symmetry'],
+                        help='Functional names (default: symmetry); '
+                             f'available: {", ".join(available_functionals())}')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f'Memo cache entries per functional (default: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--list', action='store_true',
+                        help='Print the value for every tree')
+    args = parser.parse_args()
+
+    try:
+        functionals = [get_functional(name, args.cache_size) for name in args.functionals]
+    except KeyError as e:
+        parser.error(str(e.args[0]))
+
+    count = 0
+    for levels in generate_level_sequences(args.n):
+        tree = level_sequence_to_tree(levels)
+        values = [f(tree) for f in functionals]
+        if args.list:
+            print(" ".join(map(str, levels)), *values, sep="\t")
+        count += 1
+
+    print(f"Evaluated {len(functionals)} functional(s) on {count} trees", file=sys.stderr)
+    for f in functionals:
+        info = f.cache_info()
+        total = info.hits + info.misses
+        rate = info.hits / total if total else 0.0
+        print(f"  {f.name}: {info.hits} hits, {info.misses} misses "
+              f"({rate:.1%} hit rate), {info.currsize} cached", file=sys.stderr)
@@ -0,0 +1,81 @@
+"""
+Instrumentation counters for the successor-based tree generators.
+
+generate_rooted_trees() in optimized.py and trees() in
+list-rooted-trees.py accept an optional stats object.  There is one copy of
+each algorithm: every counter update sits behind a stats-is-None check, so
+disabled counters cost a branch and no attribute updates.
+
+    stats = EnumerationStats()
+    for tree in generate_rooted_trees(12, stats=stats):
+        ...
+    print(stats.format())
+"""
+
+from collections import namedtuple
+
+
+LevelStats = namedtuple('LevelStats', ['trees', 'treeid_size', 'seconds'])
+
+
+class EnumerationStats:
+    """
+    Counters filled in by an instrumented enumeration.
+
+    Attributes:
+        successor_calls: Calls of the successor function (including recursive ones)
+        candidates: Successors of a subtree checked against the canonical order
+        rejections: Candidates dropped because they would break the order
+        cache_hits: treeid lookups that found an existing id
+        cache_misses: treeid lookups that assigned a new id
+        levels: Tree size -> LevelStats(trees, treeid size after the level,
+                seconds spent building it), recorded when the level is complete
+    """
+
+    def __init__(self):
+        self.successor_calls = 0
+        self.candidates = 0
+        self.rejections = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.levels = {}
+
+    def record_level(self, size, trees, treeid_size, seconds):
+        """Record a completed level of the enumeration."""
+        self.levels[size] = LevelStats(trees, treeid_size, seconds)
+
+    @property
+    def total_seconds(self):
+        """Time spent in all recorded levels."""
+        return sum(level.seconds for level in self.levels.values())
+
+    def as_dict(self):
+        """Return the counters as a JSON-friendly dict."""
+        return {
+            'successor_calls': self.successor_calls,
+            'candidates': self.candidates,
+            'rejections': self.rejections,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'levels': {size: level._asdict() for size, level in sorted(self.levels.items())},
+        }
+
+    def format(self):
+        """Return a human-readable report."""
+        lines = [
+            f"successor calls: {self.successor_calls}",
+            f"candidates:      {self.candidates}",
+            f"rejections:      {self.rejections}",
+            f"treeid hits:     {self.cache_hits}",
+            f"treeid misses:   {self.cache_misses}",
+            "",
+            f"{'size':>4} {'trees':>10} {'treeid':>10} {'time (ms)':>10}",
+        ]
+        for size, level in sorted(self.levels.items()):
+            lines.append(f"{size:>4} {level.trees:>10} {level.treeid_size:>10} "
+                         f"{level.seconds * 1000:>10.3f}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (f"EnumerationStats(successor_calls={self.successor_calls}, "
+                f"rejections={self.rejections}, levels={len(self.levels)})")
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Operadic grafting of rooted trees with a memoized composition table.
+
+Rooted trees form an operad whose inputs are the leaves: t o_i s glues the
+root of s onto the i-th leaf of t, giving a tree with |t| + |s| - 1 nodes.
+The single node is the identity, both as t (it is its own only leaf) and
+as s.  Leaves are numbered in the preorder of t's canonical level sequence
+(see levelseq.canonical_form), so leaf i means the same leaf for every
+way of writing t.
+
+Trees are interned: every distinct shape gets an id, and a tree is stored
+as the ids of its children in canonical order (decreasing level sequence).
+Grafting into a child only changes that child, so t o_i s re-interns the
+nodes on the path from the root to leaf i and nothing else:
+
+    B+(t1 ... tk) o_i s = B+(t1 ... (tj o_i' s) ... tk)
+
+where tj holds leaf i and i' is its index within tj.  Every step of that
+recursion is cached in the composition table {(t, i, s): id}, so the
+grafts of all trees of one size share the work done for their subtrees.
+
+Leaves swapped by a symmetry of t give the same result; leaf_orbits()
+lists one leaf per class with its multiplicity, and the bulk grafts()
+only composes those.
+"""
+
+import sys
+from collections import defaultdict, namedtuple
+
+from .levelseq import _under_root, generate_level_sequences
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize'])
+
+
+class GraftingEngine:
+    """
+    Interned rooted trees with memoized operadic grafting.
+
+    Example:
+        engine = GraftingEngine()
+        t = engine.tree_id(((), ((),)))
+        engine.tree(engine.graft(t, 1, engine.tree_id(((),))))
+    """
+
+    def __init__(self):
+        # Tree ids: canonical child-id tuple <-> id; id 0 is the single node
+        self._ids = {(): 0}
+        self.children = [()]
+        self.sizes = [1]
+        self.leaves = [1]
+        self._forms = [b"\x00"]
+        self._tuples = [()]
+        self._orbits = {0: ((0, 1),)}
+        self._by_size = {}
+        self._table = {}
+        self._hits = self._misses = 0
+
+    def intern(self, children):
+        """Id of the tree whose root has the given child ids (in any order)."""
+        forms = self._forms
+        key = tuple(sorted(children, key=forms.__getitem__, reverse=True))
+        tree = self._ids.get(key)
+        if tree is None:
+            tree = self._ids[key] = len(self.children)
+            self.children.append(key)
+            self.sizes.append(1 + sum(self.sizes[c] for c in key))
+            self.leaves.append(sum(self.leaves[c] for c in key))
+            # Depths are stored one per byte, as in canonical_form()
+            self._forms.append(_under_root([forms[c] for c in key]))
+            self._tuples.append(tuple([self._tuples[c] for c in key]))
+        return tree
+
+    def tree_id(self, tree):
+        """Id of a tree given as nested tuples (children in any order)."""
+        # Iterative post-order, so deep paths do not hit the recursion limit
+        ids = {}
+        stack = [(tree, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                ids[id(node)] = self.intern([ids[id(c)] for c in node])
+            else:
+                stack.append((node, True))
+                stack.extend((c, False) for c in node)
+        return ids[id(tree)]
+
+    def tree(self, tree_id):
+        """Canonical nested tuple of a tree id."""
+        return self._tuples[tree_id]
+
+    def level_sequence(self, tree_id):
+        """Canonical level sequence of a tree id, as bytes."""
+        return self._forms[tree_id]
+
+    def levels_id(self, levels):
+        """Id of a tree given as a level sequence."""
+        # Open nodes from the root down, each with the ids of its finished children
+        stack = [[]]
+        for depth in levels[1:]:
+            while len(stack) > depth:
+                finished = stack.pop()
+                stack[-1].append(self.intern(finished))
+            stack.append([])
+        while len(stack) > 1:
+            finished = stack.pop()
+            stack[-1].append(self.intern(finished))
+        return self.intern(stack[0])
+
+    def trees(self, n):
+        """Ids of all trees with n nodes, in level-sequence order (kept per size)."""
+        trees = self._by_size.get(n)
+        if trees is None:
+            trees = self._by_size[n] = [self.levels_id(levels)
+                                        for levels in generate_level_sequences(n)]
+        return trees
+
+    def graft(self, t, leaf, s):
+        """
+        Graft s onto a leaf of t (t o_leaf s).
+
+        Args:
+            t: Tree id receiving s
+            leaf: Index of the leaf of t, in canonical preorder
+            s: Tree id whose root replaces the leaf
+
+        Returns:
+            Id of the composite tree
+
+        Raises:
+            IndexError: If t has no such leaf
+        """
+        if not 0 <= leaf < self.leaves[t]:
+            raise IndexError(f"leaf index {leaf} out of range for a tree with "
+                             f"{self.leaves[t]} leaves")
+        return self._graft(t, leaf, s)
+
+    def _graft(self, t, leaf, s):
+        if t == 0:
+            return s
+        if s == 0:
+            return t
+        key = (t, leaf, s)
+        result = self._table.get(key)
+        if result is not None:
+            self._hits += 1
+            return result
+        self._misses += 1
+        children = self.children[t]
+        leaves = self.leaves
+        position = 0
+        while leaf >= leaves[children[position]]:
+            leaf -= leaves[children[position]]
+            position += 1
+        grafted = self._graft(children[position], leaf, s)
+        result = self._table[key] = self.intern(
+            children[:position] + (grafted,) + children[position + 1:])
+        return result
+
+    def leaf_orbits(self, t):
+        """
+        Leaves of t up to symmetry.
+
+        Returns:
+            Tuple of (leaf index, number of leaves in its class); grafting
+            onto any leaf of a class gives the same tree
+        """
+        orbits = self._orbits.get(t)
+        if orbits is None:
+            orbits = []
+            offset = 0
+            children = self.children[t]
+            for position, child in enumerate(children):
+                # Copies of one subtree are adjacent; the first stands for all
+                if position == 0 or children[position - 1] != child:
+                    copies = children.count(child)
+                    orbits.extend((offset + leaf, count * copies)
+                                  for leaf, count in self.leaf_orbits(child))
+                offset += self.leaves[child]
+            orbits = self._orbits[t] = tuple(orbits)
+        return orbits
+
+    def grafts(self, i, j):
+        """
+        Every graft of a tree with i nodes and a tree with j nodes.
+
+        Yields:
+            (t, s, {result id: number of leaves of t giving it}) for every
+            pair of tree ids, in level-sequence order
+        """
+        inputs = self.trees(j)
+        for t in self.trees(i):
+            orbits = self.leaf_orbits(t)
+            for s in inputs:
+                results = defaultdict(int)
+                for leaf, count in orbits:
+                    results[self._graft(t, leaf, s)] += count
+                yield t, s, dict(results)
+
+    def cache_info(self):
+        """Composition table statistics as a CacheInfo."""
+        return CacheInfo(self._hits, self._misses, len(self._table))
+
+    def cache_clear(self):
+        """Drop the composition table (tree ids are kept)."""
+        self._table.clear()
+        self._hits = self._misses = 0
+
+
+_default_engine = GraftingEngine()
+
+
+def graft(t, leaf_index, s):
+    """
+    Graft tree s onto a leaf of tree t.
+
+    Uses a module-level engine, so the composition table is shared between
+    calls.
+
+    Args:
+        t, s: Trees as nested tuples, children in any order
+        leaf_index: Leaf of t, counted in the preorder of its canonical
+                    level sequence
+
+    Returns:
+        The composite tree as a canonical nested tuple
+
+    Examples:
+        >>> graft(((), ()), 0, ((),))
+        (((),), ())
+    """
+    engine = _default_engine
+    return engine.tree(engine.graft(engine.tree_id(t), leaf_index, engine.tree_id(s)))
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Graft every tree with i nodes onto every tree with j nodes'
+    )
+    parser.add_argument('sizes', type=int, nargs='*', metavar='SIZE',
+                        help='Sizes i and j of the receiving and grafted trees')
+    parser.add_argument('--max-size', type=int,
+                        help='Instead: all sizes with i + j - 1 <= MAX_SIZE')
+    args = parser.parse_args()
+    if args.max_size is not None:
+        if args.sizes:
+            parser.error("give either SIZE SIZE or --max-size")
+        pairs = [(i, total + 1 - i) for total in range(1, args.max_size + 1)
+                 for i in range(1, total + 1)]
+    elif len(args.sizes) == 2:
+        pairs = [tuple(args.sizes)]
+    else:
+        parser.error("give two sizes or --max-size")
+    if any(size < 1 for pair in pairs for size in pair):
+        parser.error("sizes must be positive")
+
+    engine = GraftingEngine()
+    start = time.perf_counter()
+    by_total = defaultdict(lambda: [0, 0, set()])
+    for i, j in pairs:
+        stats = by_total[i + j - 1]
+        for t, s, results in engine.grafts(i, j):
+            stats[0] += sum(results.values())
+            stats[1] += len(engine.leaf_orbits(t))
+            stats[2].update(results)
+    elapsed = time.perf_counter() - start
+
+    out = sys.stdout
+    for total in sorted(by_total):
+        grafts, orbits, results = by_total[total]
+        out.write(f"size {total}: {grafts} grafts ({orbits} up to symmetry) "
+                  f"-> {len(results)} distinct trees\n")
+    info = engine.cache_info()
+    lookups = info.hits + info.misses
+    rate = info.hits / lookups * 100 if lookups else 0.0
+    print(f"{len(engine.children)} trees interned in {elapsed:.3f}s", file=sys.stderr)
+    print(f"composition table: {info.hits} hits, {info.misses} misses ({rate:.1f}% hits), "
+          f"{info.currsize} entries", file=sys.stderr)
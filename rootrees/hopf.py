@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Connes-Kreimer Hopf algebra of rooted trees: coproduct and antipode.
+
+Forests (commutative products of trees) are sorted tuples of tree ids, the
+empty forest () being the unit 1.  Linear combinations are sparse dicts
+{forest: coefficient} and tensors are dicts {(pruned, trunk): coefficient}.
+
+The coproduct sums over admissible cuts c of t:
+
+    Delta(t) = t (x) 1 + 1 (x) t + sum_c P^c(t) (x) R^c(t)
+
+Enumerating cuts is exponential (a star with k leaves has 2^k), but with
+B+ grafting a forest onto a new root,
+
+    Delta(B+(t1 ... tk)) = t (x) 1 + (id (x) B+) (Delta(t1) ... Delta(tk))
+
+so Delta(t) follows from the coproducts of the children, and equal cuts
+collapse into one term with a coefficient.  The antipode uses the forest
+formula instead of the recursion S(t) = -t - sum_c S(P^c) R^c and its
+products of antipodes:
+
+    S(t) = -sum_C (-1)^|C| (the forest left by deleting the edges C)
+
+over all edge sets C, admissible or not.  The signed sum over edge sets
+follows the same pattern: each child edge is either kept (the child's
+root component joins the root's) or deleted (sign -1).  Both recursions
+are memoized per canonical subtree id, so every distinct subtree shape is
+expanded once per engine.
+"""
+
+import sys
+from collections import defaultdict, namedtuple
+
+from .levelseq import generate_level_sequences, level_sequence_to_tree
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize'])
+
+
+def _merge(a, b):
+    """Product of two forests."""
+    if not a:
+        return b
+    if not b:
+        return a
+    return tuple(sorted(a + b))
+
+
+def _tensor_product(x, y):
+    """Product of two {(forest, forest): coefficient} dicts."""
+    product = defaultdict(int)
+    for (p1, r1), c1 in x.items():
+        for (p2, r2), c2 in y.items():
+            # _merge inlined: this loop dominates the running time
+            pruned = tuple(sorted(p1 + p2)) if p1 and p2 else p1 or p2
+            trunk = tuple(sorted(r1 + r2)) if r1 and r2 else r1 or r2
+            product[pruned, trunk] += c1 * c2
+    return product
+
+
+class HopfEngine:
+    """
+    Coproduct and antipode on rooted trees, memoized by subtree id.
+
+    Example:
+        hopf = HopfEngine()
+        t = hopf.tree_id(((), ((),)))
+        hopf.format_tensor(hopf.coproduct(t))
+    """
+
+    def __init__(self):
+        # Tree ids: sorted child-id tuple <-> id; id 0 is the single node
+        self._ids = {(): 0}
+        self.children = [()]
+        self.sizes = [1]
+        self._parens = ["()"]
+        self._coproducts = {}
+        # tree id -> {(forest cut off, root component id): signed count}
+        self._edge_cuts = {}
+        self._antipodes = {}
+        self._hits = {'coproduct': 0, 'antipode': 0}
+        self._misses = {'coproduct': 0, 'antipode': 0}
+
+    def graft(self, forest):
+        """B+: the id of the tree whose root has the given forest as children."""
+        tree = self._ids.get(forest)
+        if tree is None:
+            tree = self._ids[forest] = len(self.children)
+            self.children.append(forest)
+            self.sizes.append(1 + sum(self.sizes[c] for c in forest))
+            self._parens.append("(" + "".join(self._parens[c] for c in forest) + ")")
+        return tree
+
+    def tree_id(self, tree):
+        """Canonical id of a tree given as nested tuples (children in any order)."""
+        # Iterative post-order, so deep paths do not hit the recursion limit
+        ids = {}
+        stack = [(tree, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                ids[id(node)] = self.graft(tuple(sorted(ids[id(c)] for c in node)))
+            else:
+                stack.append((node, True))
+                stack.extend((c, False) for c in node)
+        return ids[id(tree)]
+
+    def tree(self, tree_id):
+        """Parenthesis string of a tree id."""
+        return self._parens[tree_id]
+
+    def _lookup(self, table, kind, tree):
+        value = table.get(tree)
+        if value is None:
+            self._misses[kind] += 1
+        else:
+            self._hits[kind] += 1
+        return value
+
+    def coproduct(self, tree):
+        """
+        Coproduct of a tree.
+
+        Args:
+            tree: Tree id (see tree_id)
+
+        Returns:
+            Dict {(pruned forest, trunk forest): coefficient}
+        """
+        result = self._lookup(self._coproducts, 'coproduct', tree)
+        if result is not None:
+            return result
+        product = self.forest_coproduct(self.children[tree])
+        result = defaultdict(int)
+        result[(tree,), ()] = 1
+        for (pruned, trunk), coefficient in product.items():
+            result[pruned, (self.graft(trunk),)] += coefficient
+        result = self._coproducts[tree] = dict(result)
+        return result
+
+    def forest_coproduct(self, forest):
+        """Coproduct of a forest: the product of its trees' coproducts."""
+        result = {((), ()): 1}
+        for tree in forest:
+            factor = self.coproduct(tree)
+            result = _tensor_product(result, factor)
+        return result
+
+    def antipode(self, tree):
+        """
+        Antipode of a tree.
+
+        Returns:
+            Dict {forest: coefficient}
+        """
+        result = self._antipodes.get(tree)
+        if result is None:
+            result = defaultdict(int)
+            for (pruned, root), coefficient in self._edge_cut_sum(tree).items():
+                result[_merge(pruned, (root,))] -= coefficient
+            result = self._antipodes[tree] = {f: c for f, c in result.items() if c}
+        return result
+
+    def _edge_cut_sum(self, tree):
+        """Sum of (-1)^|C| (pruned forest, root component) over all edge sets C."""
+        result = self._lookup(self._edge_cuts, 'antipode', tree)
+        if result is not None:
+            return result
+        product = {((), ()): 1}
+        for child in self.children[tree]:
+            factor = defaultdict(int)
+            for (pruned, root), coefficient in self._edge_cut_sum(child).items():
+                factor[pruned, (root,)] += coefficient
+                factor[_merge(pruned, (root,)), ()] -= coefficient
+            product = _tensor_product(product, factor)
+        result = defaultdict(int)
+        for (pruned, kept), coefficient in product.items():
+            if coefficient:
+                result[pruned, self.graft(kept)] += coefficient
+        result = self._edge_cuts[tree] = dict(result)
+        return result
+
+    def forest_antipode(self, forest):
+        """Antipode of a forest: the product of its trees' antipodes."""
+        result = {(): 1}
+        for tree in forest:
+            factor = self.antipode(tree)
+            product = defaultdict(int)
+            for f1, c1 in result.items():
+                for f2, c2 in factor.items():
+                    product[_merge(f1, f2)] += c1 * c2
+            result = product
+        return {f: c for f, c in result.items() if c}
+
+    def count_cuts(self, tree):
+        """
+        Number of terms of the naive coproduct: all admissible cuts,
+        including the empty cut (1 (x) t) and the total cut (t (x) 1).
+        """
+        def cuts(t):
+            # Cuts below t's root, empty cut included
+            total = 1
+            for c in self.children[t]:
+                total *= 1 + cuts(c)
+            return total
+        return cuts(tree) + 1
+
+    def trees(self, n):
+        """Ids of all trees with n nodes, in level-sequence order."""
+        for levels in generate_level_sequences(n):
+            yield self.tree_id(level_sequence_to_tree(levels))
+
+    def bulk(self, n, antipode=True):
+        """
+        Coproduct (and antipode) of every tree with n nodes.
+
+        Yields:
+            (tree id, coproduct, antipode or None)
+        """
+        for tree in self.trees(n):
+            yield tree, self.coproduct(tree), self.antipode(tree) if antipode else None
+
+    def cache_info(self):
+        """Return {'coproduct': CacheInfo, 'antipode': CacheInfo}."""
+        return {
+            'coproduct': CacheInfo(self._hits['coproduct'], self._misses['coproduct'],
+                                   len(self._coproducts)),
+            'antipode': CacheInfo(self._hits['antipode'], self._misses['antipode'],
+                                  len(self._edge_cuts)),
+        }
+
+    def cache_clear(self):
+        """Drop the memoized coproducts and antipodes (tree ids are kept)."""
+        self._coproducts.clear()
+        self._edge_cuts.clear()
+        self._antipodes.clear()
+        for kind in self._hits:
+            self._hits[kind] = self._misses[kind] = 0
+
+    def format_forest(self, forest):
+        """A forest as space-separated trees, or 1 for the empty forest."""
+        return " ".join(self._parens[t] for t in forest) or "1"
+
+    def format_combination(self, combination):
+        """A {forest: coefficient} dict as a signed sum."""
+        return _format_sum((c, self.format_forest(f)) for f, c in sorted(combination.items()))
+
+    def format_tensor(self, tensor):
+        """A {(left, right): coefficient} dict as a sum of 'left (x) right' terms."""
+        return _format_sum((c, f"{self.format_forest(p)} (x) {self.format_forest(r)}")
+                           for (p, r), c in sorted(tensor.items()))
+
+
+def _format_sum(terms):
+    text = []
+    for coefficient, term in terms:
+        sign = "-" if coefficient < 0 else "+"
+        magnitude = abs(coefficient)
+        text.append(f"{sign} {'' if magnitude == 1 else f'{magnitude} '}{term}")
+    if not text:
+        return "0"
+    result = " ".join(text)
+    return result[2:] if result.startswith("+ ") else "-" + result[2:]
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Connes-Kreimer coproduct and antipode of rooted trees'
+    )
+    parser.add_argument('n', type=int, help='Tree size (bulk mode over all trees)')
+    parser.add_argument('--show', action='store_true',
+                        help='Print every coproduct and antipode')
+    parser.add_argument('--no-antipode', action='store_true',
+                        help='Only compute coproducts')
+    args = parser.parse_args()
+
+    hopf = HopfEngine()
+    start = time.perf_counter()
+    trees = cuts = terms = antipode_terms = 0
+    for tree, delta, s in hopf.bulk(args.n, antipode=not args.no_antipode):
+        trees += 1
+        cuts += hopf.count_cuts(tree)
+        terms += len(delta)
+        if s is not None:
+            antipode_terms += len(s)
+        if args.show:
+            print(f"Delta{hopf.tree(tree)} = {hopf.format_tensor(delta)}")
+            if s is not None:
+                print(f"S{hopf.tree(tree)} = {hopf.format_combination(s)}")
+    elapsed = time.perf_counter() - start
+
+    out = sys.stderr if args.show else sys.stdout
+    print(f"{trees} trees with {args.n} nodes in {elapsed:.3f}s", file=out)
+    print(f"coproduct: {cuts} admissible cuts -> {terms} distinct terms", file=out)
+    if not args.no_antipode:
+        print(f"antipode: {antipode_terms} terms", file=out)
+    for kind, info in hopf.cache_info().items():
+        total = info.hits + info.misses
+        rate = info.hits / total * 100 if total else 0.0
+        print(f"{kind} cache: {info.hits} hits, {info.misses} misses ({rate:.1f}% hits), "
+              f"{info.currsize} entries", file=out)
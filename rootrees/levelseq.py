@@ -0,0 +1,303 @@
+"""
+Level-sequence representation of rooted trees.
+
+A rooted tree with n nodes can be written as its level sequence: the depths
+of the nodes in preorder, with the root at depth 0.  For example the tree
+"(()(()))" has the level sequence [0, 1, 1, 2].
+
+The canonical level sequence of a tree is the lexicographically largest one,
+obtained by ordering every node's subtrees by decreasing level sequence.
+Canonical level sequences of size n can be generated in constant amortized
+time with the Beyer-Hedetniemi successor rule, and consecutive sequences
+share long common prefixes, which makes them a good interchange format for
+bulk storage and output.
+"""
+
+
+def generate_level_sequences(n):
+    """
+    Generate the canonical level sequences of all rooted trees with n nodes.
+
+    Uses the Beyer-Hedetniemi successor rule: the sequences are produced in
+    decreasing lexicographic order, starting with the path [0, 1, ..., n-1]
+    and ending with the star [0, 1, 1, ..., 1].
+
+    Args:
+        n: Number of nodes in the trees
+
+    Yields:
+        Level sequences as tuples of depths
+
+    Examples:
+        >>> list(generate_level_sequences(4))
+        [(0, 1, 2, 3), (0, 1, 2, 2), (0, 1, 2, 1), (0, 1, 1, 1)]
+    """
+    for _, levels in generate_level_sequence_changes(n):
+        yield levels
+
+
+def generate_level_sequence_changes(n):
+    """
+    Generate canonical level sequences together with their change position.
+
+    Same order as generate_level_sequences(), but each sequence comes paired
+    with the index of its first position that differs from the previous
+    sequence (0 for the first one).  Consumers that cache per-prefix work,
+    such as the bulk writer, can skip recomputing the shared prefix.
+
+    Args:
+        n: Number of nodes in the trees
+
+    Yields:
+        (change position, level sequence tuple) pairs
+    """
+    if n < 1:
+        return
+
+    levels = list(range(n))
+    yield 0, tuple(levels)
+
+    # p is the last position whose node is not a child of the root
+    p = n - 1
+    while True:
+        while p > 0 and levels[p] <= 1:
+            p -= 1
+        if p == 0:
+            return
+
+        # q is the parent of node p; copy the subtree pattern starting at q
+        target = levels[p] - 1
+        q = p - 1
+        while levels[q] != target:
+            q -= 1
+        shift = p - q
+        for i in range(p, n):
+            levels[i] = levels[i - shift]
+        yield p, tuple(levels)
+        p = n - 1
+
+
+def tree_to_level_sequence(tree):
+    """
+    Convert a tree given as nested tuples into its level sequence.
+
+    The children are visited in the order they appear in the tuple, so the
+    result is canonical only when the tuple is.
+
+    Args:
+        tree: Tree represented as nested tuple
+
+    Returns:
+        List of node depths in preorder
+    """
+    levels = []
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        levels.append(depth)
+        for child in reversed(node):
+            stack.append((child, depth + 1))
+    return levels
+
+
+def level_sequence_to_tree(levels):
+    """
+    Convert a level sequence into a tree represented as nested tuples.
+
+    Args:
+        levels: Node depths in preorder, starting with 0
+
+    Returns:
+        Tree represented as nested tuple, children in sequence order
+    """
+    # children[d] collects the finished subtrees of the open node at depth d
+    children = [[]]
+    for depth in levels[1:]:
+        while len(children) > depth:
+            done = tuple(children.pop())
+            children[-1].append(done)
+        children.append([])
+    while len(children) > 1:
+        done = tuple(children.pop())
+        children[-1].append(done)
+    return tuple(children[0])
+
+
+def level_sequence_to_parents(levels):
+    """
+    Convert a level sequence into a parent array.
+
+    Args:
+        levels: Node depths in preorder, starting with 0
+
+    Returns:
+        List where entry i is the preorder index of node i's parent
+        (-1 for the root)
+    """
+    parents = [-1] * len(levels)
+    # path[d] is the most recent node seen at depth d
+    path = []
+    for i, depth in enumerate(levels):
+        del path[depth:]
+        if depth:
+            parents[i] = path[-1]
+        path.append(i)
+    return parents
+
+
+def parents_to_level_sequence(parents):
+    """
+    Convert a preorder parent array back into a level sequence.
+
+    Args:
+        parents: Parent index per node in preorder (-1 for the root)
+
+    Returns:
+        List of node depths
+    """
+    levels = [0] * len(parents)
+    for i in range(1, len(parents)):
+        levels[i] = levels[parents[i]] + 1
+    return levels
+
+
+def level_sequence_to_string(levels, style='parens'):
+    """
+    Convert a level sequence to string representation.
+
+    Produces the same output as tree_to_string() for the corresponding tree,
+    without building the nested tuple first.
+
+    Args:
+        levels: Node depths in preorder, starting with 0
+        style: Output style - 'parens' for parentheses, 'brackets' for mixed brackets
+
+    Returns:
+        String representation of the tree
+    """
+    if style == 'brackets':
+        opens, closes = "([{", ")]}"
+    else:
+        opens, closes = "(((", ")))"
+
+    out = []
+    prev = -1
+    for depth in levels:
+        for d in range(prev, depth - 1, -1):
+            out.append(closes[d % 3])
+        out.append(opens[depth % 3])
+        prev = depth
+    for d in range(prev, -1, -1):
+        out.append(closes[d % 3])
+    return "".join(out)
+
+
+def common_prefix_length(a, b):
+    """
+    Return the length of the longest common prefix of two sequences.
+
+    Compares slices by bisection, so for bytes-like inputs the work is done
+    by memcmp rather than a Python-level loop.
+
+    Args:
+        a, b: Sequences supporting slicing and equality (bytes, tuples, lists)
+
+    Returns:
+        Number of leading positions where a and b agree
+    """
+    lo, hi = 0, min(len(a), len(b))
+    if a[:hi] == b[:hi]:
+        return hi
+    # invariant: a[:lo] == b[:lo] and a[:hi] != b[:hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+# Adds one to every depth byte of a canonical form
+_DEEPER = bytes(range(1, 256)) + b"\xff"
+
+# Depths are stored one per byte in canonical forms
+MAX_FORM_DEPTH = 255
+
+
+def _under_root(forms):
+    """
+    Canonical form of a root above the given child forms (already ordered).
+
+    Raises:
+        ValueError: If the tree would be deeper than MAX_FORM_DEPTH
+    """
+    joined = b"".join(forms)
+    # A child already reaching the deepest byte value cannot go one deeper
+    if b"\xff" in joined:
+        raise ValueError(f"tree is more than {MAX_FORM_DEPTH} levels deep; "
+                         f"canonical forms store one depth per byte")
+    return b"\x00" + joined.translate(_DEEPER)
+
+
+def canonical_form(tree, memo=None):
+    """
+    Return the canonical level sequence of a nested-tuple tree as bytes.
+
+    Isomorphic trees give equal results, whatever the order of their
+    children: every node's subtrees are sorted by decreasing level sequence,
+    which yields the lexicographically largest level sequence.  This is the
+    sequence generate_level_sequences() produces for the tree.  Depths are
+    stored one per byte, so trees can be at most MAX_FORM_DEPTH levels
+    deep; deeper trees raise ValueError (use tree_to_level_sequence for
+    those).  Works without recursion.
+
+    Args:
+        tree: Tree represented as nested tuple, children in any order
+        memo: Optional dict caching the forms of subtrees; callers
+              enumerating many trees can pass one (and bound its size)
+
+    Returns:
+        Canonical level sequence as bytes
+
+    Raises:
+        ValueError: If the tree is more than MAX_FORM_DEPTH levels deep
+
+    Examples:
+        >>> canonical_form(((), ((),)))
+        b'\\x00\\x01\\x02\\x01'
+    """
+    if memo is None:
+        memo = {}
+    if not tree:
+        return b"\x00"
+
+    # Post-order over the subtrees below the root; each form is memoized
+    stack = [(child, False) for child in tree]
+    while stack:
+        node, done = stack.pop()
+        if node in memo:
+            continue
+        if not node:
+            memo[node] = b"\x00"
+        elif done:
+            memo[node] = _under_root(sorted((memo[child] for child in node), reverse=True))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node)
+    # The whole tree is not stored: only its subtrees are worth reusing
+    return _under_root(sorted((memo[child] for child in tree), reverse=True))
+
+
+def canonical_level_sequence(levels):
+    """
+    Return the canonical (lexicographically largest) level sequence of the
+    tree described by any level sequence.
+
+    Args:
+        levels: Node depths in preorder, starting with 0
+
+    Returns:
+        Canonical level sequence as a tuple
+    """
+    return tuple(canonical_form(level_sequence_to_tree(levels)))
@@ -25,4 +25,5 @@ def replace_brackets(s):
 			out.append(")]}"[depth%3])
 	return "".join(out)
 
-for x in bags(5): print(replace_brackets(x[1]))
+if __name__ == '__main__':
+	for x in bags(5): print(replace_brackets(x[1]))
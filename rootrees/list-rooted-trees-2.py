@@ -47,4 +47,5 @@ def trees(n):
 
 def tostr(x): return "(" + "".join(map(tostr, x)) + ")"
 
-for x in trees(5): print(tostr(x))
+if __name__ == '__main__':
+    for x in trees(5): print(tostr(x))
@@ -20,57 +20,108 @@ We maintain canonical ordering: when replacing a subtree, the replacement must
 not be larger than the next smallest subtree.
 """
 
+import time
+
 treeid = {(): 0}
 
-def succ(x):
-    """Generate all canonical successors of tree x."""
+def succ(x, stats=None):
+    """Generate all canonical successors of tree x (counted into stats if given)."""
+    if stats is not None: stats.successor_calls += 1
     yield(((),) + x)
     if not x: return
 
     if len(x) == 1:
-        for i in succ(x[0]): yield((i,))
+        for i in succ(x[0], stats): yield((i,))
         return
 
     head, rest = x[0], tuple(x[1:])
     top = treeid[rest[0]]
 
-    for i in [i for i in succ(head) if treeid[i] <= top]:
+    candidates = list(succ(head, stats))
+    accepted = [i for i in candidates if treeid[i] <= top]
+    if stats is not None:
+        stats.candidates += len(candidates)
+        stats.cache_hits += len(candidates)
+        stats.rejections += len(candidates) - len(accepted)
+    for i in accepted:
         yield((i,) + rest)
 
-def trees(n):
-    """Generate all rooted trees with n nodes."""
+def trees(n, stats=None):
+    """
+    Generate all rooted trees with n nodes.
+
+    With a genstats.EnumerationStats object as stats, successor calls,
+    rejections and treeid growth are counted along the way.  The levels are
+    streamed through each other, so a level's time excludes the time spent
+    producing the level below and consuming its output.  A level completes
+    only after the levels above have consumed its trees, so its treeid size
+    is len(treeid) less the ids those levels assigned in this enumeration.
+    """
+    return _trees(n, stats, [0] * (n + 1) if stats is not None else None)
+
+def _trees(n, stats, assigned):
+    """trees(); assigned[k] counts the ids given to trees with k nodes."""
+    global treeid
     if n == 1:
+        if stats is not None: stats.record_level(1, 1, len(treeid) - sum(assigned[2:]), 0.0)
         yield()
         return
 
-    global treeid
-    for x in trees(n-1):
-        for a in succ(x):
-            if not a in treeid: treeid[a] = len(treeid)
+    counting = stats is not None
+    clock = time.perf_counter
+    count = 0
+    elapsed = 0.0
+    for x in _trees(n-1, stats, assigned):
+        if counting: started = clock()
+        for a in succ(x, stats):
+            if not a in treeid:
+                treeid[a] = len(treeid)
+                if counting:
+                    stats.cache_misses += 1
+                    assigned[n] += 1
+            elif counting:
+                stats.cache_hits += 1
+            if counting:
+                count += 1
+                elapsed += clock() - started
             yield(a)
+            if counting: started = clock()
+        if counting: elapsed += clock() - started
+    if counting:
+        stats.record_level(n, count, len(treeid) - sum(assigned[n+1:]), elapsed)
 
 def tostr(x):
     """Convert tree representation to parentheses notation."""
     return "(" + "".join(map(tostr, x)) + ")"
 
 if __name__ == "__main__":
+    import argparse
+    import os
     import sys
-    
-    # Default: show trees with 5 nodes
-    n = 5
-    if len(sys.argv) > 1:
-        try:
-            n = int(sys.argv[1])
-            if n < 1:
-                raise ValueError("n must be positive")
-        except ValueError as e:
-            print(f"Usage: {sys.argv[0]} [n]", file=sys.stderr)
-            print(f"  n: number of nodes (default: 5, must be positive)", file=sys.stderr)
-            sys.exit(1)
-    
-    count = 0
-    for x in trees(n):
-        print(tostr(x))
-        count += 1
-    
-    print(f"Number of {n}-trees: {count}", file=sys.stderr)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from rootrees.bulkwrite import FORMATS, BulkTreeWriter
+
+    parser = argparse.ArgumentParser(description="List all rooted trees with n nodes.")
+    parser.add_argument("n", nargs="?", type=int, default=5,
+                        help="number of nodes (default: 5, must be positive)")
+    parser.add_argument("--format", choices=FORMATS, default="parens",
+                        help="output format (default: parens)")
+    parser.add_argument("--stats", action="store_true",
+                        help="count successor calls, rejections and treeid "
+                             "growth per level, and print them to stderr")
+    args = parser.parse_args()
+    n = args.n
+    if n < 1:
+        parser.error("n must be positive")
+
+    stats = None
+    if args.stats:
+        from rootrees.genstats import EnumerationStats
+        stats = EnumerationStats()
+
+    with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+        writer.write_trees(trees(n, stats))
+
+    print(f"Number of {n}-trees: {writer.count}", file=sys.stderr)
+    if stats is not None:
+        print(stats.format(), file=sys.stderr)
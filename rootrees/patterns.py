@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Counting pattern occurrences over all rooted trees of a size.
+
+A pattern P occurs at a node v of a tree T when P can be mapped into the
+subtree below v: the root of P goes to v, and the children of every
+pattern node go to distinct children of its image (rooted subtree
+isomorphism; T may have more children and deeper subtrees than P).  For
+every n this module gives
+
+    trees:        how many of the a(n) trees with n nodes contain P
+    occurrences:  the number of nodes v, summed over all those trees,
+                  at which P occurs
+
+without enumerating any tree, so n can be in the hundreds.
+
+The counts come from a bottom-up tree automaton.  The state of a node is
+the set of distinct subtrees of P that occur at it, which only depends on
+the multiset of its children's states, and only on how many children of
+each state there are up to the largest number of children in P (a
+bipartite matching decides which pattern subtrees fit).  With A_S(x) the
+generating function of the trees whose root has state S,
+
+    A_S(x) = x * [multisets of children whose states give S]
+
+where the multisets of exactly c children of state S are the cycle index
+Z(Sym_c) evaluated at A_S(x), A_S(x^2), ..., and those of any number are
+the Euler transform exp(sum A_S(x^i) / i).  With a single state this is
+the A000081 recurrence of optimized.count_rooted_trees.  The children's
+states are combined one state at a time, keeping for every pattern
+subtree the sub-multisets of its children that can already be matched.
+
+The trees containing P are all trees minus those built only from states
+without P.  Occurrences mark every node whose state holds P with u; the
+derivative in u at u = 1 follows the same recurrences with the product
+rule, and counts nodes, not nodes up to symmetry.
+
+Usage:
+    python3 -m rootrees.patterns "(()(()))" 100
+    python3 -m rootrees.patterns "(()())" "((()))" 30 --series --check 10
+"""
+
+import sys
+from collections import Counter, namedtuple
+from operator import mul
+
+from .levelseq import canonical_form, level_sequence_to_string, level_sequence_to_tree
+from .optimized import generate_rooted_trees
+from .treeparse import parse_tree
+
+
+PatternCounts = namedtuple('PatternCounts', ['trees', 'occurrences'])
+
+
+def pattern_tree(pattern):
+    """
+    Nested-tuple tree of a pattern.
+
+    Args:
+        pattern: Nested tuple, level sequence (list or tuple of ints),
+                 canonical form (bytes) or tree string such as "(()(()))"
+    """
+    if isinstance(pattern, str):
+        return parse_tree(pattern)
+    if isinstance(pattern, (bytes, bytearray, list)):
+        return level_sequence_to_tree(list(pattern))
+    if pattern and all(isinstance(depth, int) for depth in pattern):
+        return level_sequence_to_tree(pattern)
+    return pattern
+
+
+def occurrences(tree, pattern):
+    """
+    Number of nodes of a tree at which the pattern occurs, by matching.
+
+    Args:
+        tree: Nested tuple (as yielded by generate_rooted_trees)
+        pattern: Pattern in any form accepted by pattern_tree()
+    """
+    pattern = pattern_tree(pattern)
+    memo = {}
+
+    def fits(p, node):
+        # The children of p go to distinct children of node
+        key = (p, node)
+        result = memo.get(key)
+        if result is None:
+            result = len(p) <= len(node) and assign(sorted(p, key=len, reverse=True), node, set())
+            memo[key] = result
+        return result
+
+    def assign(needed, node, used):
+        if not needed:
+            return True
+        first, rest = needed[0], needed[1:]
+        for i, child in enumerate(node):
+            if i not in used and fits(first, child):
+                used.add(i)
+                if assign(rest, node, used):
+                    return True
+                used.discard(i)
+        return False
+
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += fits(pattern, node)
+        stack.extend(node)
+    return count
+
+
+class PatternCounter:
+    """
+    Counts the trees containing a pattern, and its occurrences, for every
+    size up to n.
+
+    Example:
+        counter = PatternCounter("(()(()))")
+        counter.count(100)              # PatternCounts(trees=..., occurrences=...)
+        counter.series(20)[7]
+    """
+
+    def __init__(self, pattern):
+        tree = pattern_tree(pattern)
+        self.form = canonical_form(tree)
+        self.size = len(self.form)
+        # Distinct subtrees of the pattern, children before parents
+        ids = {}
+        needs = []
+
+        def visit(node):
+            kids = [visit(child) for child in node]
+            form = canonical_form(node)
+            if form not in ids:
+                ids[form] = len(needs)
+                needs.append(Counter(kids))
+            return ids[form]
+
+        self.root = visit(tree)
+        # For each pattern subtree: its distinct child classes and how many of each
+        self._kinds = [tuple(sorted(need)) for need in needs]
+        self._caps = [tuple(need[k] for k in kinds) for need, kinds in zip(needs, self._kinds)]
+        self._degree = max(sum(caps) for caps in self._caps)
+        self._start = tuple(frozenset([(0,) * len(kinds)]) for kinds in self._kinds)
+        self._extended = {}
+        self._series = None
+
+    def _extend(self, family, state, count):
+        """
+        Matchable sub-multisets of every pattern subtree's children after
+        adding count children of the given state (bit mask of subtrees).
+        """
+        key = (family, state, count)
+        result = self._extended.get(key)
+        if result is not None:
+            return result
+        result = []
+        for options, kinds, caps in zip(family, self._kinds, self._caps):
+            usable = [j for j, k in enumerate(kinds) if state >> k & 1]
+            if caps in options or not usable or not count:
+                result.append(options)
+                continue
+            grown = set(options)
+            frontier = options
+            for _ in range(count):
+                frontier = {r[:j] + (r[j] + 1,) + r[j + 1:]
+                            for r in frontier for j in usable if r[j] < caps[j]}
+                if not frontier:
+                    break
+                grown |= frontier
+            result.append(frozenset(grown))
+        result = self._extended[key] = tuple(result)
+        return result
+
+    def _state(self, family):
+        """State (bit mask of the pattern subtrees that occur) of a finished node."""
+        return sum(1 << q for q, (options, caps) in enumerate(zip(family, self._caps))
+                   if caps in options)
+
+    def _layers(self, states):
+        """
+        Combine the children's states one at a time.
+
+        Returns:
+            (layers, results): layers[i] lists the edges (source, count,
+            target) between the families before and after state i;
+            results maps each final family to the state it gives
+        """
+        families = [self._start]
+        layers = []
+        for state in states:
+            index = {}
+            edges = []
+            for source, family in enumerate(families):
+                for count in range(self._degree + 1):
+                    target = self._extend(family, state, count)
+                    edges.append((source, count, index.setdefault(target, len(index))))
+            layers.append(edges)
+            families = list(index)
+        return layers, [self._state(family) for family in families]
+
+    def _reachable(self, avoid):
+        """States of all trees (or of the trees without the pattern), to a fixpoint."""
+        forbidden = 1 << self.root if avoid else 0
+        states = []
+        while True:
+            _, results = self._layers(states)
+            new = sorted({s for s in results if not s & forbidden} - set(states))
+            if not new:
+                return states
+            states += new
+
+    def _run(self, n, avoid):
+        """
+        Coefficients up to x^n of the generating functions of all trees
+        and of their occurrences (or of the trees without the pattern).
+        """
+        states = self._reachable(avoid)
+        layers, results = self._layers(states)
+        index = {state: i for i, state in enumerate(states)}
+        results = [index.get(state) for state in results]
+        marked = [bool(state >> self.root & 1) for state in states]
+        top = self._degree
+        derive = not avoid
+
+        size = len(states)
+        trees = [[0] * (n + 2) for _ in range(size)]
+        marks = [[0] * (n + 2) for _ in range(size)]
+        # Divisor sums for the Euler transform: sum d A_d and sum D_d over d | j
+        weighted = [[0] * (n + 1) for _ in range(size)]
+        divided = [[0] * (n + 1) for _ in range(size)]
+        # Multisets of exactly c children (c < top) and of any number, per state
+        exact = [[[1] + [0] * n if c == 0 else [0] * (n + 1) for c in range(top)]
+                 for _ in range(size)]
+        exact_d = [[[0] * (n + 1) for _ in range(top)] for _ in range(size)]
+        every = [[1] + [0] * n for _ in range(size)]
+        every_d = [[0] * (n + 1) for _ in range(size)]
+        options = [[None] * (top + 1) for _ in range(size)]
+        options_d = [[None] * (top + 1) for _ in range(size)]
+        for s in range(size):
+            for c in range(top):
+                options[s][c], options_d[s][c] = exact[s][c], exact_d[s][c]
+            options[s][top] = [0] * (n + 1)
+            options_d[s][top] = [0] * (n + 1)
+
+        nodes = [[[1] + [0] * n]]
+        nodes_d = [[[0] * (n + 1)]]
+        for edges in layers:
+            width = max(target for _, _, target in edges) + 1
+            nodes.append([[0] * (n + 1) for _ in range(width)])
+            nodes_d.append([[0] * (n + 1) for _ in range(width)])
+
+        for m in range(n):
+            for s in range(size):
+                a, d = trees[s], marks[s]
+                if m:
+                    for j in range(m, n + 1, m):
+                        weighted[s][j] += m * a[m]
+                        divided[s][j] += d[m]
+                    w, e = weighted[s], every[s]
+                    e[m] = sum(map(mul, w[1:m + 1], e[m - 1::-1])) // m
+                    if derive:
+                        every_d[s][m] = sum(map(mul, divided[s][1:m + 1], e[m - 1::-1]))
+                    # h_c = (1/c) sum_i p_i h_(c-i), p_i(x) = A(x^i) (and the
+                    # derivative: p_i' = i D(x^i))
+                    h, hd = exact[s], exact_d[s]
+                    for c in range(1, top):
+                        total = total_d = 0
+                        for i in range(1, c + 1):
+                            for k in range(i, m + 1, i):
+                                total += a[k // i] * h[c - i][m - k]
+                                if derive:
+                                    total_d += i * d[k // i] * h[c - i][m - k] + a[k // i] * hd[c - i][m - k]
+                        h[c][m] = total // c
+                        hd[c][m] = total_d // c
+                rest, rest_d = options[s][top], options_d[s][top]
+                rest[m] = every[s][m] - sum(exact[s][c][m] for c in range(top))
+                rest_d[m] = every_d[s][m] - sum(exact_d[s][c][m] for c in range(top))
+
+            for i, edges in enumerate(layers):
+                before, before_d = nodes[i], nodes_d[i]
+                after, after_d = nodes[i + 1], nodes_d[i + 1]
+                for source, count, target in edges:
+                    f, g = before[source], options[i][count]
+                    after[target][m] += sum(map(mul, f[:m + 1], g[m::-1]))
+                    if derive:
+                        fd, gd = before_d[source], options_d[i][count]
+                        after_d[target][m] += (sum(map(mul, fd[:m + 1], g[m::-1]))
+                                               + sum(map(mul, f[:m + 1], gd[m::-1])))
+
+            for family, s in enumerate(results):
+                if s is not None:
+                    trees[s][m + 1] += nodes[-1][family][m]
+                    marks[s][m + 1] += nodes_d[-1][family][m]
+            for s in range(size):
+                if marked[s]:
+                    marks[s][m + 1] += trees[s][m + 1]
+
+        totals = [sum(a[m] for a in trees) for m in range(n + 1)]
+        return totals, [sum(d[m] for d in marks) for m in range(n + 1)]
+
+    def series(self, n):
+        """
+        PatternCounts(trees, occurrences) for every size 0..n.
+
+        Returns:
+            List of n + 1 PatternCounts; entry m counts the trees with m
+            nodes that contain the pattern, and its occurrences in them
+        """
+        if self._series is None or len(self._series) <= n:
+            rooted, occurred = self._run(n, avoid=False)
+            avoiding, _ = self._run(n, avoid=True)
+            self._series = [PatternCounts(total - free, count)
+                            for total, free, count in zip(rooted, avoiding, occurred)]
+        return self._series[:n + 1]
+
+    def count(self, n):
+        """PatternCounts(trees, occurrences) for the trees with n nodes."""
+        return self.series(n)[n]
+
+
+def count_pattern(pattern, n):
+    """
+    How many trees with n nodes contain the pattern, and how often it occurs.
+
+    Examples:
+        >>> count_pattern("(()())", 5)
+        PatternCounts(trees=8, occurrences=9)
+    """
+    return PatternCounter(pattern).count(n)
+
+
+def count_patterns(patterns, n):
+    """
+    Counts for a batch of patterns.
+
+    Returns:
+        Dict {canonical form (bytes): PatternCounts for size n}; patterns
+        that are the same tree are counted once
+    """
+    counters = {}
+    for pattern in patterns:
+        counter = PatternCounter(pattern)
+        counters.setdefault(counter.form, counter)
+    return {form: counter.count(n) for form, counter in counters.items()}
+
+
+def brute_force_counts(pattern, n):
+    """PatternCounts for size n by matching every tree of generate_rooted_trees(n)."""
+    trees = total = 0
+    for tree in generate_rooted_trees(n):
+        found = occurrences(tree, pattern)
+        trees += found > 0
+        total += found
+    return PatternCounts(trees, total)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Count the trees with n nodes containing a pattern, and its occurrences'
+    )
+    parser.add_argument('patterns', nargs='+', metavar='PATTERN',
+                        help='Pattern trees, e.g. "(()(()))" or "([][{}])"')
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--series', action='store_true',
+                        help='Print the counts for every size up to n')
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help='Compare with matching every tree, for sizes up to N')
+    args = parser.parse_args()
+
+    ok = True
+    for pattern in args.patterns:
+        start = time.perf_counter()
+        counter = PatternCounter(pattern)
+        series = counter.series(args.n)
+        elapsed = time.perf_counter() - start
+        name = level_sequence_to_string(counter.form)
+        print(f"pattern {name} ({counter.size} nodes), {elapsed:.3f}s", file=sys.stderr)
+        for m in (range(1, args.n + 1) if args.series else [args.n]):
+            print(f"{name} n={m}: {series[m].trees} trees, {series[m].occurrences} occurrences")
+        for m in range(1, min(args.check, args.n) + 1):
+            expected = brute_force_counts(pattern, m)
+            if series[m] != expected:
+                ok = False
+                print(f"MISMATCH n={m}: {series[m]} != {expected}", file=sys.stderr)
+        if args.check:
+            print(f"checked sizes 1..{min(args.check, args.n)}: {'ok' if ok else 'MISMATCH'}",
+                  file=sys.stderr)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Plane (ordered) rooted trees bucketed into unordered classes.
+
+There are C(n-1) plane trees with n nodes (Catalan numbers, A000108), one
+per Dyck word with n-1 pairs, and forgetting the order of children maps
+them onto the a(n) unordered rooted trees of A000081 (see j-lang-trees.md).
+This module streams every plane tree and counts how many fall into each
+unordered class.
+
+Plane trees are enumerated as level sequences (depths in preorder, every
+depth at most one more than the previous), which is the same as a Dyck
+word: a step down is '(' and the closing parentheses follow from the
+depths.  The sequences are produced by an odometer that changes a suffix
+at a time, and the canonicalizer keeps the state of the partial tree
+(the child lists of the open nodes on the current path) before every
+position, so each new tree only re-reads the suffix that changed.
+
+Closing a node interns the sorted tuple of its children's subtree ids,
+so canonical forms are found by integer sorting instead of comparing
+strings, and isomorphic subtrees get the same id.  The level sequences
+are split by prefix into tasks for worker processes; each worker has its
+own ids, which are translated into canonical level sequences
+(levelseq.canonical_form) before the buckets are merged.
+
+Usage:
+    python3 -m rootrees.planetrees 12
+    python3 -m rootrees.planetrees 15 --jobs 8 --show
+"""
+
+import os
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import comb, factorial
+
+from .levelseq import _under_root, level_sequence_to_string, level_sequence_to_parents
+from .optimized import count_rooted_trees
+
+
+def catalan(k):
+    """The k-th Catalan number: plane trees with k+1 nodes."""
+    return comb(2 * k, k) // (k + 1)
+
+
+def _odometer(n, prefix):
+    """Yield (levels, first position that changed) for every completion of prefix."""
+    p = len(prefix)
+    levels = list(prefix[:n]) + [1] * (n - p)
+    j = 1
+    while True:
+        yield levels, j
+        # Advance the last position that can still go deeper
+        j = n - 1
+        while j >= p and levels[j] == levels[j - 1] + 1:
+            j -= 1
+        if j < p:
+            return
+        levels[j] += 1
+        levels[j + 1:] = [1] * (n - j - 1)
+
+
+def generate_plane_trees(n, prefix=(0,)):
+    """
+    Generate every plane rooted tree with n nodes as a level sequence.
+
+    Args:
+        n: Number of nodes
+        prefix: Only generate the trees whose level sequence starts with
+                this (itself a valid plane level sequence)
+
+    Yields:
+        The same list, updated in place for each tree: copy it to keep it
+    """
+    if n < 1:
+        return
+    for levels, _ in _odometer(n, prefix):
+        yield levels
+
+
+def generate_dyck_words(k):
+    """
+    Generate every Dyck word with k pairs of parentheses.
+
+    These are the plane trees with k+1 nodes without the root's own pair,
+    in the order of their level sequences (from ()()...() to ((...))).
+    """
+    for levels in generate_plane_trees(k + 1):
+        yield level_sequence_to_string(levels)[1:-1]
+
+
+def count_plane_embeddings(levels):
+    """
+    Number of plane trees in the class of a tree: the product over all
+    nodes of k! / (m1! m2! ...) for k children in groups of m1, m2, ...
+    isomorphic subtrees.
+    """
+    parents = level_sequence_to_parents(levels)
+    forms = [b"\x00"] * len(levels)
+    children = defaultdict(list)
+    # Children come after their parents in preorder: build forms bottom up
+    for v in range(len(levels) - 1, -1, -1):
+        kids = sorted(children[v], reverse=True)
+        if kids:
+            forms[v] = _under_root(kids)
+        if parents[v] >= 0:
+            children[parents[v]].append(forms[v])
+    total = 1
+    for kids in children.values():
+        total *= factorial(len(kids))
+        for copies in Counter(kids).values():
+            total //= factorial(copies)
+    return total
+
+
+class PlaneCanonicalizer:
+    """
+    Maps plane trees to unordered classes through interned subtree ids.
+
+    Example:
+        canonicalizer = PlaneCanonicalizer()
+        buckets = canonicalizer.bucket(8)       # {class id: plane trees}
+        canonicalizer.form(next(iter(buckets)))
+    """
+
+    def __init__(self):
+        # Sorted child-id tuple <-> id; id 0 is the single node
+        self._ids = {(): 0}
+        self.children = [()]
+        self._forms = {0: b"\x00"}
+
+    def intern(self, children):
+        """Id of the unordered tree whose root has these child ids."""
+        key = tuple(sorted(children))
+        tree = self._ids.get(key)
+        if tree is None:
+            tree = self._ids[key] = len(self.children)
+            self.children.append(key)
+        return tree
+
+    def _close(self, path):
+        """Close the deepest open node: it becomes a child id of its parent."""
+        return path[:-2] + (path[-2] + (self.intern(path[-1]),),)
+
+    def canonical_id(self, levels):
+        """Class id of one plane tree given as a level sequence."""
+        path = ((),)
+        for depth in levels[1:]:
+            while len(path) > depth:
+                path = self._close(path)
+            path += ((),)
+        while len(path) > 1:
+            path = self._close(path)
+        return self.intern(path[0])
+
+    def bucket(self, n, prefix=(0,)):
+        """
+        Count the plane trees with n nodes (and the given level-sequence
+        prefix) in each unordered class.
+
+        Returns:
+            Dict {class id: number of plane trees}
+        """
+        counts = defaultdict(int)
+        if n < 1:
+            return counts
+        ids = self._ids
+        intern = self.intern
+
+        def close(path):
+            # _close() with the lookup of known subtrees inlined
+            key = tuple(sorted(path[-1]))
+            tree = ids.get(key)
+            if tree is None:
+                tree = intern(key)
+            return path[:-2] + (path[-2] + (tree,),)
+
+        # states[i]: the open path (child ids of each open node) before
+        # position i; positions before the one the odometer changed keep theirs
+        states = [((),)] * (n + 1)
+        for levels, start in _odometer(n, prefix):
+            path = states[start]
+            for i in range(start, n):
+                states[i] = path
+                depth = levels[i]
+                while len(path) > depth:
+                    path = close(path)
+                path += ((),)
+            while len(path) > 1:
+                path = close(path)
+            counts[intern(path[0])] += 1
+        return counts
+
+    def form(self, tree):
+        """Canonical level sequence (bytes, see levelseq.canonical_form) of a class id."""
+        form = self._forms.get(tree)
+        if form is None:
+            kids = sorted((self.form(c) for c in self.children[tree]), reverse=True)
+            form = self._forms[tree] = _under_root(kids)
+        return form
+
+
+def _bucket_task(n, prefix):
+    canonicalizer = PlaneCanonicalizer()
+    counts = canonicalizer.bucket(n, prefix)
+    return {canonicalizer.form(tree): count for tree, count in counts.items()}
+
+
+def _prefixes(n, tasks):
+    """Level-sequence prefixes splitting the plane trees into at least tasks parts."""
+    length = 1
+    while length < n and catalan(length - 1) < tasks:
+        length += 1
+    return [tuple(levels) for levels in generate_plane_trees(length)]
+
+
+def bucket_plane_trees(n, jobs=1):
+    """
+    Multiplicity of every unordered rooted tree among the plane trees.
+
+    Args:
+        n: Number of nodes
+        jobs: Worker processes (None for os.cpu_count(), 1 to run inline)
+
+    Returns:
+        Dict {canonical level sequence (bytes): number of plane trees};
+        the values sum to catalan(n - 1) and there are a(n) keys
+    """
+    if n < 1:
+        return {}
+    if jobs == 1:
+        return _bucket_task(n, (0,))
+    buckets = Counter()
+    # Several tasks per worker, so uneven prefixes balance out
+    prefixes = _prefixes(n, 8 * (jobs or os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_bucket_task, n, prefix) for prefix in prefixes]
+        for future in as_completed(futures):
+            buckets.update(future.result())
+    return dict(buckets)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Bucket the plane trees with n nodes into unordered rooted trees'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes (default: %(default)s, 0 for CPU count)')
+    parser.add_argument('--show', action='store_true',
+                        help='Print every class with its multiplicity')
+    args = parser.parse_args()
+    if args.n < 1:
+        parser.error("n must be positive")
+
+    start = time.perf_counter()
+    buckets = bucket_plane_trees(args.n, args.jobs or None)
+    elapsed = time.perf_counter() - start
+
+    if args.show:
+        out = sys.stdout
+        for form, count in sorted(buckets.items(), reverse=True):
+            out.write(f"{level_sequence_to_string(form)} {count}\n")
+    plane, classes = sum(buckets.values()), len(buckets)
+    ok = plane == catalan(args.n - 1) and classes == count_rooted_trees(args.n)
+    print(f"n={args.n}: {plane} plane trees -> {classes} unordered classes "
+          f"in {elapsed:.3f}s ({'ok' if ok else 'MISMATCH'}: C({args.n - 1}) = "
+          f"{catalan(args.n - 1)}, a({args.n}) = {count_rooted_trees(args.n)})",
+          file=sys.stderr)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Batched P-system simulation over every membrane structure of a size.
+
+Free membrane structures are unlabeled rooted trees (see p-system-trees.md):
+the skin membrane is the root and every membrane contains a multiset of
+sub-membranes.  This module runs one multiset-rewriting P-system over all
+of them at once.
+
+Rules are written as
+
+    a a -> b c:out d:in #
+
+Objects on the left are consumed; products stay in the region, go to the
+parent region (:out; from the skin they leave to the environment) or are
+split evenly among the child regions (:in, any remainder going to the
+first children), and # dissolves the membrane: its contents and children
+pass to the parent.  Rules using :in only apply in regions with children,
+and the skin never dissolves.
+
+A step is maximally parallel with priorities: every region applies the
+first rule as often as its objects allow, then the second rule to what is
+left, and so on, so runs are deterministic.  Products become available at
+the next step.
+
+The regions of all structures of a batch are rows of one count matrix
+(regions x objects, int64), with a parent array linking them, so each
+step is a handful of NumPy operations per rule whatever the number of
+structures.  A structure halts when no rule applies in any of its regions.
+Counts are int64.  Rules that multiply objects could overflow them after
+about 60 doublings, so for such systems every step first bounds the
+total number of objects of the batch and raises OverflowError instead of
+letting a count wrap around.
+
+Requires NumPy.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .optimized import generate_rooted_trees
+
+
+DEFAULT_MAX_STEPS = 100
+
+# Object totals above this might not fit int64 counts (with float headroom)
+COUNT_LIMIT = 2.0 ** 62
+
+Rule = namedtuple('Rule', ['lhs', 'here', 'out', 'inside', 'dissolve'])
+SweepResult = namedtuple('SweepResult', ['n', 'structures', 'halted', 'steps',
+                                         'environment', 'seconds'])
+
+_TARGETS = {'here': 'here', 'out': 'out', 'in': 'inside'}
+
+
+def parse_rule(text):
+    """
+    Parse a rule such as 'a a -> b c:out d:in #'.
+
+    Returns:
+        Rule of lists of object names (repeated for multiplicities) and
+        the dissolution flag
+
+    Raises:
+        ValueError: On malformed rules or rules with an empty left side
+    """
+    lhs, arrow, rhs = text.partition('->')
+    if not arrow:
+        raise ValueError(f"rule {text!r} has no '->'")
+    consumed = lhs.split()
+    if not consumed:
+        raise ValueError(f"rule {text!r} consumes nothing")
+    products = {'here': [], 'out': [], 'inside': []}
+    dissolve = False
+    for token in rhs.split():
+        if token == '#':
+            dissolve = True
+            continue
+        name, _, target = token.partition(':')
+        if not name or target and target not in _TARGETS:
+            raise ValueError(f"bad product {token!r} in rule {text!r}")
+        products[_TARGETS[target or 'here']].append(name)
+    if any(':' in name or name == '#' for name in consumed):
+        raise ValueError(f"left side of rule {text!r} must only list objects")
+    return Rule(consumed, products['here'], products['out'], products['inside'], dissolve)
+
+
+class PSystem:
+    """
+    A P-system's alphabet and prioritized rules, as count matrices.
+
+    Example:
+        system = PSystem(['a -> a:in b', 'a -> c #', 'b -> b:out'])
+        batch = system.batch(generate_rooted_trees(5), skin='a a a')
+        system.run(batch)
+        batch.multiset(0)
+    """
+
+    def __init__(self, rules, objects=()):
+        """
+        Args:
+            rules: Rule strings (see parse_rule) or Rule tuples, highest
+                   priority first
+            objects: Optional object names, fixing the order of the count
+                     vectors; names used by the rules are appended
+        """
+        rules = [parse_rule(r) if isinstance(r, str) else Rule(*r) for r in rules]
+        if not rules:
+            raise ValueError("a P-system needs at least one rule")
+        names = list(dict.fromkeys(objects))
+        for rule in rules:
+            if not rule.lhs:
+                raise ValueError("rules must consume at least one object")
+            for part in rule[:4]:
+                names.extend(name for name in part if name not in names)
+        self.objects = names
+        self._index = {name: i for i, name in enumerate(names)}
+        self.rules = rules
+
+        shape = (len(rules), len(names))
+        self.lhs = np.zeros(shape, dtype=np.int64)
+        self.here = np.zeros(shape, dtype=np.int64)
+        self.out = np.zeros(shape, dtype=np.int64)
+        self.inside = np.zeros(shape, dtype=np.int64)
+        for r, rule in enumerate(rules):
+            for matrix, part in zip((self.lhs, self.here, self.out, self.inside), rule):
+                for name in part:
+                    matrix[r, self._index[name]] += 1
+        self.dissolve = np.array([rule.dissolve for rule in rules], dtype=bool)
+        # Largest factor by which one step can multiply the number of objects
+        produced = (self.here + self.out + self.inside).sum(axis=1)
+        self.growth = max(1.0, float((produced / self.lhs.sum(axis=1)).max()))
+
+    def vector(self, multiset):
+        """Count vector of a multiset given as 'a a b', a list of names or a dict."""
+        if isinstance(multiset, str):
+            multiset = multiset.split()
+        counts = np.zeros(len(self.objects), dtype=np.int64)
+        items = multiset.items() if isinstance(multiset, dict) else ((m, 1) for m in multiset)
+        for name, count in items:
+            if name not in self._index:
+                raise ValueError(f"unknown object {name!r}")
+            counts[self._index[name]] += count
+        return counts
+
+    def batch(self, trees, skin='', regions=''):
+        """
+        Initial configurations of a batch of membrane structures.
+
+        Args:
+            trees: Membrane structures as nested tuples (root = skin),
+                   e.g. from generate_rooted_trees(n)
+            skin: Multiset placed in every skin region
+            regions: Multiset placed in every region, skin included
+
+        Returns:
+            MembraneBatch
+        """
+        return MembraneBatch(self, list(trees), self.vector(skin), self.vector(regions))
+
+    def step(self, batch):
+        """
+        Apply one maximally parallel step to every structure that has not halted.
+
+        Returns:
+            Number of structures in which some rule applied
+
+        Raises:
+            OverflowError: If the step could take an object count past
+                           COUNT_LIMIT (only for rules that multiply objects)
+        """
+        counts = batch.counts
+        if self.growth > 1:
+            # Totals as floats, so the check itself cannot overflow
+            total = (counts.sum(dtype=np.float64) * self.growth
+                     + batch.environment.sum(dtype=np.float64))
+            if total > COUNT_LIMIT:
+                raise OverflowError(f"object counts could exceed {COUNT_LIMIT:.0f} "
+                                    f"(int64) in the next step")
+        parent = batch.parent
+        alive = batch.alive
+        nonroot = parent >= 0
+        children = np.flatnonzero(alive & nonroot)
+        child_count = np.bincount(parent[children], minlength=len(parent))
+
+        available = counts.copy()
+        # Applications of every rule in every region
+        times = np.zeros((len(parent), len(self.rules)), dtype=np.int64)
+        for r in range(len(self.rules)):
+            need = self.lhs[r]
+            used = np.flatnonzero(need)
+            count = (available[:, used] // need[used]).min(axis=1)
+            if self.inside[r].any():
+                count[child_count == 0] = 0
+            if self.dissolve[r]:
+                count[~nonroot] = 0
+            if count.any():
+                available[:, used] -= count[:, None] * need[used]
+                times[:, r] = count
+
+        active = times.any(axis=1)
+        new = available + times @ self.here
+        sent_out = times @ self.out
+        sent_in = times @ self.inside
+        dissolving = (times[:, self.dissolve] > 0).any(axis=1)
+        # Only the regions that send something out take part in the scatter
+        senders = np.flatnonzero(active & nonroot)
+        np.add.at(new, parent[senders], sent_out[senders])
+        skins = np.flatnonzero(active & ~nonroot)
+        np.add.at(batch.environment, batch.structure[skins], sent_out[skins])
+        if sent_in.any():
+            # Rank of each child among its parent's living children
+            order = children[np.argsort(parent[children], kind='stable')]
+            parents = parent[order]
+            rank = np.arange(len(order)) - np.searchsorted(parents, parents)
+            share, remainder = np.divmod(sent_in[parents], child_count[parents][:, None])
+            new[order] += share + (rank[:, None] < remainder)
+
+        if dissolving.any():
+            alive &= ~dissolving
+            # Nearest living ancestor of every membrane
+            ancestor = parent.copy()
+            pending = np.flatnonzero(nonroot)
+            while len(pending):
+                dead = ~alive[ancestor[pending]]
+                pending = pending[dead]
+                ancestor[pending] = parent[ancestor[pending]]
+            gone = np.flatnonzero(dissolving)
+            np.add.at(new, ancestor[gone], new[gone])
+            new[gone] = 0
+            parent[nonroot] = ancestor[nonroot]
+
+        batch.counts = new
+        active = np.bincount(batch.structure[active], minlength=len(batch.trees)) > 0
+        batch.steps[active] += 1
+        batch.halted |= ~active
+        return int(active.sum())
+
+    def run(self, batch, max_steps=DEFAULT_MAX_STEPS):
+        """Step the batch until every structure halts or max_steps steps; returns it."""
+        for _ in range(max_steps):
+            if not self.step(batch):
+                break
+        return batch
+
+
+class MembraneBatch:
+    """
+    Configurations of a batch of membrane structures, one row per region.
+
+    Attributes:
+        trees: The membrane structures
+        parent: Parent region of every region (-1 for skins); dissolved
+                regions keep pointing at a living ancestor
+        structure: Index of the structure owning every region
+        counts: Object counts, regions x objects
+        alive: False for dissolved membranes
+        environment: Objects sent out of each skin, structures x objects
+        steps: Steps in which some rule applied, per structure
+        halted: True once no rule applies in a structure
+        first: first[i] is the skin region of structure i
+    """
+
+    def __init__(self, system, trees, skin, regions):
+        self.system = system
+        self.trees = trees
+        parent = []
+        structure = []
+        first = []
+        for index, tree in enumerate(trees):
+            first.append(len(parent))
+            # Preorder, children in the order given
+            stack = [(tree, -1)]
+            while stack:
+                node, up = stack.pop()
+                here = len(parent)
+                parent.append(up)
+                structure.append(index)
+                stack.extend((child, here) for child in reversed(node))
+        self.parent = np.array(parent, dtype=np.intp)
+        self.structure = np.array(structure, dtype=np.intp)
+        self.first = np.array(first, dtype=np.intp)
+        self.counts = np.tile(regions, (len(parent), 1))
+        self.counts[self.first] += skin
+        self.alive = np.ones(len(parent), dtype=bool)
+        self.environment = np.zeros((len(trees), len(system.objects)), dtype=np.int64)
+        self.steps = np.zeros(len(trees), dtype=np.int64)
+        self.halted = np.zeros(len(trees), dtype=bool)
+
+    def __len__(self):
+        return len(self.trees)
+
+    def regions(self, index):
+        """Region rows of structure index, in preorder (dissolved ones included)."""
+        end = self.first[index + 1] if index + 1 < len(self.first) else len(self.parent)
+        return range(self.first[index], end)
+
+    def membranes(self):
+        """Number of living membranes per structure."""
+        return np.bincount(self.structure, weights=self.alive,
+                           minlength=len(self.trees)).astype(np.int64)
+
+    def multiset(self, region, environment=False):
+        """
+        Contents of a region (or with environment=True, of the environment
+        of structure region) as {object: count}.
+        """
+        row = self.environment[region] if environment else self.counts[region]
+        return {name: int(c) for name, c in zip(self.system.objects, row) if c}
+
+
+def simulate(system, n, skin='', regions='', max_steps=DEFAULT_MAX_STEPS):
+    """Run the P-system over every membrane structure with n membranes."""
+    return system.run(system.batch(generate_rooted_trees(n), skin, regions), max_steps)
+
+
+def _sweep_task(system, n, skin, regions, max_steps):
+    start = time.perf_counter()
+    batch = simulate(system, n, skin, regions, max_steps)
+    return SweepResult(n, len(batch), batch.halted, batch.steps, batch.environment,
+                       time.perf_counter() - start)
+
+
+def sweep(system, sizes, skin='', regions='', max_steps=DEFAULT_MAX_STEPS, jobs=1):
+    """
+    Simulate every membrane structure for each size in sizes.
+
+    Args:
+        system: PSystem
+        sizes: Numbers of membranes
+        skin, regions: Initial multisets (see PSystem.batch)
+        max_steps: Step limit per structure
+        jobs: Worker processes (None for os.cpu_count(), 1 to run inline)
+
+    Returns:
+        {n: SweepResult}, halted, steps and environment being per-structure
+        arrays in generate_rooted_trees order
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    if jobs == 1:
+        results = [_sweep_task(system, n, skin, regions, max_steps) for n in sizes]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_sweep_task, system, n, skin, regions, max_steps)
+                       for n in sizes]
+            results = [future.result() for future in as_completed(futures)]
+    return {result.n: result for result in sorted(results, key=lambda r: r.n)}
+
+
+# Pushes every a one membrane deeper, leaving a b that travels outwards;
+# an a reaching an elementary membrane dissolves it into a c
+DEFAULT_RULES = ('a -> a:in b', 'a -> c #', 'b -> b:out')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Run a P-system over every membrane structure with n membranes'
+    )
+    parser.add_argument('n', type=int, help='Largest number of membranes')
+    parser.add_argument('--min-n', type=int, default=1,
+                        help='Smallest number of membranes (default: %(default)s)')
+    parser.add_argument('--rule', action='append', dest='rules', metavar='RULE',
+                        help="Rule such as 'a a -> b c:out d:in #', highest priority "
+                             f"first (default: {'; '.join(DEFAULT_RULES)})")
+    parser.add_argument('--skin', default='a a a a',
+                        help="Initial skin multiset (default: '%(default)s')")
+    parser.add_argument('--regions', default='',
+                        help='Initial multiset of every region')
+    parser.add_argument('--max-steps', type=int, default=DEFAULT_MAX_STEPS,
+                        help='Step limit (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes, one size each (default: %(default)s)')
+    args = parser.parse_args()
+
+    try:
+        system = PSystem(args.rules or DEFAULT_RULES)
+        results = sweep(system, range(args.min_n, args.n + 1), args.skin, args.regions,
+                        args.max_steps, args.jobs)
+    except (ValueError, OverflowError) as e:
+        parser.error(str(e))
+
+    print(f"objects: {' '.join(system.objects)}")
+    for n, result in results.items():
+        outcomes = len({row.tobytes() for row in result.environment})
+        print(f"n={n:<3} {result.structures:>7} structures  "
+              f"{int(result.halted.sum()):>7} halted  "
+              f"steps {result.steps.min()}..{result.steps.max()}  "
+              f"{outcomes:>5} distinct environments  {result.seconds:.3f}s")
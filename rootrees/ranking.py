@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Ranking, unranking and uniform sampling of rooted trees by counting.
+
+A tree with n nodes is a root above a forest with n-1 nodes.  Forests are
+ordered size class by size class, largest first: for parts of size s, first
+by how many parts j have that size, then by the multiset of their ranks
+(among the a(s) trees of size s), then by the rest of the forest.  With
+
+    P(r, s) = number of forests of size r with all parts of size <= s
+            = sum_j C(a(s) + j - 1, j) * P(r - j*s, s - 1)
+
+each step is a mixed-radix digit, so a rank in range(a(n)) maps to a tree
+and back in polynomial time without listing the trees before it.  The rank
+does not depend on the order of children, and unrank_tree(n, randrange(a(n)))
+samples trees uniformly.
+
+This order is not the order of any of the generators; it is only meant to
+give every tree a stable number.
+
+Nothing here recurses: P is filled in bottom-up (by increasing r and s) and
+trees are ranked and built with explicit stacks, so trees with hundreds or
+thousands of nodes work.
+"""
+
+from math import comb
+
+from .optimized import count_rooted_trees
+
+
+# _forests[r][s] = P(r, s) for 0 <= s <= r, filled in row by row
+_forests = [[1]]
+
+
+def _extend_forests(n):
+    """Fill the forest table up to n nodes (and a(k) for k <= n, in order)."""
+    table = _forests
+    while len(table) <= n:
+        m = len(table)
+        row = [0] * (m + 1)
+        for s in range(1, m + 1):
+            # Increasing s also fills count_rooted_trees' cache bottom-up
+            a = count_rooted_trees(s)
+            total = 0
+            for j in range(m // s + 1):
+                r = m - j * s
+                rest = row[s - 1] if j == 0 else table[r][min(s - 1, r)]
+                total += comb(a + j - 1, j) * rest
+            row[s] = total
+        table.append(row)
+
+
+def count_forests(r, s):
+    """Number of forests with r nodes whose trees have at most s nodes each."""
+    if r == 0:
+        return 1
+    s = min(s, r)
+    if s <= 0:
+        return 0
+    _extend_forests(r)
+    return _forests[r][s]
+
+
+def _rank_multiset(ranks):
+    """Colex rank of a sorted multiset via the bijection c_i -> c_i + i."""
+    return sum(comb(c + i, i + 1) for i, c in enumerate(ranks))
+
+
+def _unrank_multiset(index, j):
+    """Sorted multiset of j ranks with the given colex rank."""
+    ranks = [0] * j
+    for i in range(j - 1, -1, -1):
+        # Largest d with comb(d, i + 1) <= index
+        lo, hi = i, i + 1
+        while comb(hi, i + 1) <= index:
+            hi *= 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if comb(mid, i + 1) <= index:
+                lo = mid
+            else:
+                hi = mid
+        index -= comb(lo, i + 1)
+        ranks[i] = lo - i
+    return ranks
+
+
+def rank_tree(tree):
+    """
+    Return (n, rank) of a tree, with 0 <= rank < count_rooted_trees(n).
+
+    Args:
+        tree: Tree as nested tuple, children in any order
+
+    Examples:
+        >>> rank_tree(((), ()))
+        (3, 0)
+        >>> rank_tree((((),),))
+        (3, 1)
+    """
+    ranked = {}
+    # Post-order; repeated subtrees are ranked once
+    stack = [(tree, False)]
+    while stack:
+        node, done = stack.pop()
+        if node in ranked:
+            continue
+        if not done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node)
+            continue
+        by_size = {}
+        r = 0
+        for child in node:
+            size, child_rank = ranked[child]
+            by_size.setdefault(size, []).append(child_rank)
+            r += size
+        n = r + 1
+        _extend_forests(r)
+        total = 0
+        for s in range(r, 0, -1):
+            parts = sorted(by_size.get(s, ()))
+            j = len(parts)
+            a = count_rooted_trees(s)
+            for smaller in range(j):
+                total += comb(a + smaller - 1, smaller) * count_forests(r - smaller * s, s - 1)
+            r -= j * s
+            total += _rank_multiset(parts) * count_forests(r, s - 1)
+        ranked[node] = (n, total)
+    return ranked[tree]
+
+
+def _child_ranks(n, index):
+    """(size, rank) of the children of the tree with n nodes and the given rank."""
+    r = n - 1
+    children = []
+    for s in range(r, 0, -1):
+        if r == 0:
+            break
+        if s > r:
+            continue
+        a = count_rooted_trees(s)
+        for j in range(r // s + 1):
+            rest = count_forests(r - j * s, s - 1)
+            block = comb(a + j - 1, j) * rest
+            if index < block:
+                break
+            index -= block
+        multiset, index = divmod(index, rest)
+        children.extend((s, c) for c in _unrank_multiset(multiset, j))
+        r -= j * s
+    return children
+
+
+def unrank_tree(n, index):
+    """
+    Return the tree with n nodes and the given rank.
+
+    Children are listed by decreasing size, and by increasing rank within a
+    size.
+
+    Args:
+        n: Number of nodes
+        index: Rank, 0 <= index < count_rooted_trees(n)
+
+    Raises:
+        ValueError: If n < 1 or index is out of range
+    """
+    if n < 1:
+        raise ValueError(f"n must be positive, got {n}")
+    _extend_forests(n)
+    if not 0 <= index < count_rooted_trees(n):
+        raise ValueError(f"rank {index} out of range for n={n}")
+    # Post-order over (size, rank, child ranks once expanded)
+    built = []
+    stack = [(n, index, None)]
+    while stack:
+        m, i, parts = stack.pop()
+        if parts is None:
+            parts = _child_ranks(m, i)
+            stack.append((m, i, parts))
+            stack.extend((s, c, None) for s, c in reversed(parts))
+        else:
+            k = len(parts)
+            children = tuple(built[len(built) - k:]) if k else ()
+            del built[len(built) - k:]
+            built.append(children)
+    return built[0]
+
+
+def random_tree(n, rng=None):
+    """
+    Return a uniformly random rooted tree with n nodes.
+
+    Args:
+        n: Number of nodes
+        rng: random.Random instance (default: the random module)
+    """
+    if n < 1:
+        raise ValueError(f"n must be positive, got {n}")
+    if rng is None:
+        import random as rng
+    _extend_forests(n)
+    return unrank_tree(n, rng.randrange(count_rooted_trees(n)))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark harness.
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from rootrees.benchmark import (
+    CASES,
+    compare_to_baseline,
+    main,
+    measure_memory,
+    run_case,
+    run_isolated,
+    summarize,
+)
+
+
+def _report(**rates):
+    return {'cases': [{'case': case, 'n': 10, 'ok': True, 'trees_per_sec': rate}
+                      for case, rate in rates.items()]}
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test statistics, baseline comparison and the workers."""
+
+    def test_summarize(self):
+        self.assertEqual(summarize([3.0]), (3.0, 0.0))
+        median, iqr = summarize([1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(median, 3.0)
+        self.assertEqual(iqr, 2.0)
+
+    def test_compare_to_baseline(self):
+        baseline = _report(levelseq=1000.0, bags=100.0, gone=5.0)
+        current = _report(levelseq=850.0, bags=95.0, new=1.0)
+        rows = {row[0]: row for row in compare_to_baseline(current, baseline, 10.0)}
+        self.assertEqual(set(rows), {'levelseq', 'bags'})
+        self.assertTrue(rows['levelseq'][5])
+        self.assertAlmostEqual(rows['levelseq'][4], -15.0)
+        self.assertFalse(rows['bags'][5])
+
+    def test_compare_memory_baseline(self):
+        def memory_report(peak):
+            return {'settings': {'mode': 'memory'},
+                    'cases': [{'case': 'original', 'n': 10, 'ok': True,
+                               'tracemalloc_peak_bytes': peak}]}
+        rows = compare_to_baseline(memory_report(1200), memory_report(1000), 10.0)
+        self.assertTrue(rows[0][5])
+        rows = compare_to_baseline(memory_report(900), memory_report(1000), 10.0)
+        self.assertFalse(rows[0][5])
+
+    def test_compare_needs_same_mode(self):
+        memory = {'settings': {'mode': 'memory'}, 'cases': []}
+        with self.assertRaises(ValueError):
+            compare_to_baseline(_report(levelseq=1.0), memory)
+
+    def test_baseline_fails_closed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            args = ['--cases', 'levelseq', '--sizes', '5', '--warmup', '0',
+                    '--repeat', '1', '--min-time', '0', '--baseline', path]
+            for baseline in ({'settings': {'mode': 'memory'}, 'cases': []},
+                             _report(bags=100.0)):
+                with open(path, 'w') as f:
+                    json.dump(baseline, f)
+                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    self.assertEqual(main(args), 1)
+
+    def test_memory_fields(self):
+        result = measure_memory('original', 7)
+        self.assertTrue(result['ok'])
+        self.assertGreater(result['tracemalloc_peak_bytes'], 0)
+        self.assertAlmostEqual(result['bytes_per_tree'],
+                               result['tracemalloc_peak_bytes'] / 48)
+        # treeid holds every tree up to size 7: 1 + 1 + 2 + 4 + 9 + 20 + 48
+        self.assertEqual(result['treeid_entries'], 85)
+        self.assertIsNone(measure_memory('levelseq', 7)['treeid_entries'])
+
+    def test_isolated_memory_worker(self):
+        result = run_isolated('bags', 7, memory=True)
+        self.assertTrue(result['ok'])
+        self.assertIn('rss_peak_bytes', result)
+
+    def test_every_case_counts_correctly(self):
+        for case in CASES:
+            result = run_case(case, 6, warmup=0, repeat=1, min_time=0)
+            self.assertTrue(result['ok'], case)
+            self.assertEqual(result['trees'], 20)
+            self.assertGreater(result['trees_per_sec'], 0)
+
+    def test_isolated_worker(self):
+        result = run_isolated('original', 7, warmup=0, repeat=2, min_time=0)
+        self.assertTrue(result['ok'])
+        self.assertEqual(result['trees'], 48)
+        self.assertEqual(len(result['times']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk tree text writer.
+"""
+
+import io
+import unittest
+
+from rootrees import optimized
+from rootrees.bulkwrite import FORMATS, BulkTreeWriter, write_level_sequences
+from rootrees.levelseq import (
+    generate_level_sequence_changes,
+    generate_level_sequences,
+    level_sequence_to_string,
+)
+
+
+def _expected_line(levels, style):
+    if style == 'levels':
+        return " ".join(map(str, levels))
+    return level_sequence_to_string(levels, style)
+
+
+class TestBulkTreeWriter(unittest.TestCase):
+    """Test that bulk output matches the per-tree string functions."""
+
+    def test_all_formats_match_reference(self):
+        sequences = list(generate_level_sequences(9))
+        for style in FORMATS:
+            buffer = io.BytesIO()
+            count = write_level_sequences(sequences, buffer, style)
+            expected = "".join(_expected_line(levels, style) + "\n" for levels in sequences)
+            self.assertEqual(count, len(sequences))
+            self.assertEqual(buffer.getvalue().decode(), expected, style)
+
+    def test_write_changes_matches_writemany(self):
+        for style in FORMATS:
+            plain = io.BytesIO()
+            write_level_sequences(generate_level_sequences(10), plain, style)
+            incremental = io.BytesIO()
+            with BulkTreeWriter(incremental, style) as writer:
+                writer.write_changes(generate_level_sequence_changes(10))
+            self.assertEqual(incremental.getvalue(), plain.getvalue(), style)
+
+    def test_nested_tuples_match_tree_to_string(self):
+        for style in ('parens', 'brackets'):
+            buffer = io.BytesIO()
+            with BulkTreeWriter(buffer, style) as writer:
+                writer.write_trees(optimized.generate_rooted_trees(7))
+            expected = "".join(optimized.tree_to_string(tree, style) + "\n"
+                               for tree in optimized.generate_rooted_trees(7))
+            self.assertEqual(buffer.getvalue().decode(), expected)
+
+    def test_small_buffer_flushes_in_chunks(self):
+        buffer = io.BytesIO()
+        with BulkTreeWriter(buffer, 'parens', buffer_size=16) as writer:
+            writer.writemany(generate_level_sequences(6))
+        self.assertEqual(len(buffer.getvalue().splitlines()), 20)
+
+    def test_single_node_and_deep_path(self):
+        buffer = io.BytesIO()
+        with BulkTreeWriter(buffer, 'brackets') as writer:
+            writer.write((0,))
+            writer.write(list(range(7)))
+        self.assertEqual(buffer.getvalue().decode().splitlines(),
+                         ["()", level_sequence_to_string(range(7), 'brackets')])
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            BulkTreeWriter(io.BytesIO(), 'curly')
+
+
+if __name__ == '__main__':
+    unittest.main()
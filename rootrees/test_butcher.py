@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the Runge-Kutta order conditions.
+"""
+
+import unittest
+from math import factorial, sqrt
+
+try:
+    import numpy
+except ImportError:  # butcher.py needs NumPy
+    numpy = None
+
+if numpy is not None:
+    from rootrees.butcher import TABLEAUS, OrderConditions, check_order, order_conditions
+from rootrees.functional import get_functional
+
+
+# OEIS A000081, a(0)..a(9)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286]
+
+# Known orders of the classic tableaus
+ORDERS = {'euler': 1, 'midpoint': 2, 'heun': 2, 'ralston': 2, 'kutta3': 3,
+          'rk4': 4, '3/8': 4}
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestOrderConditions(unittest.TestCase):
+    """Test tree data, elementary weights and orders."""
+
+    def test_trees_per_size(self):
+        conditions = OrderConditions(9)
+        sizes = list(conditions.sizes)
+        for n in range(1, 10):
+            self.assertEqual(sizes.count(n), A000081[n])
+
+    def test_gamma_and_sigma_match_functionals(self):
+        conditions = order_conditions(8)
+        symmetry = get_functional('symmetry')
+        density = get_functional('density')
+        for i in range(len(conditions)):
+            tree = conditions.tree(i, 'tuple')
+            self.assertEqual(conditions.sigma[i], symmetry(tree))
+            self.assertEqual(conditions.gamma[i], density(tree)[1])
+
+    def test_labelling_identity(self):
+        # sum of n!/(sigma gamma) over trees with n nodes is (n-1)!
+        conditions = order_conditions(8)
+        for n in range(1, 9):
+            total = sum(factorial(n) // (int(s) * int(g))
+                        for size, s, g in zip(conditions.sizes, conditions.sigma,
+                                              conditions.gamma) if size == n)
+            self.assertEqual(total, factorial(n - 1))
+
+    def test_classic_orders(self):
+        for name, order in ORDERS.items():
+            self.assertEqual(check_order(*TABLEAUS[name]), order, name)
+
+    def test_implicit_gauss(self):
+        r = sqrt(3) / 6
+        A = [[0.25, 0.25 - r], [0.25 + r, 0.25]]
+        self.assertEqual(check_order(A, [0.5, 0.5], max_order=8), 4)
+
+    def test_stacked_tableaus(self):
+        names = ['euler', 'heun', 'kutta3', 'rk4']
+        stages = 4
+        A = numpy.zeros((len(names), stages, stages))
+        b = numpy.zeros((len(names), stages))
+        for k, name in enumerate(names):
+            a, w, _ = TABLEAUS[name]
+            s = len(w)
+            A[k, :s, :s] = numpy.array(a, dtype=float)
+            b[k, :s] = numpy.array(w, dtype=float)
+        self.assertEqual(list(order_conditions(6).order(A, b)), [1, 2, 3, 4])
+
+    def test_failures_are_fifth_order_trees(self):
+        conditions = order_conditions(5)
+        failed = conditions.failures(*TABLEAUS['rk4'])
+        self.assertTrue(len(failed) > 0)
+        self.assertTrue(all(conditions.sizes[i] == 5 for i in failed))
+
+    def test_invalid_tableau(self):
+        A, b, c = TABLEAUS['heun']
+        with self.assertRaises(ValueError):
+            check_order(A, b, [0, 0.5])
+        with self.assertRaises(ValueError):
+            check_order(A, [1, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the delta-compressed tree stream format.
+"""
+
+import gzip
+import io
+import unittest
+
+from rootrees.deltastream import (
+    DeltaStreamReader,
+    DeltaStreamWriter,
+    decode_level_sequences,
+    encode_level_sequences,
+)
+from rootrees.levelseq import generate_level_sequences, level_sequence_to_string
+
+
+class _Unseekable(io.RawIOBase):
+    """Read-only wrapper hiding seek() from the reader."""
+
+    def __init__(self, data):
+        self._inner = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._inner.readinto(buffer)
+
+
+def _encode(sequences, n, **options):
+    buffer = io.BytesIO()
+    encode_level_sequences(sequences, buffer, n, **options)
+    return buffer.getvalue()
+
+
+class TestDeltaStream(unittest.TestCase):
+    """Test encoding, decoding and seeking."""
+
+    def test_round_trip_all_compressions(self):
+        expected = list(generate_level_sequences(9))
+        for compression in ('none', 'zlib', 'lzma'):
+            data = _encode(expected, 9, compression=compression, sync_interval=50)
+            decoded = list(decode_level_sequences(io.BytesIO(data)))
+            self.assertEqual(decoded, expected, compression)
+
+    def test_single_block_and_single_tree(self):
+        for n in (1, 2, 3):
+            expected = list(generate_level_sequences(n))
+            data = _encode(expected, n)
+            self.assertEqual(list(decode_level_sequences(io.BytesIO(data))), expected)
+
+    def test_wide_depths(self):
+        n = 300
+        expected = [tuple(range(n)), (0,) + (1,) * (n - 1), tuple(range(n))]
+        data = _encode(expected, n, compression='none', sync_interval=2)
+        self.assertEqual(list(decode_level_sequences(io.BytesIO(data))), expected)
+
+    def test_random_access(self):
+        expected = list(generate_level_sequences(10))
+        reader = DeltaStreamReader(io.BytesIO(_encode(expected, 10, sync_interval=64)))
+        self.assertEqual(len(reader), len(expected))
+        self.assertEqual(reader.blocks, -(-len(expected) // 64))
+        for index in (0, 63, 64, 65, 500, len(expected) - 1):
+            self.assertEqual(reader[index], expected[index])
+        self.assertEqual(reader[-1], expected[-1])
+        self.assertEqual(list(reader.iter_from(700)), expected[700:])
+        with self.assertRaises(IndexError):
+            reader[len(expected)]
+
+    def test_unseekable_stream_iterates(self):
+        expected = list(generate_level_sequences(8))
+        data = _encode(expected, 8, sync_interval=16)
+        reader = DeltaStreamReader(io.BufferedReader(_Unseekable(data)))
+        self.assertEqual(list(reader), expected)
+
+    def test_rejects_wrong_length(self):
+        writer = DeltaStreamWriter(io.BytesIO(), 4)
+        with self.assertRaises(ValueError):
+            writer.write((0, 1, 2))
+
+    def test_rejects_bad_magic(self):
+        with self.assertRaises(ValueError):
+            DeltaStreamReader(io.BytesIO(b'nope'))
+
+    def test_smaller_than_gzip_text(self):
+        n = 12
+        data = _encode(generate_level_sequences(n), n)
+        text = "".join(level_sequence_to_string(levels) + "\n"
+                       for levels in generate_level_sequences(n)).encode()
+        self.assertLess(len(data) * 5, len(gzip.compress(text, 9)))
+
+
+if __name__ == '__main__':
+    unittest.main()
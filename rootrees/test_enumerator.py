@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the re-entrant rooted tree enumerator.
+"""
+
+import importlib
+import threading
+import unittest
+
+from rootrees.enumerator import RootedTreeEnumerator
+
+
+# OEIS A000081, a(0)..a(12)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719, 1842, 4766]
+
+
+class TestRootedTreeEnumerator(unittest.TestCase):
+    """Test counts, caching, eviction and concurrent use."""
+
+    def test_matches_original_order(self):
+        original = importlib.import_module('rootrees.list-rooted-trees')
+        enumerator = RootedTreeEnumerator()
+        for n in range(1, 10):
+            self.assertEqual(list(enumerator.trees(n)), list(original.trees(n)))
+
+    def test_counts(self):
+        enumerator = RootedTreeEnumerator()
+        for n in range(13):
+            self.assertEqual(sum(1 for _ in enumerator.trees(n)), A000081[n])
+            self.assertEqual(enumerator.count(n), A000081[n])
+
+    def test_reuses_cached_levels(self):
+        enumerator = RootedTreeEnumerator()
+        list(enumerator.trees(10))
+        misses = enumerator.cache_info().misses
+        self.assertEqual(misses, 10)
+        list(enumerator.trees(11))
+        self.assertEqual(enumerator.cache_info().misses, misses + 1)
+        list(enumerator.trees(10))
+        self.assertEqual(enumerator.cache_info().misses, misses + 1)
+
+    def test_eviction_keeps_ids_stable(self):
+        full = RootedTreeEnumerator()
+        expected = {tree: full.tree_id(tree, 9) for tree in full.trees(9)}
+        small = RootedTreeEnumerator(memory_budget=35000)
+        list(small.trees(9))
+        list(small.trees(8))
+        info = small.cache_info()
+        self.assertGreater(info.evictions, 0)
+        self.assertLessEqual(info.currsize, info.budget)
+        for tree, tree_id in expected.items():
+            self.assertEqual(small.tree_id(tree), tree_id)
+
+    def test_streams_levels_over_budget(self):
+        enumerator = RootedTreeEnumerator(memory_budget=100000)
+        self.assertEqual(sum(1 for _ in enumerator.trees(11)), A000081[11])
+        self.assertNotIn(11, enumerator.cache_info().levels)
+
+    def test_concurrent_iteration(self):
+        enumerator = RootedTreeEnumerator(memory_budget=200000)
+        results = {}
+
+        def worker(n, key):
+            results[key] = sum(1 for _ in enumerator.trees(n))
+
+        threads = [threading.Thread(target=worker, args=(n, (n, i)))
+                   for n in (8, 9, 10, 11) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for (n, _), count in results.items():
+            self.assertEqual(count, A000081[n])
+        self.assertEqual(len(results), 12)
+
+    def test_independent_instances(self):
+        a = RootedTreeEnumerator()
+        b = RootedTreeEnumerator()
+        first = a.trees(7)
+        next(first)
+        self.assertEqual(sum(1 for _ in b.trees(8)), A000081[8])
+        self.assertEqual(1 + sum(1 for _ in first), A000081[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
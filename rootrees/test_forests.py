@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the memoized forest engine.
+"""
+
+import importlib
+import unittest
+
+from rootrees.forests import ForestEngine, generate_forests, generate_trees
+from rootrees.functional import canonical_tree
+from rootrees.levelseq import generate_level_sequences, level_sequence_to_tree
+from rootrees.treeparse import parse_tree
+
+
+# OEIS A000081, a(0)..a(13)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719, 1842, 4766, 12486]
+
+
+class TestForestEngine(unittest.TestCase):
+    """Test forest and tree enumeration against the other engines."""
+
+    def test_counts(self):
+        engine = ForestEngine()
+        for n in range(1, 14):
+            self.assertEqual(sum(1 for _ in engine.trees(n, 'ids')), A000081[n])
+            # forests of size n-1 are in bijection with trees of size n
+            self.assertEqual(engine.count_forests(n - 1), A000081[n])
+
+    def test_matches_bags(self):
+        original = importlib.import_module('rootrees.list-rooted-trees-1')
+        for n in range(1, 10):
+            # bags() lists the larger children first
+            expected = {canonical_tree(parse_tree(s)) for _, s in original.bags(n)}
+            found = [canonical_tree(parse_tree(s)) for s in generate_trees(n, 'parens')]
+            self.assertEqual(len(found), len(expected))
+            self.assertEqual(set(found), expected)
+
+    def test_same_trees_as_level_sequences(self):
+        for n in range(1, 10):
+            expected = {canonical_tree(level_sequence_to_tree(levels))
+                        for levels in generate_level_sequences(n)}
+            found = [canonical_tree(tree) for tree in generate_trees(n)]
+            self.assertEqual(len(found), len(expected))
+            self.assertEqual(set(found), expected)
+
+    def test_canonical_order(self):
+        engine = ForestEngine()
+        forests = list(engine.forests(8, 'ids'))
+        self.assertEqual(forests, sorted(forests))
+        for forest in forests:
+            self.assertEqual(list(forest), sorted(forest))
+        trees = list(engine.trees(5, 'parens'))
+        self.assertEqual(trees[0], "(()()()())")
+        self.assertEqual(trees[-1], "((((()))))")
+
+    def test_views(self):
+        engine = ForestEngine()
+        self.assertEqual(list(engine.forests(2, 'parens')), ["()()", "(())"])
+        self.assertEqual(list(engine.forests(2, 'tuple')), [((), ()), (((),),)])
+        self.assertEqual(list(engine.forests(0)), [()])
+        forest = list(engine.forests(3, 'ids'))[1]
+        self.assertEqual(engine.forest_view(forest, 'parens'), "()(())")
+        self.assertEqual(engine.tree(forest[1], 'parens'), "(())")
+        with self.assertRaises(ValueError):
+            list(engine.trees(3, 'dyck'))
+
+    def test_shared_tables(self):
+        first = list(generate_forests(6, 'tuple'))
+        self.assertEqual(list(generate_forests(6, 'tuple')), first)
+        self.assertEqual(len(first), A000081[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for free (unrooted) tree generation and counting.
+"""
+
+import unittest
+
+from rootrees.freetrees import count_free_trees, generate_free_tree_parents, generate_free_trees
+from rootrees.levelseq import level_sequence_to_parents
+
+
+# OEIS A000055, a(0)..a(20)
+A000055 = [1, 1, 1, 1, 2, 3, 6, 11, 23, 47, 106, 235, 551, 1301, 3159, 7741,
+           19320, 48629, 123867, 317955, 823065]
+
+
+def _adjacency(parents):
+    adjacency = [[] for _ in parents]
+    for v, p in enumerate(parents):
+        if p >= 0:
+            adjacency[v].append(p)
+            adjacency[p].append(v)
+    return adjacency
+
+
+def _eccentricities(adjacency):
+    result = []
+    for source in range(len(adjacency)):
+        dist = {source: 0}
+        queue = [source]
+        for v in queue:
+            for u in adjacency[v]:
+                if u not in dist:
+                    dist[u] = dist[v] + 1
+                    queue.append(u)
+        result.append(max(dist.values()))
+    return result
+
+
+def _rooted_form(adjacency, root):
+    """Canonical string of the tree rooted at root."""
+    forms = {}
+    order = [(root, -1)]
+    for v, parent in order:
+        order.extend((u, v) for u in adjacency[v] if u != parent)
+    for v, parent in reversed(order):
+        kids = sorted(forms[u] for u in adjacency[v] if u != parent)
+        forms[v] = "(" + "".join(kids) + ")"
+    return forms[root]
+
+
+def _free_form(parents):
+    """Isomorphism invariant of the unrooted tree: max over center rootings."""
+    adjacency = _adjacency(parents)
+    ecc = _eccentricities(adjacency)
+    centers = [v for v, e in enumerate(ecc) if e == min(ecc)]
+    return max(_rooted_form(adjacency, c) for c in centers), ecc
+
+
+class TestFreeTrees(unittest.TestCase):
+    """Test counts, uniqueness and center rooting."""
+
+    def test_count_formula(self):
+        self.assertEqual([count_free_trees(n) for n in range(21)], A000055)
+
+    def test_generated_counts(self):
+        for n in range(15):
+            self.assertEqual(sum(1 for _ in generate_free_trees(n)), A000055[n], n)
+
+    def test_distinct_and_center_rooted(self):
+        for n in range(1, 11):
+            forms = set()
+            for levels in generate_free_trees(n):
+                parents = level_sequence_to_parents(levels)
+                form, ecc = _free_form(parents)
+                forms.add(form)
+                # The root is a center: its eccentricity is the radius
+                self.assertEqual(ecc[0], min(ecc))
+                self.assertEqual(max(levels), ecc[0])
+            self.assertEqual(len(forms), A000055[n])
+
+    def test_parent_arrays(self):
+        parents = list(generate_free_tree_parents(5))
+        self.assertEqual(parents, [[-1, 0, 1, 0, 3], [-1, 0, 1, 0, 0], [-1, 0, 0, 0, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for memoized tree functionals.
+"""
+
+import unittest
+from math import factorial
+
+from rootrees.functional import (
+    TreeFunctional,
+    available_functionals,
+    canonical_tree,
+    evaluate_trees,
+    get_functional,
+    register_functional,
+)
+from rootrees.levelseq import generate_level_sequences, level_sequence_to_tree, tree_to_level_sequence
+
+
+class TestTreeFunctional(unittest.TestCase):
+    """Test evaluation, memoization and the registry."""
+
+    def test_builtin_values(self):
+        tree = ((), ((),), ((),))
+        self.assertEqual(get_functional('size')(tree), 6)
+        self.assertEqual(get_functional('height')(tree), 2)
+        self.assertEqual(get_functional('leaves')(tree), 3)
+        # two identical children ((),) swap, plus nothing else
+        self.assertEqual(get_functional('symmetry')(tree), 2)
+        self.assertEqual(get_functional('density')(tree), (6, 24))
+
+    def test_labelled_tree_identities(self):
+        for n in range(1, 9):
+            sigma = get_functional('symmetry')
+            density = get_functional('density')
+            trees = [tree for tree, _ in evaluate_trees('size', n)]
+            # Cayley: n^(n-1) labelled rooted trees
+            self.assertEqual(sum(factorial(n) // sigma(t) for t in trees), n ** (n - 1))
+            # (n-1)! increasing (recursive) trees
+            self.assertEqual(
+                sum(factorial(n) // (sigma(t) * density(t)[1]) for t in trees),
+                factorial(n - 1)
+            )
+
+    def test_cache_statistics(self):
+        size = get_functional('size')
+        list(size.map(tree for tree, _ in evaluate_trees('height', 9)))
+        info = size.cache_info()
+        self.assertGreater(info.hits, 0)
+        first_misses = info.misses
+        list(size.map(tree for tree, _ in evaluate_trees('height', 9)))
+        self.assertEqual(size.cache_info().misses, first_misses)
+        size.cache_clear()
+        self.assertEqual(size.cache_info().currsize, 0)
+
+    def test_bounded_cache(self):
+        size = get_functional('size', cache_size=16)
+        for levels in generate_level_sequences(8):
+            self.assertEqual(size.evaluate_levels(levels), 8)
+        self.assertLessEqual(size.cache_info().currsize, 16)
+
+    def test_multiplicities_and_registry(self):
+        register_functional('child_counts', (), lambda children: tuple(sorted(m for _, m in children)))
+        self.assertIn('child_counts', available_functionals())
+        f = get_functional('child_counts')
+        self.assertEqual(f(((), (), ((),))), (1, 2))
+        with self.assertRaises(KeyError):
+            get_functional('no-such-functional')
+
+    def test_custom_functional(self):
+        paths = TreeFunctional(1, lambda children: 1 + sum(v * m for v, m in children))
+        self.assertEqual(paths(((), ())), 3)
+
+    def test_interned_subtrees(self):
+        size = get_functional('size')
+        self.assertEqual(size(((), ((),))), size((((),), ())))
+        # Deep paths work and repeat evaluations only hit the table
+        deep = ()
+        for _ in range(5000):
+            deep = (deep,)
+        self.assertEqual(size(deep), 5001)
+        misses = size.cache_info().misses
+        self.assertEqual(size.evaluate_levels(list(range(5001))), 5001)
+        self.assertEqual(size.cache_info().misses, misses)
+        # Evicted children are recomputed correctly
+        tiny = get_functional('symmetry', cache_size=2)
+        for levels in generate_level_sequences(7):
+            self.assertEqual(tiny.evaluate_levels(levels),
+                             get_functional('symmetry')(canonical_tree(level_sequence_to_tree(levels))))
+
+    def test_canonical_tree(self):
+        a = canonical_tree(((), ((),)))
+        b = canonical_tree((((),), ()))
+        self.assertEqual(a, b)
+        deep = ()
+        for _ in range(5000):
+            deep = (deep,)
+        self.assertEqual(tree_to_level_sequence(canonical_tree(deep)), list(range(5001)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the instrumented generator paths.
+"""
+
+import importlib
+import unittest
+
+from rootrees import optimized
+from rootrees.genstats import EnumerationStats
+
+
+# OEIS A000081, a(0)..a(10)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719]
+
+
+class TestEnumerationStats(unittest.TestCase):
+    """Test that instrumentation changes nothing but fills the counters."""
+
+    def setUp(self):
+        self.optimized = optimized
+        self.original = importlib.import_module('rootrees.list-rooted-trees')
+
+    def check_levels(self, stats, n):
+        self.assertEqual(sorted(stats.levels), list(range(1, n + 1)))
+        treeid_size = 0
+        for size in range(1, n + 1):
+            level = stats.levels[size]
+            treeid_size += A000081[size]
+            self.assertEqual(level.trees, A000081[size])
+            self.assertEqual(level.treeid_size, treeid_size)
+            self.assertGreaterEqual(level.seconds, 0.0)
+
+    def test_optimized_same_trees(self):
+        for n in range(1, 11):
+            stats = EnumerationStats()
+            plain = list(self.optimized.generate_rooted_trees(n))
+            self.assertEqual(list(self.optimized.generate_rooted_trees(n, stats=stats)), plain)
+            self.check_levels(stats, n)
+        self.assertGreater(stats.successor_calls, 0)
+        self.assertGreater(stats.rejections, 0)
+        self.assertLessEqual(stats.rejections, stats.candidates)
+
+    def test_original_same_trees(self):
+        for n in range(1, 11):
+            self.original.treeid = {(): 0}
+            plain = list(self.original.trees(n))
+            self.original.treeid = {(): 0}
+            stats = EnumerationStats()
+            self.assertEqual(list(self.original.trees(n, stats)), plain)
+            self.check_levels(stats, n)
+        self.assertEqual(stats.cache_misses, sum(A000081[2:11]))
+
+    def test_original_reused_treeid(self):
+        # The global treeid survives between calls; sizes still add up
+        self.original.treeid = {(): 0}
+        list(self.original.trees(8))
+        stats = EnumerationStats()
+        list(self.original.trees(8, stats))
+        self.assertEqual(stats.cache_misses, 0)
+        self.assertEqual(stats.levels[8].treeid_size, sum(A000081[1:9]))
+        self.assertEqual(stats.levels[5].treeid_size, sum(A000081[1:9]))
+
+    def test_report(self):
+        stats = EnumerationStats()
+        list(self.optimized.generate_rooted_trees(6, stats=stats))
+        report = stats.as_dict()
+        self.assertEqual(report['levels'][6]['trees'], 20)
+        self.assertIn("rejections:", stats.format())
+        self.assertGreaterEqual(stats.total_seconds, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for operadic grafting and the composition table.
+"""
+
+import unittest
+
+from rootrees.grafting import GraftingEngine, graft
+from rootrees.levelseq import canonical_form
+
+
+# A000081
+ROOTED_TREES = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719]
+
+
+def _naive_graft(tree, leaf, s):
+    """Replace the given leaf (canonical preorder) of a nested tuple by s."""
+    # Sort every node's children as in the canonical level sequence first
+    def canonical(node):
+        return tuple(sorted((canonical(c) for c in node),
+                            key=canonical_form, reverse=True))
+
+    count = 0
+    def replace(node):
+        nonlocal count
+        if not node:
+            count += 1
+            return s if count == leaf + 1 else node
+        return tuple(replace(c) for c in node)
+
+    return canonical_form(replace(canonical(tree)))
+
+
+class TestGrafting(unittest.TestCase):
+    """Test grafts against direct substitution into nested tuples."""
+
+    def setUp(self):
+        self.engine = GraftingEngine()
+
+    def test_example(self):
+        self.assertEqual(graft(((), ()), 0, ((),)), (((),), ()))
+        # Leaf 0 of ((), ((),)) is the deeper one in canonical order
+        self.assertEqual(graft(((), ((),)), 0, ((),)), ((((),),), ()))
+        self.assertEqual(graft(((), ((),)), 1, ((),)), (((),), ((),)))
+
+    def test_matches_substitution(self):
+        engine = self.engine
+        for i in range(1, 7):
+            for j in range(1, 5):
+                for t in engine.trees(i):
+                    for s in engine.trees(j):
+                        for leaf in range(engine.leaves[t]):
+                            result = engine.graft(t, leaf, s)
+                            self.assertEqual(
+                                engine.level_sequence(result),
+                                _naive_graft(engine.tree(t), leaf, engine.tree(s)))
+                            self.assertEqual(engine.sizes[result], i + j - 1)
+
+    def test_identity(self):
+        engine = self.engine
+        for t in engine.trees(6):
+            self.assertEqual(engine.graft(0, 0, t), t)
+            for leaf in range(engine.leaves[t]):
+                self.assertEqual(engine.graft(t, leaf, 0), t)
+
+    def test_ids_are_canonical(self):
+        engine = self.engine
+        self.assertEqual(engine.tree_id(((), ((),))), engine.tree_id((((),), ())))
+        for n in range(1, 8):
+            trees = engine.trees(n)
+            self.assertEqual(len(set(trees)), ROOTED_TREES[n])
+            for t in trees:
+                self.assertEqual(engine.level_sequence(t), canonical_form(engine.tree(t)))
+
+    def test_bad_leaf(self):
+        t = self.engine.tree_id(((), ()))
+        with self.assertRaises(IndexError):
+            self.engine.graft(t, 2, 0)
+        with self.assertRaises(IndexError):
+            self.engine.graft(t, -1, 0)
+
+    def test_leaf_orbits(self):
+        engine = self.engine
+        for n in range(1, 9):
+            for t in engine.trees(n):
+                orbits = engine.leaf_orbits(t)
+                self.assertEqual(sum(count for _, count in orbits), engine.leaves[t])
+                # Every leaf of a class gives the same graft
+                for s in engine.trees(3):
+                    results = {engine.graft(t, leaf, s) for leaf in range(engine.leaves[t])}
+                    self.assertLessEqual(len(results), len(orbits))
+
+    def test_bulk_grafts(self):
+        engine = self.engine
+        for i, j in [(2, 3), (4, 4), (5, 2)]:
+            pairs = list(engine.grafts(i, j))
+            self.assertEqual(len(pairs), ROOTED_TREES[i] * ROOTED_TREES[j])
+            for t, s, results in pairs:
+                self.assertEqual(sum(results.values()), engine.leaves[t])
+                for leaf in range(engine.leaves[t]):
+                    self.assertIn(engine.graft(t, leaf, s), results)
+
+    def test_covers_all_but_stars(self):
+        # A tree is a graft of two trees with at least 2 nodes unless it is a star
+        engine = self.engine
+        for n in range(3, 11):
+            results = set()
+            for i in range(2, n):
+                for _, _, grafted in engine.grafts(i, n + 1 - i):
+                    results.update(grafted)
+            self.assertEqual(len(results), ROOTED_TREES[n] - 1)
+
+    def test_composition_table(self):
+        engine = self.engine
+        list(engine.grafts(6, 3))
+        info = engine.cache_info()
+        self.assertGreater(info.hits, 0)
+        self.assertEqual(info.misses, info.currsize)
+        # Repeating the bulk grafts only reads the table
+        list(engine.grafts(6, 3))
+        self.assertEqual(engine.cache_info().misses, info.misses)
+        engine.cache_clear()
+        self.assertEqual(engine.cache_info(), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
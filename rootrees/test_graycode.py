@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the minimal-change (Gray code) tree enumeration.
+"""
+
+import unittest
+from unittest import mock
+
+from rootrees import graycode
+from rootrees.graycode import (
+    LeafMove,
+    apply_leaf_move,
+    clear_gray_code_cache,
+    generate_gray_code,
+    start_tree,
+    verify_gray_code,
+)
+from rootrees.levelseq import generate_level_sequences
+
+
+# OEIS A000081, a(0)..a(11)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719, 1842]
+
+
+class TestGrayCode(unittest.TestCase):
+    """Test coverage and the single-leaf-move property."""
+
+    def test_covers_every_tree_once(self):
+        for n in range(1, 10):
+            trees = list(generate_gray_code(n))
+            self.assertEqual(len(trees), A000081[n])
+            self.assertEqual(set(trees), set(generate_level_sequences(n)))
+
+    def test_verify(self):
+        for n in range(1, 12):
+            self.assertEqual(verify_gray_code(n), A000081[n])
+
+    def test_starts_at_star(self):
+        self.assertEqual(next(generate_gray_code(6)), (0, 1, 1, 1, 1, 1))
+        self.assertEqual(start_tree(4), [-1, 0, 0, 0])
+
+    def test_events_move_one_leaf(self):
+        parents = start_tree(8)
+        events = list(generate_gray_code(8, 'events'))
+        self.assertEqual(len(events), A000081[8] - 1)
+        for move in events:
+            self.assertIsInstance(move, LeafMove)
+            self.assertNotIn(move.leaf, parents)
+            self.assertNotEqual(move.old_parent, move.new_parent)
+            apply_leaf_move(parents, move)
+            self.assertEqual(parents[0], -1)
+
+    def test_both_pairs_trees_with_events(self):
+        pairs = list(generate_gray_code(7, 'both'))
+        self.assertIsNone(pairs[0][0])
+        self.assertEqual([levels for _, levels in pairs], list(generate_gray_code(7)))
+        self.assertEqual([move for move, _ in pairs[1:]],
+                         list(generate_gray_code(7, 'events')))
+
+    def test_verify_raises_on_bad_order(self):
+        pairs = list(generate_gray_code(5, 'both'))
+        with mock.patch.object(graycode, 'generate_gray_code', return_value=pairs + [(None, pairs[-1][1])]):
+            with self.assertRaises(AssertionError):
+                verify_gray_code(5)
+        with mock.patch.object(graycode, 'generate_gray_code', return_value=pairs[:-1]):
+            with self.assertRaises(AssertionError):
+                verify_gray_code(5)
+
+    def test_cache_keeps_one_order(self):
+        list(generate_gray_code(6))
+        list(generate_gray_code(7))
+        self.assertEqual(graycode._gray_path.cache_info().currsize, 1)
+        clear_gray_code_cache()
+        self.assertEqual(graycode._gray_path.cache_info().currsize, 0)
+
+    def test_apply_rejects_non_leaf(self):
+        with self.assertRaises(ValueError):
+            apply_leaf_move([-1, 0, 1], LeafMove(1, 0, 2))
+
+    def test_unknown_emit_mode(self):
+        with self.assertRaises(ValueError):
+            list(generate_gray_code(4, 'diffs'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the Connes-Kreimer coproduct and antipode.
+"""
+
+import unittest
+from collections import defaultdict
+from itertools import combinations
+
+from rootrees.hopf import HopfEngine
+
+
+LEAF = ()
+LADDER2 = ((),)
+LADDER3 = (((),),)
+CHERRY = ((), ())
+
+
+def _naive_coproduct(hopf, tree):
+    """Delta(t) by listing every admissible cut of a labelled copy of t."""
+    parents = []
+    def label(node, parent):
+        v = len(parents)
+        parents.append(parent)
+        for child in node:
+            label(child, v)
+    label(tree, -1)
+    n = len(parents)
+
+    def ancestors(v):
+        while parents[v] >= 0:
+            v = parents[v]
+            yield v
+
+    def component(root, removed):
+        kids = [v for v in range(n) if parents[v] == root and v not in removed]
+        return tuple(component(k, removed) for k in kids)
+
+    result = defaultdict(int)
+    result[(hopf.tree_id(tree),), ()] += 1
+    for k in range(0, n):
+        for cut in combinations(range(1, n), k):
+            if any(a in cut for v in cut for a in ancestors(v)):
+                continue  # two cut edges on one path
+            pruned = tuple(sorted(hopf.tree_id(component(v, cut)) for v in cut))
+            result[pruned, (hopf.tree_id(component(0, cut)),)] += 1
+    return dict(result)
+
+
+class TestHopfEngine(unittest.TestCase):
+    """Test coproducts and antipodes against direct definitions."""
+
+    def setUp(self):
+        self.hopf = HopfEngine()
+
+    def ids(self, *trees):
+        return tuple(sorted(self.hopf.tree_id(t) for t in trees))
+
+    def test_small_coproducts(self):
+        hopf = self.hopf
+        leaf, ladder2 = self.ids(LEAF), self.ids(LADDER2)
+        self.assertEqual(hopf.coproduct(leaf[0]), {(leaf, ()): 1, ((), leaf): 1})
+        self.assertEqual(hopf.coproduct(ladder2[0]),
+                         {(ladder2, ()): 1, ((), ladder2): 1, (leaf, leaf): 1})
+        cherry = self.ids(CHERRY)
+        self.assertEqual(hopf.coproduct(cherry[0])[leaf, ladder2], 2)
+        self.assertEqual(hopf.coproduct(cherry[0])[leaf * 2, leaf], 1)
+
+    def test_matches_naive_cuts(self):
+        hopf = self.hopf
+        for n in range(1, 8):
+            for tree in hopf.trees(n):
+                nested = _nested(hopf, tree)
+                self.assertEqual(hopf.coproduct(tree), _naive_coproduct(hopf, nested))
+                self.assertEqual(sum(hopf.coproduct(tree).values()), hopf.count_cuts(tree))
+
+    def test_known_antipodes(self):
+        hopf = self.hopf
+        leaf = self.ids(LEAF)[0]
+        ladder2 = self.ids(LADDER2)[0]
+        self.assertEqual(hopf.antipode(leaf), {(leaf,): -1})
+        self.assertEqual(hopf.antipode(ladder2), {(ladder2,): -1, (leaf, leaf): 1})
+        for tree in (LADDER3, CHERRY):
+            expected = {self.ids(tree): -1, self.ids(LEAF, LADDER2): 2,
+                        self.ids(LEAF, LEAF, LEAF): -1}
+            self.assertEqual(hopf.antipode(self.ids(tree)[0]), expected)
+
+    def test_antipode_property(self):
+        # m (S (x) id) Delta(t) = 0 for every tree
+        hopf = self.hopf
+        for n in range(1, 8):
+            for tree, delta, _ in hopf.bulk(n):
+                total = defaultdict(int)
+                for (pruned, trunk), c in delta.items():
+                    for forest, value in hopf.forest_antipode(pruned).items():
+                        total[tuple(sorted(forest + trunk))] += c * value
+                self.assertFalse(any(total.values()), hopf.tree(tree))
+
+    def test_coassociativity(self):
+        hopf = self.hopf
+        for tree in hopf.trees(6):
+            left = defaultdict(int)
+            right = defaultdict(int)
+            for (p, r), c in hopf.coproduct(tree).items():
+                for (pp, pr), c2 in hopf.forest_coproduct(p).items():
+                    left[pp, pr, r] += c * c2
+                for (rp, rr), c2 in hopf.forest_coproduct(r).items():
+                    right[p, rp, rr] += c * c2
+            self.assertEqual({k: v for k, v in left.items() if v},
+                             {k: v for k, v in right.items() if v})
+
+    def test_cache_reuse(self):
+        hopf = self.hopf
+        list(hopf.bulk(8))
+        info = hopf.cache_info()
+        self.assertGreater(info['coproduct'].hits, 0)
+        self.assertEqual(info['coproduct'].currsize, 1 + 1 + 2 + 4 + 9 + 20 + 48 + 115)
+        hopf.cache_clear()
+        self.assertEqual(hopf.cache_info()['coproduct'].currsize, 0)
+
+    def test_format(self):
+        hopf = self.hopf
+        ladder2 = self.ids(LADDER2)[0]
+        self.assertEqual(hopf.format_combination(hopf.antipode(ladder2)), "() () - (())")
+        self.assertEqual(hopf.format_tensor(hopf.coproduct(0)), "1 (x) () + () (x) 1")
+
+
+def _nested(hopf, tree):
+    return tuple(_nested(hopf, c) for c in hopf.children[tree])
+
+
+if __name__ == '__main__':
+    unittest.main()
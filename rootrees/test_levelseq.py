@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the level-sequence representation of rooted trees.
+"""
+
+import inspect
+import sys
+import unittest
+
+from rootrees import optimized
+from rootrees.levelseq import (
+    MAX_FORM_DEPTH,
+    canonical_form,
+    common_prefix_length,
+    generate_level_sequences,
+    level_sequence_to_parents,
+    level_sequence_to_string,
+    level_sequence_to_tree,
+    parents_to_level_sequence,
+    tree_to_level_sequence,
+)
+
+# OEIS A000081, a(0)..a(14)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719, 1842, 4766, 12486, 32973]
+
+
+class TestGenerateLevelSequences(unittest.TestCase):
+    """Test the Beyer-Hedetniemi generator."""
+
+    def test_counts_match_oeis(self):
+        for n in range(1, len(A000081)):
+            self.assertEqual(sum(1 for _ in generate_level_sequences(n)), A000081[n])
+
+    def test_sequences_are_unique(self):
+        for n in range(1, 10):
+            sequences = list(generate_level_sequences(n))
+            self.assertEqual(len(sequences), len(set(sequences)))
+
+    def test_decreasing_lexicographic_order(self):
+        sequences = list(generate_level_sequences(8))
+        self.assertEqual(sequences, sorted(sequences, reverse=True))
+        self.assertEqual(sequences[0], tuple(range(8)))
+        self.assertEqual(sequences[-1], (0,) + (1,) * 7)
+
+    def test_empty_for_nonpositive_n(self):
+        self.assertEqual(list(generate_level_sequences(0)), [])
+
+
+class TestConversions(unittest.TestCase):
+    """Test conversions between tree representations."""
+
+    def setUp(self):
+        self.optimized = optimized
+
+    def test_tuple_round_trip(self):
+        for tree in self.optimized.generate_rooted_trees(7):
+            levels = tree_to_level_sequence(tree)
+            self.assertEqual(level_sequence_to_tree(levels), tree)
+
+    def test_parent_round_trip(self):
+        for levels in generate_level_sequences(7):
+            parents = level_sequence_to_parents(levels)
+            self.assertEqual(parents[0], -1)
+            self.assertEqual(tuple(parents_to_level_sequence(parents)), levels)
+
+    def test_string_matches_tree_to_string(self):
+        for tree in self.optimized.generate_rooted_trees(6):
+            levels = tree_to_level_sequence(tree)
+            for style in ('parens', 'brackets'):
+                self.assertEqual(level_sequence_to_string(levels, style),
+                                 self.optimized.tree_to_string(tree, style))
+
+    def test_canonical_form_depth(self):
+        def path(nodes):
+            tree = ()
+            for _ in range(nodes - 1):
+                tree = (tree,)
+            return tree
+
+        self.assertEqual(canonical_form(((), ((),))), canonical_form((((),), ())))
+        # Deepest storable tree, built without recursion
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack()) + 50)
+        try:
+            deep = canonical_form((path(MAX_FORM_DEPTH), ()))
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertEqual(max(deep), MAX_FORM_DEPTH)
+        self.assertEqual(len(deep), MAX_FORM_DEPTH + 2)
+        # One level more is an error, not a wrong tree
+        for tree in (path(MAX_FORM_DEPTH + 2), path(301)):
+            with self.assertRaises(ValueError):
+                canonical_form(tree)
+
+    def test_common_prefix_length(self):
+        self.assertEqual(common_prefix_length(b'abcdef', b'abcxef'), 3)
+        self.assertEqual(common_prefix_length(b'abc', b'abc'), 3)
+        self.assertEqual(common_prefix_length(b'abc', b'abcd'), 3)
+        self.assertEqual(common_prefix_length(b'', b'a'), 0)
+        self.assertEqual(common_prefix_length((0, 1, 2), (1, 1, 2)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,17 @@ Comprehensive test suite for the optimized rooted tree implementation.
 Verifies correctness against OEIS A000081 sequence.
 """
 
+import os
 import sys
 
-# Import the optimized implementation
-exec(open('list-rooted-trees-optimized.py').read())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rootrees.optimized import (  # noqa: E402
+    count_rooted_trees,
+    divisors,
+    generate_rooted_trees,
+    tree_to_string,
+)
 
 
 def test_count_correctness():
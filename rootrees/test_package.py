@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the package interface: lazy loading, import time and the CLI.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import rootrees
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Microseconds of -X importtime; the lazy package takes about 3 ms, while
+# importing every submodule eagerly takes well over 100 ms
+IMPORT_TIME_BUDGET = 50_000
+
+
+def _python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True,
+                          text=True, timeout=60)
+
+
+class TestLazyPackage(unittest.TestCase):
+    """Test that importing the package loads nothing else."""
+
+    def test_import_loads_no_submodules(self):
+        proc = _python('-c', "import sys; before = set(sys.modules); import rootrees; "
+                             "print(sorted(set(sys.modules) - before))")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip(), "['rootrees']")
+
+    def test_import_time(self):
+        def imported(code):
+            proc = _python('-X', 'importtime', '-c', code)
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            rows = [line.split('|') for line in proc.stderr.splitlines()
+                    if line.startswith('import time:') and 'cumulative' not in line]
+            return {row[2].strip(): int(row[1]) for row in rows}
+
+        baseline = imported('pass')
+        modules = imported('import rootrees')
+        self.assertEqual(set(modules) - set(baseline), {'rootrees'})
+        self.assertLess(modules['rootrees'], IMPORT_TIME_BUDGET)
+
+    def test_exports(self):
+        self.assertEqual(rootrees.count_rooted_trees(10), 719)
+        self.assertEqual(len(list(rootrees.generate_level_sequences(7))), 48)
+        for name in rootrees.__all__:
+            try:
+                value = getattr(rootrees, name)
+            except ImportError:  # optional dependency (NumPy) missing
+                continue
+            self.assertTrue(callable(value), name)
+        self.assertIs(rootrees.levelseq, sys.modules['rootrees.levelseq'])
+        self.assertIn('rank_tree', dir(rootrees))
+        with self.assertRaises(AttributeError):
+            rootrees.no_such_name
+
+
+class TestCommandLine(unittest.TestCase):
+    """Test the python -m rootrees subcommands."""
+
+    def run_cli(self, *args):
+        proc = _python('-m', 'rootrees', *args)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        return proc.stdout.splitlines()
+
+    def test_count(self):
+        self.assertEqual(self.run_cli('count', '20'), ['12826228'])
+        self.assertEqual(self.run_cli('count', '8', '--all', '--free')[-1], '8 23')
+
+    def test_list(self):
+        self.assertEqual(self.run_cli('list', '4'),
+                         ['(((())))', '((()()))', '((())())', '(()()())'])
+        self.assertEqual(len(self.run_cli('list', '7', '--free', '--format', 'levels')), 11)
+
+    def test_sample_is_reproducible(self):
+        first = self.run_cli('sample', '15', '-k', '4', '--seed', '3')
+        self.assertEqual(len(first), 4)
+        self.assertEqual(first, self.run_cli('sample', '15', '-k', '4', '--seed', '3'))
+
+    def test_rank_and_unrank(self):
+        n, index = self.run_cli('rank', '((())())')[0].split()
+        self.assertEqual(n, '4')
+        tree = self.run_cli('rank', '--unrank', n, index)[0]
+        self.assertEqual(self.run_cli('rank', tree), [f"{n} {index}"])
+
+    def test_tall_trees(self):
+        self.assertEqual(len(self.run_cli('sample', '400', '--seed', '1')), 1)
+        # The 300-node path, printed as itself rather than capped at depth 255
+        path = '(' * 300 + ')' * 300
+        n, index = self.run_cli('rank', path)[0].split()
+        self.assertEqual(self.run_cli('rank', '--unrank', n, index), [path])
+
+    def test_sample_needs_nodes(self):
+        proc = _python('-m', 'rootrees', 'sample', '0')
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn('n >= 1', proc.stderr)
+
+    def test_invalid_tree(self):
+        proc = _python('-m', 'rootrees', 'rank', '(()')
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn('closing', proc.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
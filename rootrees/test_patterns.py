@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for counting pattern occurrences over all rooted trees of a size.
+"""
+
+import unittest
+
+from rootrees.levelseq import generate_level_sequences
+from rootrees.optimized import count_rooted_trees
+from rootrees.patterns import (
+    PatternCounter,
+    PatternCounts,
+    brute_force_counts,
+    count_pattern,
+    count_patterns,
+    occurrences,
+)
+
+
+class TestPatterns(unittest.TestCase):
+    """Compare the generating functions with matching every tree."""
+
+    def test_occurrences(self):
+        # Root with a leaf and a path of two: the cherry occurs at the root only
+        tree = ((), ((),))
+        self.assertEqual(occurrences(tree, "(()())"), 1)
+        self.assertEqual(occurrences(tree, "(())"), 2)
+        self.assertEqual(occurrences(tree, "()"), 4)
+        self.assertEqual(occurrences(tree, "((()))"), 1)
+        self.assertEqual(occurrences(tree, "(()()())"), 0)
+
+    def test_all_small_patterns(self):
+        for k in range(1, 6):
+            for levels in generate_level_sequences(k):
+                series = PatternCounter(list(levels)).series(9)
+                for n in range(1, 10):
+                    self.assertEqual(series[n], brute_force_counts(list(levels), n))
+
+    def test_wide_and_deep_patterns(self):
+        for pattern in ("(()()()())", "((((()))))", "((()())(()()))", "((()())())"):
+            series = PatternCounter(pattern).series(10)
+            for n in range(1, 11):
+                self.assertEqual(series[n], brute_force_counts(pattern, n))
+
+    def test_trivial_patterns(self):
+        # The single node occurs everywhere; a pattern of size n is one tree
+        series = PatternCounter(()).series(12)
+        for n in range(1, 13):
+            a = count_rooted_trees(n)
+            self.assertEqual(series[n], PatternCounts(a, n * a))
+        for levels in generate_level_sequences(6):
+            self.assertEqual(count_pattern(list(levels), 6), PatternCounts(1, 1))
+            self.assertEqual(count_pattern(list(levels), 5), PatternCounts(0, 0))
+
+    def test_pattern_forms(self):
+        expected = count_pattern("(()(()))", 8)
+        for pattern in ([0, 1, 1, 2], (0, 1, 2, 1), b"\x00\x01\x02\x01", ((), ((),)), "([][{}])"):
+            self.assertEqual(count_pattern(pattern, 8), expected)
+
+    def test_batch(self):
+        batch = count_patterns(["(()())", "((()))", ((), ()), "(())"], 9)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch[b"\x00\x01\x01"], brute_force_counts("(()())", 9))
+        self.assertEqual(batch[b"\x00\x01"], brute_force_counts("(())", 9))
+        self.assertEqual(batch[b"\x00\x01"].trees, count_rooted_trees(9))
+
+    def test_large_n(self):
+        for n in range(1, 301):
+            count_rooted_trees(n)
+        series = PatternCounter("(()(()))").series(300)
+        for n in (100, 200, 300):
+            self.assertLess(series[n].trees, count_rooted_trees(n))
+            self.assertGreater(series[n].occurrences, series[n].trees)
+        # Almost every large tree contains a small pattern
+        self.assertGreater(series[300].trees * 1000, 999 * count_rooted_trees(300))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for plane tree enumeration and bucketing into unordered classes.
+"""
+
+import unittest
+from collections import Counter
+
+from rootrees.levelseq import canonical_level_sequence, generate_level_sequences
+from rootrees.planetrees import (
+    PlaneCanonicalizer,
+    bucket_plane_trees,
+    catalan,
+    count_plane_embeddings,
+    generate_dyck_words,
+    generate_plane_trees,
+    _prefixes,
+)
+
+
+# A000108 and A000081
+CATALAN = [1, 1, 2, 5, 14, 42, 132, 429, 1430, 4862, 16796]
+ROOTED_TREES = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719]
+
+
+class TestPlaneTrees(unittest.TestCase):
+    """Test the enumerators and the class multiplicities."""
+
+    def test_catalan(self):
+        self.assertEqual([catalan(k) for k in range(11)], CATALAN)
+
+    def test_plane_trees(self):
+        for n in range(1, 10):
+            trees = [tuple(levels) for levels in generate_plane_trees(n)]
+            self.assertEqual(len(trees), CATALAN[n - 1])
+            self.assertEqual(len(set(trees)), len(trees))
+            self.assertEqual(trees, sorted(trees))
+            for levels in trees:
+                self.assertEqual(levels[0], 0)
+                self.assertTrue(all(1 <= b <= a + 1 for a, b in zip(levels, levels[1:])))
+        self.assertEqual(list(generate_plane_trees(0)), [])
+
+    def test_dyck_words(self):
+        self.assertEqual(list(generate_dyck_words(0)), [""])
+        self.assertEqual(list(generate_dyck_words(3)),
+                         ["()()()", "()(())", "(())()", "(()())", "((()))"])
+        for k in range(7):
+            words = list(generate_dyck_words(k))
+            self.assertEqual(len(set(words)), CATALAN[k])
+
+    def test_buckets(self):
+        for n in range(1, 11):
+            buckets = bucket_plane_trees(n)
+            self.assertEqual(sum(buckets.values()), CATALAN[n - 1])
+            self.assertEqual(len(buckets), ROOTED_TREES[n])
+            expected = {bytes(levels): count_plane_embeddings(levels)
+                        for levels in generate_level_sequences(n)}
+            self.assertEqual(buckets, expected)
+
+    def test_buckets_match_sorting(self):
+        # Canonicalizing each plane tree independently gives the same buckets
+        for n in range(1, 9):
+            direct = Counter(bytes(canonical_level_sequence(levels))
+                             for levels in generate_plane_trees(n))
+            self.assertEqual(bucket_plane_trees(n), dict(direct))
+
+    def test_canonical_id(self):
+        canonicalizer = PlaneCanonicalizer()
+        counts = canonicalizer.bucket(7)
+        again = Counter(canonicalizer.canonical_id(levels) for levels in generate_plane_trees(7))
+        self.assertEqual(dict(counts), dict(again))
+        self.assertEqual(canonicalizer.canonical_id([0, 1, 2, 1]),
+                         canonicalizer.canonical_id([0, 1, 1, 2]))
+
+    def test_prefixes_partition(self):
+        n = 9
+        total = Counter()
+        prefixes = _prefixes(n, 10)
+        self.assertGreaterEqual(len(prefixes), 10)
+        for prefix in prefixes:
+            canonicalizer = PlaneCanonicalizer()
+            for tree, count in canonicalizer.bucket(n, prefix).items():
+                total[canonicalizer.form(tree)] += count
+        self.assertEqual(dict(total), bucket_plane_trees(n))
+
+    def test_workers(self):
+        self.assertEqual(bucket_plane_trees(9, jobs=2), bucket_plane_trees(9))
+
+
+if __name__ == '__main__':
+    unittest.main()
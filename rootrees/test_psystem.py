@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched P-system simulator.
+"""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from rootrees.optimized import generate_rooted_trees
+    from rootrees.psystem import DEFAULT_RULES, PSystem, parse_rule, simulate, sweep
+
+
+# A000081
+ROOTED_TREES = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719]
+
+STAR3 = ((), (), ())
+PATH3 = (((),),)
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestPSystem(unittest.TestCase):
+    """Test rule semantics on small structures and batching on all of them."""
+
+    def run_one(self, rules, tree, skin='', regions='', steps=None):
+        system = PSystem(rules)
+        batch = system.batch([tree], skin, regions)
+        if steps is None:
+            system.run(batch)
+        else:
+            for _ in range(steps):
+                system.step(batch)
+        return batch
+
+    def test_parse_rule(self):
+        rule = parse_rule('a a b -> c d:out e:in #')
+        self.assertEqual(rule.lhs, ['a', 'a', 'b'])
+        self.assertEqual((rule.here, rule.out, rule.inside, rule.dissolve),
+                         (['c'], ['d'], ['e'], True))
+        self.assertEqual(parse_rule('a ->').here, [])
+        for bad in ['a b', '-> a', 'a -> b:up', 'a:out -> b', 'a -> :in']:
+            with self.assertRaises(ValueError):
+                parse_rule(bad)
+
+    def test_maximal_parallelism(self):
+        # 5 a: two applications of the first rule, then one of the second
+        batch = self.run_one(['a a -> b', 'a -> c'], (), skin='a a a a a', steps=1)
+        self.assertEqual(batch.multiset(0), {'b': 2, 'c': 1})
+        # Products only become available at the next step
+        batch = self.run_one(['a -> a a'], (), skin='a', steps=3)
+        self.assertEqual(batch.multiset(0), {'a': 8})
+        self.assertEqual(batch.steps[0], 3)
+
+    def test_halting(self):
+        batch = self.run_one(['a a -> b'], (), skin='a a a')
+        self.assertTrue(batch.halted[0])
+        self.assertEqual(batch.steps[0], 1)
+        self.assertEqual(batch.multiset(0), {'a': 1, 'b': 1})
+        # Never halts: stopped by max_steps
+        system = PSystem(['a -> a'])
+        batch = system.run(system.batch([()], 'a'), max_steps=7)
+        self.assertFalse(batch.halted[0])
+        self.assertEqual(batch.steps[0], 7)
+
+    def test_communication(self):
+        # b travels from the deepest region to the environment, one level a step
+        system = PSystem(['b -> b:out'])
+        batch = system.batch([PATH3])
+        batch.counts[2] = system.vector('b b')
+        system.step(batch)
+        self.assertEqual(batch.multiset(1), {'b': 2})
+        system.run(batch)
+        self.assertEqual(batch.multiset(0, environment=True), {'b': 2})
+        self.assertEqual(batch.steps[0], 3)
+
+    def test_inside_split(self):
+        batch = self.run_one(['a -> b:in'], STAR3, skin='a a a a a', steps=1)
+        self.assertEqual([batch.multiset(r) for r in batch.regions(0)],
+                         [{}, {'b': 2}, {'b': 2}, {'b': 1}])
+        # No children: the rule does not apply and the next one does
+        batch = self.run_one(['a -> b:in', 'a -> c'], (), skin='a')
+        self.assertEqual(batch.multiset(0), {'c': 1})
+
+    def test_dissolution(self):
+        system = PSystem(['x -> y #'], objects=['a'])
+        batch = system.batch([PATH3], regions='a')
+        batch.counts[1] += system.vector('x')
+        system.step(batch)
+        self.assertEqual(batch.membranes()[0], 2)
+        self.assertEqual(batch.multiset(0), {'a': 2, 'y': 1})
+        self.assertEqual(batch.multiset(1), {})
+        # The innermost membrane now sits in the skin
+        self.assertEqual(batch.parent[2], 0)
+        # The skin does not dissolve
+        batch = self.run_one(['x -> y #'], (), skin='x')
+        self.assertEqual(batch.multiset(0), {'x': 1})
+        self.assertEqual(batch.steps[0], 0)
+
+    def test_nested_dissolution(self):
+        system = PSystem(['x -> #', 'b -> b:out'])
+        batch = system.batch([((((),),),)])
+        batch.counts[1:3] = system.vector('x')
+        batch.counts[3] = system.vector('b')
+        system.step(batch)
+        # Regions 1 and 2 dissolve together; 3 hands b to its new parent
+        self.assertEqual(batch.alive.tolist(), [True, False, False, True])
+        self.assertEqual(batch.parent[3], 0)
+        self.assertEqual(batch.multiset(0), {'b': 1})
+
+    def test_batch_matches_single_runs(self):
+        system = PSystem(DEFAULT_RULES)
+        for n in range(1, 8):
+            trees = list(generate_rooted_trees(n))
+            batch = system.run(system.batch(trees, 'a a a a'))
+            self.assertEqual(len(batch), ROOTED_TREES[n])
+            self.assertTrue(batch.halted.all())
+            for index, tree in enumerate(trees):
+                single = system.run(system.batch([tree], 'a a a a'))
+                self.assertEqual(batch.steps[index], single.steps[0])
+                self.assertEqual(batch.multiset(index, environment=True),
+                                 single.multiset(0, environment=True))
+                rows = batch.regions(index)
+                self.assertTrue((batch.counts[rows.start:rows.stop] == single.counts).all())
+
+    def test_conservation(self):
+        # a and c are conserved: every a ends up as one c
+        system = PSystem(DEFAULT_RULES)
+        batch = simulate(system, 8, 'a a a')
+        c = system.objects.index('c')
+        per_structure = numpy.bincount(batch.structure, weights=batch.counts[:, c])
+        self.assertTrue((per_structure + batch.environment[:, c] == 3).all())
+
+    def test_overflow_is_detected(self):
+        system = PSystem(['a -> a a'])
+        batch = system.run(system.batch([()], 'a'), max_steps=60)
+        self.assertEqual(batch.multiset(0), {'a': 2 ** 60})
+        with self.assertRaises(OverflowError):
+            system.run(batch, max_steps=10)
+        # Rules that do not multiply objects are never checked
+        self.assertEqual(PSystem(['a a -> b']).growth, 1.0)
+
+    def test_sweep(self):
+        system = PSystem(DEFAULT_RULES)
+        inline = sweep(system, range(1, 8), 'a a', jobs=1)
+        pooled = sweep(system, range(1, 8), 'a a', jobs=2)
+        self.assertEqual(sorted(inline), list(range(1, 8)))
+        for n in inline:
+            self.assertEqual(inline[n].structures, ROOTED_TREES[n])
+            self.assertTrue((inline[n].steps == pooled[n].steps).all())
+            self.assertTrue((inline[n].environment == pooled[n].environment).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
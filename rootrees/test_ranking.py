@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for ranking, unranking and sampling of rooted trees.
+"""
+
+import random
+import unittest
+
+from rootrees.levelseq import (
+    canonical_form, generate_level_sequences, level_sequence_to_tree, tree_to_level_sequence,
+)
+from rootrees.ranking import count_forests, random_tree, rank_tree, unrank_tree
+
+
+# OEIS A000081, a(0)..a(10)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286, 719]
+
+
+class TestRanking(unittest.TestCase):
+    """Test that ranks are a bijection onto range(a(n))."""
+
+    def test_count_forests(self):
+        for n in range(1, 11):
+            self.assertEqual(count_forests(n - 1, n - 1), A000081[n])
+
+    def test_round_trip(self):
+        for n in range(1, 10):
+            forms = set()
+            for index in range(A000081[n]):
+                tree = unrank_tree(n, index)
+                self.assertEqual(rank_tree(tree), (n, index))
+                forms.add(canonical_form(tree))
+            expected = {bytes(levels) for levels in generate_level_sequences(n)}
+            self.assertEqual(forms, expected)
+
+    def test_child_order_ignored(self):
+        for levels in generate_level_sequences(8):
+            tree = level_sequence_to_tree(levels)
+            self.assertEqual(rank_tree(tree), rank_tree(tuple(reversed(tree))))
+
+    def test_large_n(self):
+        tree = random_tree(120, random.Random(7))
+        n, index = rank_tree(tree)
+        self.assertEqual(n, 120)
+        self.assertEqual(canonical_form(unrank_tree(n, index)), canonical_form(tree))
+
+    def test_hundreds_of_nodes(self):
+        # Deeper than both the recursion limit allows and byte forms store
+        path = ()
+        for _ in range(399):
+            path = (path,)
+        n, index = rank_tree(path)
+        self.assertEqual(n, 400)
+        self.assertEqual(tree_to_level_sequence(unrank_tree(n, index)), list(range(400)))
+        tree = random_tree(400, random.Random(3))
+        self.assertEqual(rank_tree(unrank_tree(*rank_tree(tree))), rank_tree(tree))
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            unrank_tree(4, 4)
+        with self.assertRaises(ValueError):
+            unrank_tree(0, 0)
+        with self.assertRaises(ValueError):
+            random_tree(0)
+
+    def test_sampling_covers_all_trees(self):
+        rng = random.Random(1)
+        seen = {canonical_form(random_tree(6, rng)) for _ in range(500)}
+        self.assertEqual(len(seen), A000081[6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the tree attention masks.
+"""
+
+import os
+import sys
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from rootrees.levelseq import canonical_form, generate_level_sequences, level_sequence_to_parents
+
+if numpy is not None:
+    from rootrees.treemasks import MASKS, node_level_sequence, tree_masks
+
+
+def _naive_masks(levels):
+    """Every mask built node by node from the parent array."""
+    parents = level_sequence_to_parents(levels)
+    n = len(levels)
+
+    def path(v):
+        nodes = [v]
+        while parents[nodes[-1]] >= 0:
+            nodes.append(parents[nodes[-1]])
+        return nodes
+
+    paths = [path(v) for v in range(n)]
+    masks = {name: [[0] * n for _ in range(n)] for name in MASKS}
+    for i in range(n):
+        for j in range(n):
+            common = len(set(paths[i]) & set(paths[j]))
+            masks['ancestor'][i][j] = int(j in paths[i][1:])
+            masks['descendant'][i][j] = int(i in paths[j][1:])
+            masks['sibling'][i][j] = int(i != j and parents[i] == parents[j] >= 0)
+            masks['depth'][i][j] = levels[j] - levels[i]
+            masks['distance'][i][j] = len(paths[i]) + len(paths[j]) - 2 * common
+    return masks
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestTreeMasks(unittest.TestCase):
+    """Test vectorized masks against a per-node construction."""
+
+    def trees(self, sizes):
+        return [list(levels) for n in sizes for levels in generate_level_sequences(n)]
+
+    def test_padded(self):
+        trees = self.trees(range(1, 8))
+        result = tree_masks(trees)
+        self.assertEqual(result['ancestor'].shape, (len(trees), 7, 7))
+        self.assertEqual(result['ancestor'].dtype, bool)
+        self.assertEqual(result['distance'].dtype, numpy.int8)
+        for b, levels in enumerate(trees):
+            n = len(levels)
+            self.assertEqual(result['lengths'][b], n)
+            expected = _naive_masks(levels)
+            for name in MASKS:
+                mask = result[name][b]
+                self.assertEqual(mask[:n, :n].astype(int).tolist(), expected[name], name)
+            # Padding
+            self.assertFalse(result['ancestor'][b][n:].any())
+            self.assertFalse(result['sibling'][b][:, n:].any())
+            self.assertTrue((result['distance'][b][n:] == -1).all())
+
+    def test_ragged(self):
+        trees = self.trees([6, 3, 5])
+        padded = tree_masks(trees)
+        ragged = tree_masks(trees, layout='ragged')
+        self.assertEqual(ragged['ancestor'].data.size, sum(len(t) ** 2 for t in trees))
+        self.assertEqual(len(ragged['sibling']), len(trees))
+        for b, levels in enumerate(trees):
+            n = len(levels)
+            for name in MASKS:
+                self.assertTrue((ragged[name][b] == padded[name][b][:n, :n]).all(), name)
+
+    def test_inputs(self):
+        levels = [0, 1, 2, 2, 1]
+        expected = tree_masks([levels])
+        for same in [tree_masks([tuple(levels)]), tree_masks([bytes(levels)]),
+                     tree_masks([level_sequence_to_parents(levels)], parents=True),
+                     tree_masks([canonical_form(((), ((), ())))])]:
+            for name in MASKS:
+                self.assertTrue((same[name] == expected[name]).all(), name)
+
+    def test_selection_and_self(self):
+        result = tree_masks([[0, 1, 1]], masks=['ancestor'], include_self=True)
+        self.assertEqual(set(result), {'ancestor', 'lengths'})
+        self.assertEqual(result['ancestor'][0].astype(int).tolist(),
+                         [[1, 0, 0], [1, 1, 0], [1, 0, 1]])
+
+    def test_large_trees(self):
+        # Distances past 127 switch to int16
+        path = list(range(100))
+        result = tree_masks([path], masks=['distance'])
+        self.assertEqual(result['distance'].dtype, numpy.int16)
+        self.assertEqual(result['distance'][0, 0, 99], 99)
+        self.assertEqual(result['distance'][0, 99, 0], 99)
+
+    def test_errors(self):
+        for bad in [[1, 2], [0, 2], [0, 1, 0], []]:
+            with self.assertRaises(ValueError):
+                tree_masks([bad])
+        for bad in [[0, 0], [-1, 1], [-1, 0, 0, 1]]:
+            with self.assertRaises(ValueError):
+                tree_masks([bad], parents=True)
+        with self.assertRaises(ValueError):
+            tree_masks([[0]], masks=['cousin'])
+        with self.assertRaises(ValueError):
+            tree_masks([[0]], layout='sparse')
+
+    def test_vault_tree(self):
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        try:
+            from vault_tree_bijection import TreeNode
+        finally:
+            sys.path.pop(0)
+        root = TreeNode("vault")
+        notes = TreeNode("notes")
+        root.add_child(TreeNode("index.md", is_file=True))
+        root.add_child(notes)
+        notes.add_child(TreeNode("a.md", is_file=True))
+        notes.add_child(TreeNode("b.md", is_file=True))
+        levels = node_level_sequence(root)
+        self.assertEqual(levels, [0, 1, 1, 2, 2])
+        sibling = tree_masks([levels], masks=['sibling'])['sibling'][0]
+        self.assertTrue(sibling[3, 4] and sibling[1, 2] and not sibling[2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the tree notation parser.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+# TreeNode lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rootrees.bulkwrite import BulkTreeWriter
+from rootrees.levelseq import (
+    generate_level_sequences,
+    level_sequence_to_parents,
+    level_sequence_to_string,
+    level_sequence_to_tree,
+)
+from rootrees.treeparse import (
+    TreeParseError,
+    parse_level_sequence,
+    parse_lines,
+    parse_tree,
+)
+
+
+class TestParseTree(unittest.TestCase):
+    """Test parsing of well-formed trees."""
+
+    def test_round_trip_both_styles(self):
+        for levels in generate_level_sequences(9):
+            for style in ('parens', 'brackets'):
+                text = level_sequence_to_string(levels, style)
+                self.assertEqual(parse_level_sequence(text, style), list(levels))
+                self.assertEqual(parse_level_sequence(text), list(levels))
+
+    def test_output_representations(self):
+        levels = (0, 1, 2, 2, 1)
+        text = level_sequence_to_string(levels)
+        self.assertEqual(parse_tree(text), level_sequence_to_tree(levels))
+        self.assertEqual(parse_tree(text, into='parents'),
+                         level_sequence_to_parents(levels))
+
+    def test_tree_node_output(self):
+        root = parse_tree("(()(()))", into='node')
+        # to_parentheses() sorts children by their string form
+        self.assertEqual(root.to_parentheses(), "((())())")
+        self.assertEqual([child.name for child in root.children], ['1', '2'])
+        self.assertFalse(root.is_file)
+        self.assertTrue(root.children[0].is_file)
+        self.assertIs(root.children[1].children[0].parent, root.children[1])
+
+    def test_single_node_and_whitespace(self):
+        self.assertEqual(parse_level_sequence("()"), [0])
+        self.assertEqual(parse_level_sequence("  ([])\n"), [0, 1])
+
+    def test_deep_tree_without_recursion(self):
+        depth = 100000
+        text = "(" * depth + ")" * depth
+        self.assertEqual(parse_level_sequence(text), list(range(depth)))
+        root = parse_tree(text, into='node')
+        self.assertEqual(len(root.children), 1)
+        nested = parse_tree(text)
+        self.assertEqual(len(nested), 1)
+
+
+class TestParseErrors(unittest.TestCase):
+    """Test error detection and reported positions."""
+
+    def assertError(self, text, position, style='auto'):
+        with self.assertRaises(TreeParseError) as ctx:
+            parse_level_sequence(text, style)
+        self.assertEqual(ctx.exception.position, position, str(ctx.exception))
+        return ctx.exception
+
+    def test_error_positions(self):
+        self.assertError("(()", 3)
+        self.assertError("())", 2)
+        self.assertError("()()", 2)
+        self.assertError("(a)", 1)
+        self.assertError("", 0)
+        self.assertError("(]", 1)
+        self.assertError("([)]", 2)
+
+    def test_bracket_depth_cycle_enforced(self):
+        error = self.assertError("({})", 1)
+        self.assertIn("Expected '['", error.message)
+        self.assertError("([])", 1, style='parens')
+
+    def test_unknown_style(self):
+        with self.assertRaises(ValueError):
+            parse_level_sequence("()", 'curly')
+
+
+class TestParseLines(unittest.TestCase):
+    """Test bulk parsing of one tree per line."""
+
+    def test_bulk_writer_output(self):
+        for style in ('parens', 'brackets'):
+            buffer = io.BytesIO()
+            with BulkTreeWriter(buffer, style) as writer:
+                writer.writemany(generate_level_sequences(10))
+            lines = io.StringIO(buffer.getvalue().decode())
+            parsed = [tuple(levels) for levels in parse_lines(lines)]
+            self.assertEqual(parsed, list(generate_level_sequences(10)))
+
+    def test_line_numbers_and_skip(self):
+        lines = ["(())\n", "\n", "(()\n", "()\n"]
+        with self.assertRaises(TreeParseError) as ctx:
+            list(parse_lines(lines))
+        self.assertEqual(ctx.exception.line, 3)
+        self.assertIn("line 3", str(ctx.exception))
+        self.assertEqual(list(parse_lines(lines, errors='skip')), [[0, 1], [0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the differential verifier.
+"""
+
+import unittest
+
+from rootrees import verify
+from rootrees.levelseq import canonical_form, canonical_level_sequence, generate_level_sequences
+
+
+# OEIS A000081, a(0)..a(8)
+A000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115]
+
+
+def _faulty_forms(n):
+    """Level sequences with the path replaced by a second copy of the star."""
+    for levels in generate_level_sequences(n):
+        if n > 2 and tuple(levels) == tuple(range(n)):
+            levels = [0] + [1] * (n - 1)
+        yield bytes(levels)
+
+
+class TestCanonicalForm(unittest.TestCase):
+    """Test the canonical form used for hashing."""
+
+    def test_matches_generated_sequences(self):
+        from rootrees.levelseq import level_sequence_to_tree
+        for n in range(1, 9):
+            for levels in generate_level_sequences(n):
+                self.assertEqual(canonical_form(level_sequence_to_tree(levels)), bytes(levels))
+
+    def test_child_order_ignored(self):
+        a = (((),), ())
+        b = ((), ((),))
+        self.assertEqual(canonical_form(a), canonical_form(b))
+        self.assertEqual(canonical_level_sequence([0, 1, 1, 2]), (0, 1, 2, 1))
+
+    def test_memo_shared(self):
+        memo = {}
+        self.assertEqual(canonical_form(((), ((),)), memo), bytes([0, 1, 2, 1]))
+        self.assertTrue(memo)
+
+
+class TestVerify(unittest.TestCase):
+    """Test engine fingerprints and mismatch reporting."""
+
+    def test_engines_agree(self):
+        engines = list(verify.ENGINES)
+        results, problems = verify.verify(engines, max_n=8, jobs=1)
+        self.assertEqual(problems, [])
+        for name in engines:
+            for n in range(1, 9):
+                self.assertEqual(results[name, n].count, A000081[n])
+
+    def test_fingerprint_order_independent(self):
+        a = verify.fingerprint('levelseq', 9)
+        b = verify.fingerprint('optimized', 9)
+        self.assertIsNone(a.error)
+        self.assertEqual((a.count, a.digest_sum, a.digest_xor),
+                         (b.count, b.digest_sum, b.digest_xor))
+
+    def test_mismatch_found(self):
+        verify.register_engine('faulty', _faulty_forms, 8)
+        try:
+            _, problems = verify.verify(['levelseq', 'faulty'], max_n=7, jobs=1)
+            self.assertEqual([(n, name) for n, name, _ in problems],
+                             [(n, 'faulty') for n in range(3, 8)])
+            levels, ref_times, other_times = verify.find_first_difference('levelseq', 'faulty', 7)
+            self.assertIn((levels, ref_times, other_times),
+                          [((0, 1, 2, 3, 4, 5, 6), 1, 0), ((0, 1, 1, 1, 1, 1, 1), 1, 2)])
+            self.assertIsNone(verify.find_first_difference('levelseq', 'optimized', 7))
+        finally:
+            del verify.ENGINES['faulty']
+
+
+if __name__ == '__main__':
+    unittest.main()
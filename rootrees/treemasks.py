@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tree-structured attention masks from level sequences.
+
+For a batch of trees, builds the n x n masks that restrict attention to the
+tree's structure, one row per querying node and one column per key node,
+nodes numbered in preorder:
+
+    ancestor[i, j]    j is an ancestor of i
+    descendant[i, j]  j is a descendant of i
+    sibling[i, j]     i and j are distinct children of one parent
+    depth[i, j]       depth(j) - depth(i)
+    distance[i, j]    number of edges on the path from i to j
+
+Everything follows from one running minimum over the level sequence.  In
+preorder, for i < j let m(i, j) = min(levels[i+1 .. j]); then
+
+    i is an ancestor of j   iff  m(i, j) > levels[i]
+    depth of lca(i, j)      =    min(levels[i], m(i, j) - 1)
+
+so a single np.minimum.accumulate over the batch gives ancestry, lowest
+common ancestor depths and with them siblings and distances, with no
+per-node Python loop.
+
+Two layouts are available: 'padded' stacks the masks of all trees into
+(batch, N, N) arrays for the largest size N, padding with False (0 for
+depth, -1 for distance); 'ragged' concatenates the flattened n x n masks
+of every tree into one buffer with offsets (see RaggedMasks), computing
+trees of equal size together.
+
+Requires NumPy.
+"""
+
+import sys
+
+import numpy as np
+
+from .levelseq import level_sequence_to_parents, parents_to_level_sequence
+
+
+MASKS = ('ancestor', 'descendant', 'sibling', 'depth', 'distance')
+LAYOUTS = ('padded', 'ragged')
+
+# Integer masks, stored as int8 when the values fit
+_INTEGER_MASKS = ('depth', 'distance')
+
+
+def node_level_sequence(root):
+    """
+    Level sequence of a tree of node objects with a children list, such as
+    the TreeNode of VaultTreeBijection.folder_structure_to_tree().
+
+    Nodes are numbered in preorder, children in list order.
+    """
+    levels = []
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        levels.append(depth)
+        stack.extend((child, depth + 1) for child in reversed(node.children))
+    return levels
+
+
+def _check_levels(levels):
+    if isinstance(levels, (bytes, bytearray)):
+        levels = np.frombuffer(levels, dtype=np.uint8)
+    levels = np.asarray(levels, dtype=np.int64)
+    if levels.ndim != 1 or not len(levels) or levels[0] != 0 \
+            or (levels[1:] < 1).any() or (np.diff(levels) > 1).any():
+        raise ValueError(f"not a level sequence: {levels.tolist()}")
+    return levels
+
+
+def _parents_levels(parents):
+    parents = [int(p) for p in parents]
+    if not parents or parents[0] != -1 or any(not 0 <= p < i for i, p in
+                                              enumerate(parents[1:], 1)):
+        raise ValueError(f"not a preorder parent array: {parents}")
+    levels = parents_to_level_sequence(parents)
+    # parent[i] < i is not enough: each parent must still be on the current path
+    if level_sequence_to_parents(levels) != parents:
+        raise ValueError(f"parent array is not in preorder: {parents}")
+    return np.array(levels, dtype=np.int64)
+
+
+def _integer_dtype(n):
+    # Distances reach 2 (n - 1)
+    return np.int8 if 2 * (n - 1) <= 127 else np.int16 if n <= 16384 else np.int32
+
+
+def _stacked(levels, lengths, masks, include_self):
+    """Masks of a (batch, N) array of level sequences padded past lengths."""
+    batch, size = levels.shape
+    dtype = _integer_dtype(size)
+    small = levels.astype(dtype)
+    index = np.arange(size)
+    after = index[None, :] > index[:, None]
+    # running[b, i, j] = min(levels[b, i+1 .. j]) for j > i
+    running = np.where(after, small[:, None, :], np.iinfo(dtype).max)
+    np.minimum.accumulate(running, axis=2, out=running)
+    row = small[:, :, None]
+
+    valid = index[None, :] < lengths[:, None]
+    pairs = valid[:, :, None] & valid[:, None, :]
+    result = {}
+    if 'ancestor' in masks or 'descendant' in masks:
+        # below[b, i, j]: j is a proper descendant of i
+        below = after & (running > row) & pairs
+        if include_self:
+            below |= np.eye(size, dtype=bool) & pairs
+        if 'descendant' in masks:
+            result['descendant'] = below
+        if 'ancestor' in masks:
+            result['ancestor'] = np.ascontiguousarray(below.transpose(0, 2, 1))
+    if 'depth' in masks:
+        depth = small[:, None, :] - row
+        depth[~pairs] = 0
+        result['depth'] = depth
+    if 'sibling' in masks or 'distance' in masks:
+        lca = np.minimum(row, running - 1)
+        lca = np.where(after, lca, lca.transpose(0, 2, 1))
+        diagonal = index[:, None] == index[None, :]
+        lca[:, diagonal] = small
+        if 'sibling' in masks:
+            result['sibling'] = (row == small[:, None, :]) & (lca == row - 1) \
+                & ~diagonal & pairs
+        if 'distance' in masks:
+            distance = (row + small[:, None, :] - 2 * lca).astype(dtype)
+            distance[~pairs] = -1
+            result['distance'] = distance
+    return result
+
+
+class RaggedMasks:
+    """
+    Masks of trees of different sizes in one flat buffer.
+
+    Attributes:
+        data: Flattened masks, tree after tree
+        offsets: offsets[b] .. offsets[b + 1] is the n x n mask of tree b
+        sizes: Number of nodes of each tree
+    """
+
+    def __init__(self, data, offsets, sizes):
+        self.data = data
+        self.offsets = offsets
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def __getitem__(self, index):
+        n = int(self.sizes[index])
+        return self.data[self.offsets[index]:self.offsets[index + 1]].reshape(n, n)
+
+
+def tree_masks(trees, masks=MASKS, layout='padded', parents=False, include_self=False):
+    """
+    Attention masks for a batch of trees.
+
+    Args:
+        trees: Level sequences (lists, tuples or bytes), or preorder parent
+               arrays with parents=True
+        masks: Names from MASKS to compute
+        layout: 'padded' or 'ragged'
+        parents: Read the trees as parent arrays (-1 for the root)
+        include_self: Count every node as its own ancestor and descendant
+
+    Returns:
+        Dict {mask name: array}: with the padded layout, boolean (or int8)
+        arrays of shape (batch, N, N) plus 'lengths'; with the ragged
+        layout, RaggedMasks objects plus 'lengths'
+
+    Raises:
+        ValueError: On unknown masks or layouts and malformed trees
+    """
+    unknown = sorted(set(masks) - set(MASKS))
+    if unknown:
+        raise ValueError(f"unknown mask(s): {', '.join(unknown)}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout: {layout}")
+    convert = _parents_levels if parents else _check_levels
+    sequences = [convert(tree) for tree in trees]
+    lengths = np.array([len(levels) for levels in sequences], dtype=np.int64)
+
+    if layout == 'padded':
+        size = int(lengths.max()) if len(lengths) else 0
+        padded = np.zeros((len(sequences), size), dtype=np.int64)
+        for row, levels in zip(padded, sequences):
+            row[:len(levels)] = levels
+        result = _stacked(padded, lengths, masks, include_self)
+        result['lengths'] = lengths
+        return result
+
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum(lengths * lengths, out=offsets[1:])
+    dtype = _integer_dtype(int(lengths.max()) if len(lengths) else 1)
+    result = {name: RaggedMasks(np.zeros(int(offsets[-1]),
+                                         dtype=dtype if name in _INTEGER_MASKS else bool),
+                                offsets, lengths)
+              for name in masks}
+    # Trees of one size share a batch, with no padding
+    for n in np.unique(lengths):
+        members = np.flatnonzero(lengths == n)
+        group = np.stack([sequences[b] for b in members])
+        computed = _stacked(group, np.full(len(members), n), masks, include_self)
+        # Destination positions of every element of every member's mask
+        positions = (offsets[members][:, None] + np.arange(n * n)).ravel()
+        for name in masks:
+            result[name].data[positions] = computed[name].ravel()
+    result['lengths'] = lengths
+    return result
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from .levelseq import generate_level_sequences
+
+    parser = argparse.ArgumentParser(
+        description='Build tree attention masks for every rooted tree with n nodes'
+    )
+    parser.add_argument('n', type=int, help='Number of nodes')
+    parser.add_argument('--min-n', type=int,
+                        help='Also include the trees from this size up (mixed sizes)')
+    parser.add_argument('--layout', choices=LAYOUTS, default='padded',
+                        help='Mask layout (default: %(default)s)')
+    parser.add_argument('--show', action='store_true',
+                        help='Print the masks of the first tree')
+    args = parser.parse_args()
+    if args.n < 1:
+        parser.error("n must be positive")
+
+    sizes = range(args.min_n or args.n, args.n + 1)
+    trees = [levels for n in sizes for levels in generate_level_sequences(n)]
+    start = time.perf_counter()
+    result = tree_masks(trees, layout=args.layout)
+    elapsed = time.perf_counter() - start
+
+    total = 0
+    for name in MASKS:
+        masks = result[name]
+        data = masks.data if args.layout == 'ragged' else masks
+        total += data.nbytes
+        print(f"{name:<10} {str(data.dtype):<5} {'x'.join(map(str, data.shape)):>16}")
+    print(f"{len(trees)} trees, {total / 1e6:.1f} MB of masks in {elapsed:.3f}s",
+          file=sys.stderr)
+
+    if args.show:
+        n = int(result['lengths'][0])
+        print(f"\nlevels {' '.join(map(str, trees[0]))}")
+        for name in MASKS:
+            mask = result[name][0][:n, :n]
+            print(f"{name}:")
+            for line in mask.astype(int):
+                print("  " + " ".join(f"{v:2d}" for v in line))
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Validating parser for the parentheses and bracket tree notations.
+
+Reads the strings produced by tree_to_string(), the bulk writer, the
+Rosetta scripts and TreeNode.to_parentheses():
+
+    parens    (()(()))
+    brackets  ([][{}])   - bracket type cycles with depth: ( [ { ( [ { ...
+
+and converts them into level sequences, nested tuples, parent arrays or
+TreeNode objects.  Parsing never recurses, so trees of any depth are
+accepted; well-formed input is handled with C-level passes (translate,
+accumulate, compress) and a character-by-character scan is only run to
+locate the error in malformed input.
+"""
+
+import sys
+from array import array
+from itertools import accumulate, compress
+from operator import sub
+
+from .levelseq import level_sequence_to_parents, level_sequence_to_tree
+
+
+STYLES = ('auto', 'parens', 'brackets')
+OUTPUTS = ('levels', 'tuple', 'parents', 'node')
+
+_OPENERS = "([{"
+_CLOSERS = ")]}"
+
+# Depth change per bracket as signed bytes: +1 for openers, -1 for closers
+_DELTA = bytes.maketrans(b"([{)]}", b"\x01\x01\x01\xff\xff\xff")
+# Byte mask selecting the opening brackets
+_OPEN_MASK = bytes.maketrans(b"([{)]}", b"\x01\x01\x01\x00\x00\x00")
+# Bracket kind (0 round, 1 square, 2 curly) for every bracket character
+_KIND = bytes.maketrans(b"()[]{}", b"\x00\x00\x01\x01\x02\x02")
+
+
+_MOD3 = (3).__rmod__
+_DECREMENT = (-1).__add__
+
+
+class TreeParseError(ValueError):
+    """Raised for malformed tree notation; carries the offending position."""
+
+    def __init__(self, message, position, line=None):
+        """
+        Args:
+            message: Description of the problem
+            position: 0-based character offset within the tree string
+            line: 1-based line number when parsing in bulk
+        """
+        where = f"position {position}"
+        if line is not None:
+            where = f"line {line}, {where}"
+        super().__init__(f"{message} at {where}")
+        self.message = message
+        self.position = position
+        self.line = line
+
+
+def _locate_error(text, style):
+    """Scan text character by character and raise at the first problem."""
+    expected = []
+    for position, char in enumerate(text):
+        if char in _OPENERS:
+            if position and not expected:
+                raise TreeParseError("Unexpected text after the root closed", position)
+            depth = len(expected)
+            kind = _OPENERS.index(char)
+            if style == 'parens' and kind:
+                raise TreeParseError(f"Unexpected '{char}' in parens style", position)
+            if style == 'brackets' and kind != depth % 3:
+                raise TreeParseError(
+                    f"Expected '{_OPENERS[depth % 3]}' at depth {depth}, found '{char}'",
+                    position
+                )
+            expected.append(_CLOSERS[kind])
+        elif char in _CLOSERS:
+            if not expected:
+                raise TreeParseError(f"Unmatched '{char}'", position)
+            closer = expected.pop()
+            if char != closer:
+                raise TreeParseError(f"Expected '{closer}', found '{char}'", position)
+        else:
+            raise TreeParseError(f"Invalid character {char!r}", position)
+    if not text:
+        raise TreeParseError("Empty tree notation", 0)
+    if expected:
+        raise TreeParseError(f"Missing {len(expected)} closing bracket(s)", len(text))
+    # Only reached when the fast path found a style mismatch it cannot place
+    raise TreeParseError("Malformed tree notation", 0)
+
+
+def _detect_style(text):
+    for char in "[]{}":
+        if char in text:
+            return 'brackets'
+    return 'parens'
+
+
+def parse_level_sequence(text, style='auto'):
+    """
+    Parse tree notation into a level sequence.
+
+    Args:
+        text: Tree string such as "(()())" or "([][])"; surrounding
+              whitespace is ignored
+        style: 'parens', 'brackets' or 'auto' (bracket style if any square
+               or curly bracket is present)
+
+    Returns:
+        List of node depths in preorder
+
+    Raises:
+        TreeParseError: If the string is not a single well-formed tree in
+            the requested style
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unknown style: {style}")
+    text = text.strip()
+    if style == 'auto':
+        style = _detect_style(text)
+
+    encoded = text.encode()
+    if encoded.translate(None, b"()[]{}"):
+        _locate_error(text, style)
+    prefix = list(accumulate(array('b', encoded.translate(_DELTA))))
+
+    # A single tree: the running depth stays positive until the very end
+    if not prefix or prefix[-1] != 0 or (len(prefix) > 1 and min(prefix[:-1]) <= 0):
+        _locate_error(text, style)
+
+    if style == 'parens' and (encoded.count(b'(') * 2 != len(encoded)
+                              or encoded.count(b')') * 2 != len(encoded)):
+        _locate_error(text, style)
+
+    mask = encoded.translate(_OPEN_MASK)
+    if style == 'brackets':
+        # Every bracket of a node at depth d must be of kind d % 3; the
+        # depth is the running depth, minus one after an opener
+        kinds = bytes(map(_MOD3, map(sub, prefix, mask)))
+        if kinds != encoded.translate(_KIND):
+            _locate_error(text, style)
+
+    # Depth of each opener is the running depth after it, minus one
+    return list(map(_DECREMENT, compress(prefix, mask)))
+
+
+def _levels_to_nodes(levels):
+    """Build TreeNode objects for a level sequence without recursion."""
+    from vault_tree_bijection import TreeNode
+
+    nodes = [TreeNode(str(i)) for i in range(len(levels))]
+    for i, parent in enumerate(level_sequence_to_parents(levels)):
+        if parent >= 0:
+            nodes[parent].add_child(nodes[i])
+    for node in nodes:
+        node.is_file = not node.children
+    return nodes[0]
+
+
+def convert_level_sequence(levels, into='levels'):
+    """
+    Convert a parsed level sequence into the requested representation.
+
+    Args:
+        levels: Node depths in preorder
+        into: 'levels', 'tuple' (nested tuples), 'parents' (parent array)
+              or 'node' (TreeNode named by preorder index; leaves are files)
+
+    Returns:
+        The tree in the requested representation
+    """
+    if into == 'levels':
+        return levels
+    if into == 'tuple':
+        return level_sequence_to_tree(levels)
+    if into == 'parents':
+        return level_sequence_to_parents(levels)
+    if into == 'node':
+        return _levels_to_nodes(levels)
+    raise ValueError(f"Unknown output representation: {into}")
+
+
+def parse_tree(text, style='auto', into='tuple'):
+    """
+    Parse tree notation into nested tuples, a level sequence, a parent
+    array or a TreeNode.
+
+    Args:
+        text: Tree string
+        style: 'parens', 'brackets' or 'auto'
+        into: 'tuple', 'levels', 'parents' or 'node'
+
+    Returns:
+        The parsed tree
+
+    Examples:
+        >>> parse_tree("(()(()))")
+        ((), ((),))
+        >>> parse_tree("([][{}])", into='levels')
+        [0, 1, 1, 2]
+    """
+    return convert_level_sequence(parse_level_sequence(text, style), into)
+
+
+def parse_lines(lines, style='auto', into='levels', errors='raise'):
+    """
+    Parse one tree per line, e.g. from a file of millions of trees.
+
+    Blank lines are skipped.  Error positions carry the 1-based line number.
+
+    Args:
+        lines: Iterable of strings (an open text file works)
+        style: 'parens', 'brackets' or 'auto' (decided per line)
+        into: Output representation, as for parse_tree()
+        errors: 'raise' to stop at the first malformed line, 'skip' to
+                ignore malformed lines
+
+    Yields:
+        Parsed trees in input order
+    """
+    if errors not in ('raise', 'skip'):
+        raise ValueError(f"Unknown errors mode: {errors}")
+    for number, line in enumerate(lines, 1):
+        if not line or line.isspace():
+            continue
+        try:
+            levels = parse_level_sequence(line, style)
+        except TreeParseError as e:
+            if errors == 'skip':
+                continue
+            raise TreeParseError(e.message, e.position, number) from None
+        yield convert_level_sequence(levels, into)
+
+
+def parse_file(path, style='auto', into='levels', errors='raise'):
+    """
+    Parse a file with one tree per line.
+
+    Args:
+        path: File path, or '-' for standard input
+        style, into, errors: As for parse_lines()
+
+    Yields:
+        Parsed trees in file order
+    """
+    if path == '-':
+        yield from parse_lines(sys.stdin, style, into, errors)
+        return
+    with open(path, encoding='utf-8') as f:
+        yield from parse_lines(f, style, into, errors)
+
+
+if __name__ == '__main__':
+    import argparse
+    from .bulkwrite import FORMATS, BulkTreeWriter
+
+    parser = argparse.ArgumentParser(
+        description='Validate tree notation files and convert between formats'
+    )
+    parser.add_argument('input', nargs='?', default='-',
+                        help='File with one tree per line (default: stdin)')
+    parser.add_argument('--style', choices=STYLES, default='auto',
+                        help='Input notation (default: auto)')
+    parser.add_argument('--format', choices=FORMATS,
+                        help='Re-emit the parsed trees in this format')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='Skip malformed lines instead of stopping')
+    args = parser.parse_args()
+
+    trees = parse_file(args.input, args.style, 'levels',
+                       'skip' if args.skip_invalid else 'raise')
+    try:
+        if args.format:
+            with BulkTreeWriter(sys.stdout.buffer, args.format) as writer:
+                writer.writemany(trees)
+            count = writer.count
+        else:
+            count = sum(1 for _ in trees)
+    except TreeParseError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Parsed {count} trees", file=sys.stderr)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Streaming differential verification of the rooted tree enumerators.
+
+Every engine enumerates the trees of each size n; every tree is reduced to
+its canonical level sequence (levelseq.canonical_form) and hashed with
+BLAKE2b.  Per (engine, n) only the count and the sum and xor of the 64-bit
+digests are kept, so the result does not depend on the order in which an
+engine lists its trees and memory stays constant however large n is.
+Engines agree on n when all three values match, and the count is also
+checked against count_rooted_trees(n).
+
+The (engine, n) runs are spread over worker processes.  When an engine
+disagrees with the reference engine, both are re-run: the digests are
+split into buckets to find a bucket whose totals differ, and only that
+bucket's trees are collected to print the first tree that one engine
+produced and the other did not (or produced a different number of times).
+
+Usage:
+    python3 -m rootrees.verify            # every engine up to its default limit
+    python3 -m rootrees.verify --max-n 18 --jobs 8
+    python3 -m rootrees.verify --engines optimized bags --max-n 12
+"""
+
+import importlib
+import sys
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hashlib import blake2b
+
+from .levelseq import canonical_form, generate_level_sequences, level_sequence_to_string
+from .optimized import count_rooted_trees
+
+
+DEFAULT_MAX_N = 18
+
+# Memoized subtree forms per run; cleared when it grows past this size
+MEMO_LIMIT = 1 << 18
+
+_MASK = (1 << 64) - 1
+
+Engine = namedtuple('Engine', ['forms', 'max_n', 'description'])
+Result = namedtuple('Result', ['engine', 'n', 'count', 'digest_sum', 'digest_xor',
+                               'seconds', 'error'])
+
+ENGINES = {}
+
+
+def register_engine(name, forms, max_n=DEFAULT_MAX_N, description=""):
+    """
+    Register an enumerator for verification.
+
+    Args:
+        name: Engine name
+        forms: Function of n yielding the canonical form (bytes, see
+               levelseq.canonical_form) of every tree with n nodes; must be
+               a module-level function so worker processes can run it
+        max_n: Largest n to verify by default (slow engines use less)
+        description: Short description for the report
+    """
+    ENGINES[name] = Engine(forms, max_n, description)
+
+
+def _tree_forms(trees):
+    """Canonical forms of nested-tuple trees, with a bounded subtree memo."""
+    memo = {}
+    for tree in trees:
+        if len(memo) > MEMO_LIMIT:
+            memo.clear()
+        yield canonical_form(tree, memo)
+
+
+def _optimized_forms(n):
+    from .optimized import generate_rooted_trees
+    return _tree_forms(generate_rooted_trees(n))
+
+
+def _original_forms(n):
+    module = importlib.import_module('.list-rooted-trees', __package__)
+    module.treeid = {(): 0}
+    return _tree_forms(module.trees(n))
+
+
+def _original_2_forms(n):
+    module = importlib.import_module('.list-rooted-trees-2', __package__)
+    module.treeid = {(): 0}
+    return _tree_forms(module.trees(n))
+
+
+def _bags_forms(n):
+    from .treeparse import parse_tree
+    module = importlib.import_module('.list-rooted-trees-1', __package__)
+    return _tree_forms(parse_tree(text) for _, text in module.bags(n))
+
+
+def _levelseq_forms(n):
+    # Already canonical; a non-canonical sequence shows up as a mismatch
+    return map(bytes, generate_level_sequences(n))
+
+
+def _forests_forms(n):
+    from .forests import ForestEngine
+    return _tree_forms(ForestEngine().trees(n, 'tuple'))
+
+
+def _enumerator_forms(n):
+    from .enumerator import RootedTreeEnumerator
+    return _tree_forms(RootedTreeEnumerator(memory_budget=64 << 20).trees(n))
+
+
+def _graycode_forms(n):
+    from .graycode import generate_gray_code
+    return map(bytes, generate_gray_code(n))
+
+
+def _deltastream_forms(n):
+    import io
+    from .deltastream import DeltaStreamReader, DeltaStreamWriter
+    buffer = io.BytesIO()
+    with DeltaStreamWriter(buffer, n) as writer:
+        writer.writemany(generate_level_sequences(n))
+    buffer.seek(0)
+    return map(bytes, DeltaStreamReader(buffer))
+
+
+register_engine('levelseq', _levelseq_forms, 18, "Beyer-Hedetniemi level sequences")
+register_engine('optimized', _optimized_forms, 18, "generate_rooted_trees")
+register_engine('original', _original_forms, 18, "list-rooted-trees.py")
+register_engine('original-2', _original_2_forms, 16, "list-rooted-trees-2.py")
+register_engine('bags', _bags_forms, 13, "bags() in list-rooted-trees-1.py")
+register_engine('forests', _forests_forms, 18, "ForestEngine")
+register_engine('enumerator', _enumerator_forms, 16, "RootedTreeEnumerator")
+register_engine('deltastream', _deltastream_forms, 16, "delta stream round trip")
+register_engine('graycode', _graycode_forms, 10, "leaf-move Gray code order")
+
+
+def _digest(form):
+    return int.from_bytes(blake2b(form, digest_size=8).digest(), 'little')
+
+
+def fingerprint(name, n):
+    """
+    Enumerate one engine for one n and return its order-independent hash.
+
+    Returns:
+        Result(engine, n, count, digest sum, digest xor, seconds, error)
+    """
+    start = time.perf_counter()
+    try:
+        count = total = xor = 0
+        for form in ENGINES[name].forms(n):
+            digest = _digest(form)
+            count += 1
+            total += digest
+            xor ^= digest
+    except Exception as e:
+        return Result(name, n, 0, 0, 0, time.perf_counter() - start,
+                      f"{type(e).__name__}: {e}")
+    return Result(name, n, count, total & _MASK, xor, time.perf_counter() - start, None)
+
+
+def _bucket_totals(name, n, buckets):
+    counts = [0] * buckets
+    sums = [0] * buckets
+    for form in ENGINES[name].forms(n):
+        digest = _digest(form)
+        counts[digest % buckets] += 1
+        sums[digest % buckets] += digest
+    return counts, sums
+
+
+def _bucket_forms(name, n, buckets, bucket):
+    found = Counter()
+    order = []
+    for form in ENGINES[name].forms(n):
+        if _digest(form) % buckets == bucket:
+            if form not in found:
+                order.append(form)
+            found[form] += 1
+    return found, order
+
+
+def find_first_difference(reference, other, n, buckets=None):
+    """
+    Locate a tree that two engines do not produce equally often.
+
+    Re-runs both engines twice with memory bounded by the bucket size.
+
+    Args:
+        reference, other: Engine names
+        n: Tree size
+        buckets: Number of digest buckets (default: about 256 trees each)
+
+    Returns:
+        (level sequence, times in reference, times in other), or None if
+        the engines agree
+    """
+    if buckets is None:
+        expected = count_rooted_trees(n)
+        buckets = max(1, min(1 << 16, expected // 256))
+    ref_counts, ref_sums = _bucket_totals(reference, n, buckets)
+    other_counts, other_sums = _bucket_totals(other, n, buckets)
+    for bucket in range(buckets):
+        if (ref_counts[bucket], ref_sums[bucket]) != (other_counts[bucket], other_sums[bucket]):
+            break
+    else:
+        return None
+
+    ref_found, ref_order = _bucket_forms(reference, n, buckets, bucket)
+    other_found, other_order = _bucket_forms(other, n, buckets, bucket)
+    # Prefer the first offending tree in the other engine's own order
+    for form in other_order + ref_order:
+        if ref_found[form] != other_found[form]:
+            return tuple(form), ref_found[form], other_found[form]
+    return None
+
+
+def verify(engines, max_n=DEFAULT_MAX_N, jobs=None, ignore_caps=False, progress=None):
+    """
+    Fingerprint every engine for n = 1..max_n and compare.
+
+    Args:
+        engines: Engine names
+        max_n: Largest tree size
+        jobs: Worker processes (None for os.cpu_count(), 1 to run inline)
+        ignore_caps: Run every engine up to max_n even past its default limit
+        progress: Optional callable receiving each Result as it finishes
+
+    Returns:
+        (results, problems): results maps (engine, n) to Result; problems
+        lists (n, engine, message) for every disagreement
+    """
+    tasks = []
+    for name in engines:
+        top = max_n if ignore_caps else min(max_n, ENGINES[name].max_n)
+        tasks.extend((name, n) for n in range(1, top + 1))
+    # Largest first keeps the workers busy until the end
+    tasks.sort(key=lambda task: -task[1])
+
+    results = {}
+    if jobs == 1:
+        for task in tasks:
+            result = fingerprint(*task)
+            results[task] = result
+            if progress:
+                progress(result)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(fingerprint, *task) for task in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.engine, result.n] = result
+                if progress:
+                    progress(result)
+
+    problems = []
+    for n in range(1, max_n + 1):
+        group = [results[name, n] for name in engines if (name, n) in results]
+        if not group:
+            continue
+        expected = count_rooted_trees(n)
+        reference = group[0]
+        for result in group:
+            if result.error:
+                problems.append((n, result.engine, result.error))
+            elif result.count != expected:
+                problems.append((n, result.engine,
+                                 f"count {result.count}, expected {expected}"))
+        for result in group[1:]:
+            if result.error or reference.error:
+                continue
+            if (result.count, result.digest_sum, result.digest_xor) != \
+                    (reference.count, reference.digest_sum, reference.digest_xor):
+                problems.append((n, result.engine, f"hash differs from {reference.engine}"))
+    return results, problems
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Verify that all rooted tree enumerators list the same trees'
+    )
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES),
+                        help='Engines to compare; the first is the reference (default: all)')
+    parser.add_argument('--max-n', type=int, default=DEFAULT_MAX_N,
+                        help='Largest tree size (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--ignore-caps', action='store_true',
+                        help='Run slow engines past their default size limit')
+    args = parser.parse_args()
+
+    for name in args.engines:
+        top = args.max_n if args.ignore_caps else min(args.max_n, ENGINES[name].max_n)
+        print(f"{name:<12} n <= {top:<3} {ENGINES[name].description}")
+    print()
+
+    def report(result):
+        status = result.error or f"{result.count} trees"
+        print(f"  {result.engine:<12} n={result.n:<3} {status:<20} "
+              f"{result.seconds:8.2f}s", flush=True)
+
+    results, problems = verify(args.engines, args.max_n, args.jobs, args.ignore_caps, report)
+
+    if not problems:
+        print(f"\nAll engines agree for every n up to {args.max_n}")
+        sys.exit(0)
+
+    print(f"\n{len(problems)} problem(s):")
+    reference = args.engines[0]
+    for n, name, message in problems:
+        print(f"  n={n} {name}: {message}")
+        if name != reference and (reference, n) in results and not results[reference, n].error:
+            diff = find_first_difference(reference, name, n)
+            if diff:
+                levels, ref_times, other_times = diff
+                print(f"    first differing tree {level_sequence_to_string(levels)} "
+                      f"(levels {' '.join(map(str, levels))}): "
+                      f"{ref_times}x in {reference}, {other_times}x in {name}")
+    sys.exit(1)
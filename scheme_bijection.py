@@ -17,7 +17,7 @@ This creates executable Scheme code that mirrors the structure of the vault.
 
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-from obsidian_vault import MarkdownVault
+from obsidian_vault import MarkdownVault, add_scan_arguments, scan_from_args
 from vault_tree_bijection import VaultTreeBijection, TreeNode
 
 
@@ -424,13 +424,14 @@ def main():
         '--output',
         help='Output file (default: stdout)'
     )
+    add_scan_arguments(parser)
     
     args = parser.parse_args()
     
     # Load vault
     print(f";; Loading vault from: {args.path}", file=__import__('sys').stderr)
     vault = MarkdownVault(args.path)
-    vault.scan()
+    scan_from_args(vault, args, file=__import__('sys').stderr)
     
     scheme_bijection = SchemeVaultBijection(vault)
     
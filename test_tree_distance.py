@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the Structural Tree Distance
+
+Checks the bounds against exact edit distances of small trees, single
+insertions in random trees, very large and very deep inputs, and the
+folder/link comparison of a vault.
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+from collections import deque
+from pathlib import Path
+
+from obsidian_vault import MarkdownVault
+from tree_distance import AUTO_MODE_MAX_NODES, StructuralDistance, tree_distance
+from vault_tree_bijection import TreeNode, VaultTreeBijection
+from rootrees.levelseq import canonical_level_sequence, generate_level_sequences
+
+
+def random_levels(n, rng):
+    """A random plane tree with n nodes as a level sequence."""
+    levels = [0]
+    for _ in range(1, n):
+        levels.append(rng.randint(1, levels[-1] + 1))
+    return levels
+
+
+def deletions(levels):
+    """Canonical trees one node deletion away (children move to the parent)."""
+    result = set()
+    for v in range(1, len(levels)):
+        end = v + 1
+        while end < len(levels) and levels[end] > levels[v]:
+            end += 1
+        shifted = [d - 1 for d in levels[v + 1:end]]
+        result.add(canonical_level_sequence(levels[:v] + shifted + levels[end:]))
+    return result
+
+
+class TestTreeDistance(unittest.TestCase):
+    """Test cases for tree_distance and StructuralDistance."""
+
+    def test_exact_small_trees(self):
+        """Bounds bracket the unordered edit distance of all trees up to 6 nodes."""
+        trees = [tuple(levels) for n in range(1, 8) for levels in generate_level_sequences(n)]
+        neighbours = {t: set() for t in trees}
+        for t in trees:
+            for s in deletions(list(t)):
+                neighbours[t].add(s)
+                neighbours[s].add(t)
+        metric = StructuralDistance()
+        small = [t for t in trees if len(t) <= 6]
+        for a in small:
+            exact = {a: 0}
+            queue = deque([a])
+            while queue:
+                u = queue.popleft()
+                for w in neighbours[u]:
+                    if w not in exact:
+                        exact[w] = exact[u] + 1
+                        queue.append(w)
+            for b in small:
+                result = metric.compare(list(a), list(b))
+                self.assertLessEqual(result['lower_bound'], exact[b])
+                self.assertLessEqual(exact[b], result['distance'])
+                self.assertEqual(result['distance'], metric.compare(list(b), list(a))['distance'])
+                self.assertEqual(result['distance'] == 0, a == b)
+
+    def test_simple_distances(self):
+        """Path against cherry, single node against a tree."""
+        result = tree_distance([0, 1, 2], [0, 1, 1])
+        self.assertEqual((result['distance'], result['lower_bound']), (2, 2))
+        self.assertTrue(result['exact'])
+        self.assertEqual(tree_distance([0], [0, 1, 1, 2])['distance'], 3)
+        same = tree_distance([0, 1, 2, 1], [0, 1, 1, 2])
+        self.assertEqual(same['distance'], 0)
+        self.assertEqual(same['similarity'], 1.0)
+        self.assertEqual(same['matched_nodes'], 3)
+
+    def test_single_insertion(self):
+        """One added leaf anywhere in a random tree is found, in both modes."""
+        rng = random.Random(5)
+        for _ in range(200):
+            a = random_levels(rng.randint(1, 60), rng)
+            at = rng.randint(1, len(a))
+            b = a[:at] + [a[at - 1] + 1] + a[at:]
+            for mode in ('auto', 'bounds'):
+                result = tree_distance(a, b, mode)
+                self.assertEqual(result['distance'], 1)
+                self.assertTrue(result['exact'])
+
+    def test_large_and_deep_trees(self):
+        """Large inputs run without recursion; auto never does worse than bounds."""
+        a = random_levels(20000, random.Random(1))
+        b = random_levels(20000, random.Random(2))
+        fast = tree_distance(a, b, 'bounds')
+        full = tree_distance(a, b, 'auto')
+        self.assertLessEqual(full['distance'], fast['distance'])
+        self.assertLessEqual(full['lower_bound'], full['distance'])
+        path = tree_distance(list(range(20000)), list(range(19990)))
+        self.assertEqual(path['distance'], 10)
+        self.assertTrue(path['exact'])
+
+    def test_tree_nodes(self):
+        """TreeNode input compares shapes, not names."""
+        a = TreeNode("a")
+        a.add_child(TreeNode("x", is_file=True))
+        b = TreeNode("b")
+        b.add_child(TreeNode("y", is_file=True))
+        b.add_child(TreeNode("z", is_file=True))
+        self.assertEqual(tree_distance(a, b)['distance'], 1)
+
+    def test_default_mode(self):
+        """Without a mode, large trees get bounds and small ones auto."""
+        self.assertEqual(tree_distance([0, 1], [0])['mode'], 'auto')
+        large = list(range(AUTO_MODE_MAX_NODES + 1))
+        self.assertEqual(tree_distance(large, [0])['mode'], 'bounds')
+        self.assertEqual(tree_distance(large, [0], 'auto')['mode'], 'auto')
+
+    def test_bad_mode(self):
+        """Unknown modes are rejected."""
+        with self.assertRaises(ValueError):
+            tree_distance([0], [0], mode='exact')
+
+
+class TestCompareStructures(unittest.TestCase):
+    """Test the distance reported by VaultTreeBijection.compare_structures."""
+
+    def setUp(self):
+        """Create a temporary vault with a folder."""
+        self.temp_dir = tempfile.mkdtemp()
+        root = Path(self.temp_dir)
+        (root / "notes").mkdir()
+        (root / "index.md").write_text("[[a]] [[b]]\n")
+        (root / "notes" / "a.md").write_text("[[b]]\n")
+        (root / "notes" / "b.md").write_text("No links.\n")
+
+    def tearDown(self):
+        """Clean up temporary vault."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_distance_in_comparison(self):
+        """The comparison carries the structural distance of the two trees."""
+        vault = MarkdownVault(self.temp_dir)
+        vault.scan()
+        bijection = VaultTreeBijection(vault)
+        comparison = bijection.compare_structures()
+        distance = comparison['distance']
+        self.assertEqual(distance['nodes'], (5, 4))
+        self.assertGreaterEqual(distance['distance'], distance['lower_bound'])
+        self.assertEqual(distance['mode'], 'auto')
+        bounds = bijection.compare_structures('bounds')['distance']
+        self.assertEqual(bounds['nodes'], (5, 4))
+        self.assertEqual(bounds['mode'], 'bounds')
+
+
+if __name__ == '__main__':
+    unittest.main()
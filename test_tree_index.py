@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the Folder Tree LCA Index
+
+Checks every query against walking parent pointers, on random trees, a
+very deep tree, and the folder tree of a small vault.
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from obsidian_vault import MarkdownVault
+from tree_index import TreeIndex, vault_link_distances
+from vault_tree_bijection import TreeNode
+
+
+def random_tree(n, rng):
+    """A random TreeNode tree with n nodes; leaves are files."""
+    nodes = [TreeNode("root")]
+    for i in range(1, n):
+        node = TreeNode(f"n{i}", is_file=True)
+        parent = rng.choice(nodes)
+        parent.is_file = False
+        parent.add_child(node)
+        nodes.append(node)
+    return nodes
+
+
+def ancestors(node):
+    """Path from a node up to the root, by walking parent pointers."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = node.parent
+    return path
+
+
+class TestTreeIndex(unittest.TestCase):
+    """Test cases for TreeIndex."""
+
+    def test_against_parent_walks(self):
+        """All queries agree with the naive answers on random trees."""
+        rng = random.Random(11)
+        for n in list(range(1, 12)) + [50, 200]:
+            nodes = random_tree(n, rng)
+            index = TreeIndex(nodes[0])
+            self.assertEqual(len(index), n)
+            for a in nodes:
+                path_a = ancestors(a)
+                self.assertEqual(index.depth(a), len(path_a) - 1)
+                for b in rng.sample(nodes, min(n, 12)):
+                    path_b = ancestors(b)
+                    common = next(u for u in path_a if any(u is w for w in path_b))
+                    self.assertIs(index.lca(a, b), common)
+                    self.assertEqual(index.distance(a, b),
+                                     path_a.index(common) + path_b.index(common))
+                    self.assertEqual(index.is_ancestor(a, b),
+                                     any(a is w for w in path_b))
+
+    def test_deep_tree(self):
+        """A path of 20000 nodes is indexed without recursion."""
+        root = node = TreeNode("root")
+        for i in range(20000):
+            child = TreeNode(f"n{i}", is_file=True)
+            node.add_child(child)
+            node = child
+        index = TreeIndex(root)
+        self.assertEqual(index.depth("n19999"), 20000)
+        self.assertEqual(index.distance("n100", "n19999"), 19899)
+        self.assertIs(index.lca(root, "n5"), root)
+        self.assertTrue(index.is_ancestor("n100", "n19999"))
+        self.assertFalse(index.is_ancestor("n19999", "n100"))
+
+    def test_unknown_node(self):
+        """Nodes outside the tree raise KeyError."""
+        index = TreeIndex(TreeNode("root"))
+        with self.assertRaises(KeyError):
+            index.depth("missing")
+        with self.assertRaises(KeyError):
+            index.depth(TreeNode("other"))
+
+
+class TestLinkDistances(unittest.TestCase):
+    """Test cases for annotating vault links with folder distances."""
+
+    def setUp(self):
+        """Create a temporary vault with nested folders."""
+        self.temp_dir = tempfile.mkdtemp()
+        root = Path(self.temp_dir)
+        (root / "a" / "b").mkdir(parents=True)
+        (root / "c").mkdir()
+        (root / "index.md").write_text("[[x]] [[a/b/y]] [[z.md]] [[missing]]\n")
+        (root / "a" / "x.md").write_text("[[y]] [[index]]\n")
+        (root / "a" / "b" / "y.md").write_text("[[c/z]]\n")
+        (root / "c" / "z.md").write_text("No links.\n")
+
+    def tearDown(self):
+        """Clean up temporary vault."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_vault_link_distances(self):
+        """Every link gets its folder distance; broken links get None."""
+        vault = MarkdownVault(self.temp_dir)
+        vault.scan()
+        distances = vault_link_distances(vault)
+        self.assertEqual(distances["index"],
+                         {"x": 3, "a/b/y": 4, "z": 3, "missing": None})
+        self.assertEqual(distances["a/x"], {"y": 3, "index": 3})
+        self.assertEqual(distances["a/b/y"], {"c/z": 5})
+        self.assertNotIn("c/z", distances)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for the Tidy Tree Layout and SVG Renderer
+
+Checks the layout invariants of Reingold-Tilford drawings on every small
+tree, collapsing, very large and very deep inputs, and the SVG output.
+"""
+
+import io
+import random
+import unittest
+import xml.etree.ElementTree as ET
+
+from tree_layout import layout_forest, layout_tree, write_svg
+from vault_tree_bijection import TreeNode
+from rootrees.levelseq import generate_level_sequences
+
+
+def random_levels(n, rng):
+    """A random plane tree with n nodes as a level sequence."""
+    levels = [0]
+    for _ in range(1, n):
+        levels.append(rng.randint(1, levels[-1] + 1))
+    return levels
+
+
+def mirror(levels):
+    """Level sequence of the tree with every node's children reversed."""
+    children = {}
+    path = []
+    for v, depth in enumerate(levels):
+        del path[depth:]
+        if path:
+            children.setdefault(path[-1], []).append(v)
+        path.append(v)
+    result = []
+    stack = [0]
+    while stack:
+        v = stack.pop()
+        result.append(levels[v])
+        stack.extend(children.get(v, []))
+    return result
+
+
+class TestTreeLayout(unittest.TestCase):
+    """Test cases for layout_tree and layout_forest."""
+
+    def assertTidy(self, layout, distance=1.0):
+        """Parents centered over their children, no overlaps within a depth."""
+        children = {}
+        for v in range(1, len(layout)):
+            children.setdefault(layout.parent[v], []).append(v)
+        for p, kids in children.items():
+            middle = (layout.x[kids[0]] + layout.x[kids[-1]]) / 2
+            self.assertAlmostEqual(layout.x[p], middle)
+        rows = {}
+        for v in range(len(layout)):
+            rows.setdefault(layout.y[v], []).append(layout.x[v])
+        for xs in rows.values():
+            for left, right in zip(xs, xs[1:]):
+                self.assertGreaterEqual(right - left, distance - 1e-9)
+        self.assertAlmostEqual(min(layout.x), 0.0)
+
+    def test_all_small_trees(self):
+        """Every rooted tree up to 9 nodes, and its mirror image."""
+        for n in range(1, 10):
+            for levels in generate_level_sequences(n):
+                layout = layout_tree(list(levels))
+                self.assertTidy(layout)
+                mirrored = layout_tree(mirror(list(levels)))
+                self.assertTidy(mirrored)
+                self.assertEqual(
+                    sorted((y, round(layout.width - x, 9)) for x, y in zip(layout.x, layout.y)),
+                    sorted((y, round(x, 9)) for x, y in zip(mirrored.x, mirrored.y)))
+
+    def test_random_trees(self):
+        """Random plane trees, with a different node distance."""
+        rng = random.Random(7)
+        for _ in range(200):
+            levels = random_levels(rng.randint(1, 80), rng)
+            self.assertTidy(layout_tree(levels, distance=2.5), distance=2.5)
+
+    def test_simple_shapes(self):
+        """Star and path coordinates."""
+        star = layout_tree([0, 1, 1, 1])
+        self.assertEqual(star.x, [1.0, 0.0, 1.0, 2.0])
+        self.assertEqual(star.y, [0, 1, 1, 1])
+        path = layout_tree([0, 1, 2])
+        self.assertEqual(path.x, [0.0, 0.0, 0.0])
+        self.assertEqual((path.width, path.height), (0.0, 2))
+
+    def test_large_and_deep_trees(self):
+        """Large inputs run without recursion."""
+        layout = layout_tree(random_levels(50000, random.Random(3)))
+        self.assertEqual(len(layout), 50000)
+        path = layout_tree(list(range(20000)))
+        self.assertEqual(path.height, 19999)
+        star = layout_tree([0] + [1] * 20000)
+        self.assertEqual(star.width, 19999.0)
+
+    def test_tree_nodes(self):
+        """TreeNode input keeps names and child order."""
+        root = TreeNode("vault")
+        notes = TreeNode("notes")
+        root.add_child(TreeNode("index", is_file=True))
+        root.add_child(notes)
+        notes.add_child(TreeNode("a", is_file=True))
+        layout = layout_tree(root)
+        self.assertEqual(layout.labels, ["vault", "index", "notes", "a"])
+        self.assertEqual(layout.parent, [-1, 0, 0, 2])
+        self.assertTidy(layout)
+
+    def test_collapse(self):
+        """Subtrees below a depth or under a size become single nodes."""
+        levels = [0, 1, 2, 3, 2, 1, 2, 1]
+        deep = layout_tree(levels, max_depth=1)
+        self.assertEqual(len(deep), 4)
+        self.assertEqual(deep.hidden, [0, 3, 1, 0])
+        small = layout_tree(levels, min_size=3)
+        self.assertEqual(small.hidden, [0, 0, 1, 0, 1, 0])
+        # The root is never collapsed
+        self.assertEqual(layout_tree(levels, max_depth=0).hidden[0], 0)
+
+    def test_forest(self):
+        """All trees of a size side by side under a hidden root."""
+        trees = [list(levels) for levels in generate_level_sequences(5)]
+        layout = layout_forest(trees)
+        self.assertTrue(layout.hide_root)
+        self.assertEqual(len(layout), 1 + 5 * len(trees))
+        self.assertTidy(layout)
+
+    def test_bad_levels(self):
+        """Malformed level sequences are rejected."""
+        for bad in ([], [1], [0, 2], [0, 1, 0], [0, -1]):
+            with self.assertRaises(ValueError):
+                layout_tree(bad)
+
+
+class TestSvg(unittest.TestCase):
+    """Test cases for write_svg."""
+
+    def test_svg_is_well_formed(self):
+        """One circle per node, one line per edge, escaped labels."""
+        root = TreeNode("a & b")
+        root.add_child(TreeNode("<c>"))
+        root.add_child(TreeNode("d"))
+        out = io.StringIO()
+        write_svg(layout_tree(root), out, show_labels=True, chunk=1)
+        svg = ET.fromstring(out.getvalue())
+        ns = {'svg': 'http://www.w3.org/2000/svg'}
+        self.assertEqual(len(svg.findall('.//svg:circle', ns)), 3)
+        self.assertEqual(len(svg.findall('.//svg:line', ns)), 2)
+        texts = [t.text for t in svg.findall('.//svg:text', ns)]
+        self.assertEqual(texts, ["a & b", "<c>", "d"])
+
+    def test_svg_forest_and_collapsed(self):
+        """The forest root is not drawn; collapsed nodes get a marker."""
+        out = io.StringIO()
+        write_svg(layout_forest([[0, 1, 2], [0, 1, 1]], max_depth=1), out)
+        svg = ET.fromstring(out.getvalue())
+        ns = {'svg': 'http://www.w3.org/2000/svg'}
+        self.assertEqual(len(svg.findall('.//svg:circle', ns)), 5)
+        self.assertEqual(len(svg.findall('.//svg:line', ns)), 3)
+        self.assertEqual(len(svg.findall('.//svg:path', ns)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,11 @@ Tests for Obsidian Vault and Tree-Graph Bijection
 Tests the markdown bracket link parsing, graph building, and tree mapping.
 """
 
+import io
 import unittest
 import tempfile
 import shutil
+from contextlib import redirect_stdout
 from pathlib import Path
 from obsidian_vault import MarkdownVault
 from vault_tree_bijection import VaultTreeBijection, TreeNode
@@ -133,6 +135,53 @@ class TestMarkdownVault(unittest.TestCase):
         self.assertGreater(edge_count, 0)
 
 
+class TestParallelScan(unittest.TestCase):
+    """Test cases for MarkdownVault.scan with reader threads and parser processes."""
+    
+    def setUp(self):
+        """Create a temporary vault with many linked files."""
+        self.temp_dir = tempfile.mkdtemp()
+        root = Path(self.temp_dir)
+        for i in range(150):
+            folder = root / f"f{i % 7}"
+            folder.mkdir(exist_ok=True)
+            (folder / f"n{i}.md").write_text(
+                f"# Note {i}\n\n[[n{(i * 3) % 150}]] [[n{(i + 1) % 150}|next]] [[missing{i % 4}.md]]\n"
+            )
+        (root / "bad.md").write_bytes(b"\xff\xfe [[x]]")
+    
+    def tearDown(self):
+        """Clean up temporary vault."""
+        shutil.rmtree(self.temp_dir)
+    
+    def scanned(self, **options):
+        """Links, backlinks, folder tree and file order of a scan."""
+        vault = MarkdownVault(self.temp_dir)
+        with redirect_stdout(io.StringIO()) as output:
+            vault.scan(**options)
+        state = (dict(vault.links), dict(vault.backlinks), dict(vault.folder_tree), list(vault.files))
+        return state, output.getvalue(), vault.throughput
+    
+    def test_same_result_as_serial_scan(self):
+        """Threads and processes merge links exactly like a serial scan."""
+        serial, warnings, _ = self.scanned()
+        self.assertIn("bad.md", warnings)
+        self.assertEqual(len(serial[3]), 151)
+        for options in ({'jobs': 4}, {'jobs': None}, {'jobs': 2, 'processes': True}):
+            with self.subTest(**options):
+                self.assertEqual(self.scanned(**options)[:2], (serial, warnings))
+    
+    def test_throughput(self):
+        """The scan records files, bytes and rates."""
+        _, _, throughput = self.scanned(jobs=3)
+        self.assertEqual(throughput['files'], 151)
+        self.assertEqual(throughput['bytes'], sum(
+            path.stat().st_size for path in Path(self.temp_dir).rglob("*.md")))
+        self.assertEqual(throughput['jobs'], 3)
+        self.assertGreater(throughput['files_per_sec'], 0)
+        self.assertGreater(throughput['mb_per_sec'], 0)
+
+
 class TestTreeNode(unittest.TestCase):
     """Test cases for TreeNode class."""
     
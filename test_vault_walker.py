@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the Pruning Vault Walker
+
+Tests directory pruning, ignore-file patterns, symlink loops and the
+stat data handed to MarkdownVault.scan.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import vault_walker
+from obsidian_vault import MarkdownVault
+from vault_walker import IgnoreRules, walk_vault
+
+
+class TestIgnoreRules(unittest.TestCase):
+    """Test cases for gitignore-style patterns."""
+
+    def test_patterns(self):
+        """Names, anchors, directories, ** and negation."""
+        rules = IgnoreRules('', [
+            "# comment", "", "*.tmp.md", "/top.md", "drafts/", "**/deep.md",
+            "notes/*.md", "!notes/keep.md", "ar[ck]hive",
+        ])
+        self.assertTrue(rules.match('a/b/x.tmp.md', False))
+        self.assertTrue(rules.match('top.md', False))
+        self.assertIsNone(rules.match('sub/top.md', False))
+        self.assertTrue(rules.match('x/drafts', True))
+        self.assertIsNone(rules.match('x/drafts', False))
+        self.assertTrue(rules.match('a/b/c/deep.md', False))
+        self.assertTrue(rules.match('deep.md', False))
+        self.assertTrue(rules.match('notes/a.md', False))
+        self.assertIsNone(rules.match('notes/sub/a.md', False))
+        self.assertFalse(rules.match('notes/keep.md', False))
+        self.assertTrue(rules.match('arkhive', True))
+        self.assertIsNone(rules.match('other.md', False))
+
+    def test_base_directory(self):
+        """Rules of a nested ignore file only apply below their directory."""
+        rules = IgnoreRules('sub', ["/a.md"])
+        self.assertTrue(rules.match('sub/a.md', False))
+        self.assertIsNone(rules.match('a.md', False))
+        self.assertIsNone(rules.match('sub/x/a.md', False))
+
+
+class TestWalkVault(unittest.TestCase):
+    """Test cases for walk_vault."""
+
+    def setUp(self):
+        """Create a temporary vault with excluded, ignored and looping directories."""
+        self.temp_dir = tempfile.mkdtemp()
+        root = Path(self.temp_dir)
+        for name in ("index.md", "a.tmp.md", "notes/x.md", "notes/keep.md",
+                     "notes/sub/y.md", "drafts/d.md", "node_modules/pkg/readme.md",
+                     ".git/info.md", "deep/er/z.md", "deep/skip.md", "deep/er/skip.md",
+                     "other.txt"):
+            path = root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("# " + name + "\n")
+        (root / ".gitignore").write_text("*.tmp.md\ndrafts/\n")
+        (root / "deep" / ".obsidianignore").write_text("skip.md\n")
+        (root / "notes" / ".gitignore").write_text("*.md\n!keep.md\n")
+        os.symlink(root, root / "deep" / "loop")
+
+    def tearDown(self):
+        """Clean up temporary vault."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_files(self):
+        """Ignored, excluded and non-markdown files are left out, loops end."""
+        paths = [path for path, _ in walk_vault(self.temp_dir)]
+        self.assertEqual(paths, ["index.md", "deep/er/z.md", "notes/keep.md"])
+
+    def test_without_ignore_files(self):
+        """Only the excluded directory names apply."""
+        paths = [path for path, _ in walk_vault(self.temp_dir, ignore_files=())]
+        self.assertIn("drafts/d.md", paths)
+        self.assertIn("a.tmp.md", paths)
+        self.assertNotIn("node_modules/pkg/readme.md", paths)
+        self.assertEqual(len(paths), len(set(paths)))
+
+    def test_pruned_directories_are_not_opened(self):
+        """Excluded and ignored directories are never passed to scandir."""
+        opened = []
+        real_scandir = os.scandir
+
+        def scandir(path):
+            opened.append(os.path.relpath(path, self.temp_dir))
+            return real_scandir(path)
+
+        with mock.patch.object(vault_walker.os, 'scandir', scandir):
+            list(walk_vault(self.temp_dir))
+        self.assertNotIn("node_modules", opened)
+        self.assertNotIn(".git", opened)
+        self.assertNotIn("drafts", opened)
+        self.assertIn("notes/sub", opened)
+
+    def test_dir_entries(self):
+        """Yielded entries carry the stat data of the files."""
+        for path, entry in walk_vault(self.temp_dir):
+            self.assertIsInstance(entry, os.DirEntry)
+            self.assertEqual(entry.stat().st_size, os.stat(entry.path).st_size)
+
+    def test_vault_scan(self):
+        """MarkdownVault.scan uses the walker and keeps the stat data."""
+        vault = MarkdownVault(self.temp_dir)
+        vault.scan()
+        self.assertEqual(sorted(vault.files), ["deep/er/z", "index", "notes/keep"])
+        self.assertEqual(vault.stats["index"].st_size, len("# index.md\n"))
+        self.assertEqual(vault.folder_tree["notes"], ["notes/keep"])
+
+
+if __name__ == '__main__':
+    unittest.main()
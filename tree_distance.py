@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Structural Distance Between Rooted Trees
+
+Measures how different two hierarchies are (for example the folder tree and
+the link tree of a vault) as a tree edit distance: the number of node
+insertions and deletions that turn one unlabeled rooted tree into the other.
+The exact unordered edit distance is NP-hard, so this module computes an
+upper bound (an actual edit script) together with a cheap lower bound:
+
+1. Every subtree of both trees is interned by its canonical class (sorted
+   child class ids), so isomorphic subtrees are recognised in O(1)
+2. Starting from the two roots, children that are identical subtrees are
+   matched at no cost and removed
+3. The remaining children are paired by size and compared the same way;
+   unpaired subtrees are deleted or inserted whole
+4. If what remains is small enough, it is also compared with the
+   Zhang-Shasha edit distance of the two remaining forests, children in a
+   canonical order, and the smaller of the two costs is kept
+
+Results are cached per pair of classes, so repeated shapes are compared
+once, and nothing recurses on the call stack. The lower bound is the larger
+of the size difference and a third of the L1 distance between the degree
+histograms (one edit changes at most three histogram entries).
+
+mode='bounds' skips Zhang-Shasha entirely; mode='auto' spends at most
+`budget` dynamic-programming cells on Zhang-Shasha in total per comparison.
+Without a mode, trees of up to AUTO_MODE_MAX_NODES nodes use 'auto' and
+larger ones 'bounds': on two random 100k-node trees 'bounds' takes about
+0.4 s and 'auto' 0.9 s, and a 100k-node path against a random 100k-node
+tree 0.5 s and 2.4 s. The cell count of every class is
+known from interning, so pairs over budget are skipped without being
+expanded.
+"""
+
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_BUDGET = 2_000_000
+# Largest tree compared in 'auto' mode when no mode is given
+AUTO_MODE_MAX_NODES = 10_000
+
+
+def _parent_array(tree) -> List[int]:
+    """Preorder parent array of a TreeNode or a level sequence."""
+    parent: List[int] = []
+    if hasattr(tree, 'children'):
+        stack = [(tree, -1)]
+        while stack:
+            node, up = stack.pop()
+            index = len(parent)
+            parent.append(up)
+            stack.extend((child, index) for child in reversed(node.children))
+        return parent
+
+    path: List[int] = []
+    for index, d in enumerate(tree):
+        if (index == 0) != (d == 0) or not 0 <= d <= len(path):
+            raise ValueError(f"not a level sequence: {list(tree)}")
+        del path[d:]
+        parent.append(path[-1] if path else -1)
+        path.append(index)
+    if not parent:
+        raise ValueError("empty tree")
+    return parent
+
+
+class StructuralDistance:
+    """
+    Interned subtree classes with cached pairwise distances.
+
+    Trees given to the same instance share classes and cache, so comparing
+    many trees with each other reuses the work on common subtrees.
+
+    Example:
+        metric = StructuralDistance()
+        metric.compare(folder_tree, link_tree)['distance']
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        # Class id <-> sorted tuple of child class ids; id 0 is the single node
+        self._ids: Dict[tuple, int] = {(): 0}
+        self.children: List[tuple] = [()]
+        self.sizes: List[int] = [1]
+        # Zhang-Shasha keyroot cells of each class, children largest first
+        self._cells: List[int] = [1]
+        # budget -> {(class, class): (distance, matched nodes)}
+        self._cache: Dict[int, Dict[Tuple[int, int], Tuple[int, int]]] = {}
+
+    def intern(self, tree) -> Tuple[int, List[int]]:
+        """
+        Class of a TreeNode or level sequence.
+
+        Returns:
+            (class id, degree of every node)
+        """
+        parent = _parent_array(tree)
+        n = len(parent)
+        kids: List[List[int]] = [[] for _ in range(n)]
+        degrees = [0] * n
+        for v in range(n - 1, -1, -1):
+            key = tuple(sorted(kids[v]))
+            degrees[v] = len(key)
+            cls = self._ids.get(key)
+            if cls is None:
+                cls = self._ids[key] = len(self.children)
+                self.children.append(key)
+                self.sizes.append(1 + sum(self.sizes[c] for c in key))
+                self._cells.append(self._forest_cells(key))
+            if parent[v] >= 0:
+                kids[parent[v]].append(cls)
+            kids[v] = None
+            if v == 0:
+                return cls, degrees
+        raise ValueError("empty tree")
+
+    def _remainder(self, a: int, b: int) -> Tuple[List[int], List[int], int]:
+        """Children of a and b that are not identical subtrees, and the matched size."""
+        common = Counter(self.children[a]) & Counter(self.children[b])
+        left = list((Counter(self.children[a]) - common).elements())
+        right = list((Counter(self.children[b]) - common).elements())
+        matched = sum(self.sizes[c] * k for c, k in common.items())
+        return left, right, matched
+
+    def _order(self, c: int) -> tuple:
+        """Canonical child order: largest subtrees first."""
+        return (-self.sizes[c], c)
+
+    def _forest_cells(self, forest) -> int:
+        """
+        Sum of the keyroot subtree sizes of a root over the forest: the
+        first child shares the root's leftmost leaf, so it is no keyroot.
+        """
+        sizes, cells = self.sizes, self._cells
+        kids = sorted(forest, key=self._order)
+        total = 1 + sum(sizes[c] + cells[c] for c in kids)
+        return total - sizes[kids[0]] if kids else total
+
+    def _ordered(self, forest: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        Postorder leftmost-leaf array and keyroots of a virtual root over
+        the forest, children largest first.
+        """
+        children, order = self.children, self._order
+        leftmost: List[int] = []
+        # Postorder index of the first node of each open subtree
+        pending: List[int] = []
+        stack = [(-1, False)]
+        while stack:
+            cls, done = stack.pop()
+            if done:
+                leftmost.append(pending.pop())
+                continue
+            pending.append(len(leftmost))
+            stack.append((cls, True))
+            kids = sorted(forest if cls < 0 else children[cls], key=order)
+            stack.extend((c, False) for c in reversed(kids))
+        # Keyroots: the highest node with each leftmost leaf
+        last: Dict[int, int] = {}
+        for v, start in enumerate(leftmost):
+            last[start] = v
+        return leftmost, sorted(last.values())
+
+    @staticmethod
+    def _zhang_shasha(first: tuple, second: tuple) -> int:
+        """Unit-cost Zhang-Shasha distance of two unlabeled ordered trees."""
+        l1, keys1 = first
+        l2, keys2 = second
+        tree = [[0] * len(l2) for _ in l1]
+        for i in keys1:
+            li = l1[i]
+            rows = i - li + 2
+            for j in keys2:
+                lj = l2[j]
+                cols = j - lj + 2
+                forest = [list(range(cols))] + [[x] + [0] * (cols - 1) for x in range(1, rows)]
+                for x in range(1, rows):
+                    i1 = li + x - 1
+                    row, above = forest[x], forest[x - 1]
+                    whole = l1[i1] == li
+                    for y in range(1, cols):
+                        j1 = lj + y - 1
+                        best = min(above[y], row[y - 1]) + 1
+                        if whole and l2[j1] == lj:
+                            if above[y - 1] < best:
+                                best = above[y - 1]
+                            tree[i1][j1] = best
+                        else:
+                            other = forest[l1[i1] - li][l2[j1] - lj] + tree[i1][j1]
+                            if other < best:
+                                best = other
+                        row[y] = best
+        return tree[-1][-1]
+
+    def distance(self, a: int, b: int, budget: int = None) -> Tuple[int, int]:
+        """
+        Upper bound on the edit distance of two classes, with roots matched.
+
+        Args:
+            a: Class id
+            b: Class id
+            budget: Zhang-Shasha cells for this call in total (0 to only
+                    pair subtrees); defaults to the instance's budget
+
+        Returns:
+            (distance, nodes in the identical child subtrees that were
+            matched; the roots of the compared pair are not counted)
+        """
+        if budget is None:
+            budget = self.budget
+        cache = self._cache.setdefault(budget, {})
+        sizes = self.sizes
+        spare = budget
+        plans = {}
+        stack = [(a, b)]
+        while stack:
+            pair = stack.pop()
+            if pair in cache or pair in plans:
+                continue
+            x, y = pair
+            if x == y:
+                cache[pair] = (0, sizes[x] - 1)
+                continue
+            left, right, matched = self._remainder(x, y)
+            exact = None
+            if spare and left and right:
+                cells = self._forest_cells(left) * self._forest_cells(right)
+                if cells <= spare:
+                    spare -= cells
+                    exact = self._zhang_shasha(self._ordered(left), self._ordered(right))
+            left.sort(key=lambda c: -sizes[c])
+            right.sort(key=lambda c: -sizes[c])
+            pairs = list(zip(left, right))
+            k = len(pairs)
+            extra = sum(sizes[c] for c in left[k:]) + sum(sizes[c] for c in right[k:])
+            plans[pair] = (pairs, extra, matched, exact)
+            stack.extend(pairs)
+        # Smaller pairs first, so every part is known before it is needed
+        for pair in sorted(plans, key=lambda p: sizes[p[0]] + sizes[p[1]]):
+            pairs, cost, matched, exact = plans[pair]
+            paired = matched
+            for part in pairs:
+                part_cost, part_matched = cache[part]
+                cost += part_cost
+                paired += part_matched
+            # Zhang-Shasha keeps the canonical child order, which one insertion
+            # deep down can change; pairing by size does not depend on it
+            if exact is not None and exact < cost:
+                cache[pair] = (exact, matched)
+            else:
+                cache[pair] = (cost, paired)
+        return cache[(a, b)]
+
+    def compare(self, first, second, mode: Optional[str] = None) -> Dict[str, any]:
+        """
+        Structural distance between two trees.
+
+        Args:
+            first: TreeNode or level sequence
+            second: TreeNode or level sequence
+            mode: 'auto' (Zhang-Shasha on unmatched parts, within the
+                  budget) or
+                  'bounds' (fast pairing only); None picks 'auto' unless
+                  a tree has more than AUTO_MODE_MAX_NODES nodes
+
+        Returns:
+            Dictionary with the distance (an upper bound on the unordered
+            edit distance), a lower bound, whether the two agree, the nodes
+            matched as identical subtrees, the tree sizes, a similarity
+            in [0, 1] (1 for isomorphic trees) and the mode used
+        """
+        if mode not in (None, 'auto', 'bounds'):
+            raise ValueError(f"Unknown mode: {mode}")
+        a, degrees_a = self.intern(first)
+        b, degrees_b = self.intern(second)
+        n1, n2 = self.sizes[a], self.sizes[b]
+        if mode is None:
+            mode = 'auto' if max(n1, n2) <= AUTO_MODE_MAX_NODES else 'bounds'
+        distance, matched = self.distance(a, b, 0 if mode == 'bounds' else self.budget)
+        histogram = Counter(degrees_a)
+        histogram.subtract(degrees_b)
+        spread = sum(abs(k) for k in histogram.values())
+        lower = max(abs(n1 - n2), -(-spread // 3))
+        scale = n1 + n2 - 2
+        return {
+            'distance': distance,
+            'lower_bound': lower,
+            'exact': lower == distance,
+            'matched_nodes': matched,
+            'nodes': (n1, n2),
+            'similarity': 1 - distance / scale if scale else 1.0,
+            'mode': mode,
+        }
+
+
+def tree_distance(first, second, mode: Optional[str] = None, budget: int = DEFAULT_BUDGET) -> Dict[str, any]:
+    """
+    Structural distance between two trees (TreeNode or level sequence).
+
+    See StructuralDistance.compare for the result.
+    """
+    return StructuralDistance(budget).compare(first, second, mode)
+
+
+def main():
+    """CLI: distance between the folder tree and the link tree of a vault."""
+    import argparse
+    import time
+
+    from obsidian_vault import MarkdownVault
+    from vault_tree_bijection import VaultTreeBijection
+
+    parser = argparse.ArgumentParser(
+        description='Structural distance between the folder tree and link tree of a vault'
+    )
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='.',
+        help='Root path of the vault'
+    )
+    parser.add_argument(
+        '--mode',
+        choices=['auto', 'bounds'],
+        help='auto: bounded Zhang-Shasha; bounds: fast bounds only '
+             f'(default: auto up to {AUTO_MODE_MAX_NODES} nodes per tree)'
+    )
+    parser.add_argument(
+        '--budget',
+        type=int,
+        default=DEFAULT_BUDGET,
+        help=f'Zhang-Shasha cells per comparison (default: {DEFAULT_BUDGET})'
+    )
+
+    args = parser.parse_args()
+
+    vault = MarkdownVault(args.path)
+    vault.scan()
+    bijection = VaultTreeBijection(vault)
+    start = time.perf_counter()
+    result = tree_distance(bijection.folder_structure_to_tree(),
+                           bijection.link_graph_to_tree(), args.mode, args.budget)
+    elapsed = time.perf_counter() - start
+
+    print("📐 Folder tree vs link tree:")
+    for key, value in result.items():
+        print(f"  {key}: {value}")
+    print(f"  seconds: {elapsed:.3f}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Ancestor and Lowest Common Ancestor Index for Folder Trees
+
+Answers structural queries on a TreeNode tree (for example the folder tree
+of VaultTreeBijection.folder_structure_to_tree) without walking parent
+pointers:
+- depth(u) and is_ancestor(u, v) in O(1), from preorder entry/exit times
+- lca(u, v) and distance(u, v) in O(1), from a sparse table over the
+  Euler tour of the tree
+
+The index is built once in O(n log n) with iterative traversals, so deep
+trees do not hit the recursion limit. Nodes can be given as TreeNode
+objects or, for files, by their vault key, which makes it cheap to
+measure how far in the folder tree every link of a vault reaches.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from obsidian_vault import MarkdownVault
+from vault_tree_bijection import TreeNode, VaultTreeBijection
+
+
+Node = Union[TreeNode, str]
+
+
+class TreeIndex:
+    """
+    LCA, depth, distance and ancestor queries on a TreeNode tree.
+
+    Example:
+        index = TreeIndex(bijection.folder_structure_to_tree())
+        index.distance("notes/a", "projects/b")
+    """
+
+    def __init__(self, root: TreeNode):
+        self.nodes: List[TreeNode] = []
+        self.depths: List[int] = []
+        self._index: Dict[int, int] = {}
+        self.files: Dict[str, int] = {}
+        # Nodes are numbered in preorder, so the subtree of u is the range
+        # u <= v < leave[u]
+        self._leave: List[int] = []
+
+        stack = [(root, 0, False)]
+        while stack:
+            node, depth, done = stack.pop()
+            if done:
+                v = self._index[id(node)]
+                self._leave[v] = len(self.nodes)
+                continue
+            v = len(self.nodes)
+            self._index[id(node)] = v
+            self.nodes.append(node)
+            self.depths.append(depth)
+            self._leave.append(v + 1)
+            if node.is_file:
+                self.files[node.name] = v
+            stack.append((node, depth, True))
+            stack.extend((child, depth + 1, False) for child in reversed(node.children))
+
+        n = len(self.nodes)
+        self._n = n
+        # Euler tour as depth * n + node, so min() picks the shallowest
+        # node; it is rebuilt from the preorder by returning to the parent
+        # after every child
+        parent = [-1] * n
+        for v, node in enumerate(self.nodes):
+            for child in node.children:
+                parent[self._index[id(child)]] = v
+        tour: List[int] = []
+        self._first = [0] * n
+        path: List[int] = []
+        for v in range(n):
+            while path and path[-1] != parent[v]:
+                path.pop()
+                tour.append(self.depths[path[-1]] * n + path[-1])
+            self._first[v] = len(tour)
+            tour.append(self.depths[v] * n + v)
+            path.append(v)
+        while len(path) > 1:
+            path.pop()
+            tour.append(self.depths[path[-1]] * n + path[-1])
+
+        # table[k][i] = min(tour[i : i + 2**k])
+        self._table = [tour]
+        span = 1
+        while 2 * span <= len(tour):
+            previous = self._table[-1]
+            self._table.append(list(map(min, previous[:len(previous) - span], previous[span:])))
+            span *= 2
+
+    def __len__(self) -> int:
+        return self._n
+
+    def index(self, node: Node) -> int:
+        """
+        Preorder number of a node, given as a TreeNode or a file key.
+
+        Raises:
+            KeyError: If the node is not in the tree
+        """
+        if isinstance(node, str):
+            return self.files[node]
+        return self._index[id(node)]
+
+    def depth(self, node: Node) -> int:
+        """Number of edges between the node and the root."""
+        return self.depths[self.index(node)]
+
+    def is_ancestor(self, ancestor: Node, node: Node) -> bool:
+        """True if ancestor is node or lies on its path to the root."""
+        u, v = self.index(ancestor), self.index(node)
+        return u <= v < self._leave[u]
+
+    def _lca(self, u: int, v: int) -> int:
+        left, right = self._first[u], self._first[v]
+        if left > right:
+            left, right = right, left
+        k = (right - left + 1).bit_length() - 1
+        row = self._table[k]
+        return min(row[left], row[right - (1 << k) + 1]) % self._n
+
+    def lca(self, a: Node, b: Node) -> TreeNode:
+        """Lowest common ancestor of two nodes."""
+        return self.nodes[self._lca(self.index(a), self.index(b))]
+
+    def distance(self, a: Node, b: Node) -> int:
+        """Number of edges on the tree path between two nodes."""
+        u, v = self.index(a), self.index(b)
+        depths = self.depths
+        return depths[u] + depths[v] - 2 * depths[self._lca(u, v)]
+
+    def link_distances(self, links: Dict[str, set]) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        Folder distance of every link.
+
+        Targets are resolved like MarkdownVault.get_broken_links: by exact
+        key, otherwise by file name (the first key in sorted order wins).
+
+        Args:
+            links: Source file key -> link targets (MarkdownVault.links)
+
+        Returns:
+            Source -> {target: distance}, None for targets (or sources)
+            that are not files of the tree, such as broken links
+        """
+        files = self.files
+        by_name: Dict[str, int] = {}
+        for key in sorted(files):
+            by_name.setdefault(Path(key).name, files[key])
+        depths = self.depths
+        lca = self._lca
+        result: Dict[str, Dict[str, Optional[int]]] = {}
+        for source, targets in links.items():
+            u = files.get(source)
+            row: Dict[str, Optional[int]] = {}
+            for target in targets:
+                v = files.get(target)
+                if v is None:
+                    v = by_name.get(Path(target).name)
+                if u is None or v is None:
+                    row[target] = None
+                else:
+                    row[target] = depths[u] + depths[v] - 2 * depths[lca(u, v)]
+            result[source] = row
+        return result
+
+
+def vault_link_distances(vault: MarkdownVault) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Folder distance of every link of a scanned vault.
+
+    Builds the folder tree and its index once, then annotates all links.
+    """
+    index = TreeIndex(VaultTreeBijection(vault).folder_structure_to_tree())
+    return index.link_distances(vault.links)
+
+
+def main():
+    """CLI: how far in the folder tree do the links of a vault reach?"""
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(
+        description='Folder-tree distances of the links of a markdown vault'
+    )
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='.',
+        help='Root path of the vault'
+    )
+    parser.add_argument(
+        '--show',
+        type=int,
+        default=10,
+        help='Number of farthest-reaching links to list (default: 10)'
+    )
+
+    args = parser.parse_args()
+
+    vault = MarkdownVault(args.path)
+    vault.scan()
+    distances = vault_link_distances(vault)
+
+    histogram = Counter()
+    farthest = []
+    for source, row in distances.items():
+        for target, distance in row.items():
+            histogram[distance] += 1
+            if distance is not None:
+                farthest.append((distance, source, target))
+
+    print("📏 Link distances in the folder tree:")
+    for distance in sorted(histogram, key=lambda d: (d is None, d)):
+        label = "broken" if distance is None else distance
+        print(f"  {label}: {histogram[distance]} links")
+    if farthest and args.show:
+        print("\nFarthest links:")
+        for distance, source, target in sorted(farthest, reverse=True)[:args.show]:
+            print(f"  {distance}  {source} → {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Tidy Tree Layout and Streaming SVG Rendering
+
+Lays out rooted trees with the Reingold-Tilford algorithm in the linear-time
+formulation of Buchheim, Juenger and Leipert ("Improving Walker's algorithm
+to run in linear time", 2002):
+- Parents are centered above their children
+- Subtrees are packed as closely as the minimum node distance allows
+- Isomorphic subtrees are drawn identically, mirrored trees as mirror images
+
+Both walks are iterative, so paths of any depth work, and trees are stored
+as flat preorder arrays, so vaults with tens of thousands of nodes lay out
+in well under a second. The SVG is written element by element to a file
+object instead of being built in memory.
+
+Trees can be given as TreeNode objects (VaultTreeBijection) or as level
+sequences (node depths in preorder, as produced by rootrees), and deep or
+small subtrees can be collapsed into a single marked node.
+"""
+
+import sys
+from typing import List, Optional, Sequence, TextIO
+from xml.sax.saxutils import escape
+
+
+class TreeLayout:
+    """
+    Coordinates of a laid out tree, in preorder.
+
+    Attributes:
+        parent: Parent index of every node (-1 for the root)
+        x: Horizontal positions, the leftmost node at 0
+        y: Depths
+        labels: Node labels (empty strings for level sequences)
+        hidden: Number of descendants collapsed into each node
+        hide_root: True for forests, whose root is only a common anchor
+    """
+
+    def __init__(self, parent: List[int], x: List[float], y: List[int],
+                 labels: List[str], hidden: List[int], hide_root: bool = False):
+        self.parent = parent
+        self.x = x
+        self.y = y
+        self.labels = labels
+        self.hidden = hidden
+        self.hide_root = hide_root
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    @property
+    def width(self) -> float:
+        """Distance between the leftmost and rightmost nodes."""
+        return max(self.x) if self.x else 0.0
+
+    @property
+    def height(self) -> int:
+        """Depth of the deepest node."""
+        return max(self.y) if self.y else 0
+
+
+def _flatten(tree) -> tuple:
+    """Preorder parent array, labels and depths of a TreeNode or a level sequence."""
+    parent: List[int] = []
+    labels: List[str] = []
+    depth: List[int] = []
+    if hasattr(tree, 'children'):
+        stack = [(tree, -1, 0)]
+        while stack:
+            node, up, d = stack.pop()
+            index = len(parent)
+            parent.append(up)
+            labels.append(getattr(node, 'name', ''))
+            depth.append(d)
+            stack.extend((child, index, d + 1) for child in reversed(node.children))
+        return parent, labels, depth
+
+    path: List[int] = []
+    for index, d in enumerate(tree):
+        if (index == 0) != (d == 0) or not 0 <= d <= len(path):
+            raise ValueError(f"not a level sequence: {list(tree)}")
+        del path[d:]
+        parent.append(path[-1] if path else -1)
+        labels.append('')
+        depth.append(d)
+        path.append(index)
+    if not parent:
+        raise ValueError("empty tree")
+    return parent, labels, depth
+
+
+def _collapse(parent: List[int], labels: List[str], depth: List[int],
+              max_depth: Optional[int], min_size: Optional[int]) -> tuple:
+    """Drop the nodes below collapsed subtrees; return the visible tree."""
+    n = len(parent)
+    size = [1] * n
+    for v in range(n - 1, 0, -1):
+        size[parent[v]] += size[v]
+
+    new_index = [-1] * n
+    keep_parent: List[int] = []
+    keep_labels: List[str] = []
+    keep_depth: List[int] = []
+    hidden: List[int] = []
+    # collapsed[v]: v is visible but its descendants are not
+    collapsed = [False] * n
+    for v in range(n):
+        up = parent[v]
+        if up >= 0 and (new_index[up] < 0 or collapsed[up]):
+            continue
+        new_index[v] = len(keep_parent)
+        keep_parent.append(new_index[up] if up >= 0 else -1)
+        keep_labels.append(labels[v])
+        keep_depth.append(depth[v])
+        fold = size[v] > 1 and up >= 0 and (
+            (max_depth is not None and depth[v] >= max_depth) or
+            (min_size is not None and size[v] < min_size))
+        collapsed[v] = fold
+        hidden.append(size[v] - 1 if fold else 0)
+    return keep_parent, keep_labels, keep_depth, hidden
+
+
+def _buchheim(parent: List[int], distance: float) -> List[float]:
+    """Buchheim-Walker x coordinates of a preorder parent array."""
+    n = len(parent)
+    children: List[List[int]] = [[] for _ in range(n)]
+    number = [0] * n
+    for v in range(1, n):
+        siblings = children[parent[v]]
+        number[v] = len(siblings)
+        siblings.append(v)
+
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    shift = [0.0] * n
+    change = [0.0] * n
+    midpoint = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+
+    def next_left(v):
+        kids = children[v]
+        return kids[0] if kids else thread[v]
+
+    def next_right(v):
+        kids = children[v]
+        return kids[-1] if kids else thread[v]
+
+    def place(w):
+        # The end of the recursive firstwalk(w), done by the parent once
+        # the left siblings of w have their final positions
+        if number[w]:
+            left = children[parent[w]][number[w] - 1]
+            prelim[w] = prelim[left] + distance
+            if children[w]:
+                mod[w] = prelim[w] - midpoint[w]
+        else:
+            prelim[w] = midpoint[w]
+
+    def apportion(v, default_ancestor):
+        if not number[v]:
+            return default_ancestor
+        siblings = children[parent[v]]
+        vir = vor = v
+        vil = siblings[number[v] - 1]
+        vol = siblings[0]
+        sir = sor = mod[v]
+        sil = mod[vil]
+        sol = mod[vol]
+        while True:
+            right = next_right(vil)
+            left = next_left(vir)
+            if right < 0 or left < 0:
+                break
+            vil, vir = right, left
+            vol = next_left(vol)
+            vor = next_right(vor)
+            ancestor[vor] = v
+            gap = prelim[vil] + sil - (prelim[vir] + sir) + distance
+            if gap > 0:
+                a = ancestor[vil]
+                if parent[a] != parent[v]:
+                    a = default_ancestor
+                # Move the subtree of v right, spreading the shift over the
+                # subtrees between a and v (applied after the children loop)
+                subtrees = number[v] - number[a]
+                change[v] -= gap / subtrees
+                shift[v] += gap
+                change[a] += gap / subtrees
+                prelim[v] += gap
+                mod[v] += gap
+                sir += gap
+                sor += gap
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) >= 0 and next_left(vol) < 0:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default_ancestor = v
+        return default_ancestor
+
+    # First walk: descendants come after their ancestors in preorder
+    for v in range(n - 1, -1, -1):
+        kids = children[v]
+        if not kids:
+            continue
+        default_ancestor = kids[0]
+        for w in kids:
+            place(w)
+            default_ancestor = apportion(w, default_ancestor)
+        total = change_sum = 0.0
+        for w in reversed(kids):
+            prelim[w] += total
+            mod[w] += total
+            change_sum += change[w]
+            total += shift[w] + change_sum
+        midpoint[v] = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+    place(0)
+
+    # Second walk: add up the modifiers of the ancestors
+    offset = [0.0] * n
+    x = [0.0] * n
+    x[0] = prelim[0]
+    for v in range(1, n):
+        up = parent[v]
+        offset[v] = offset[up] + mod[up]
+        x[v] = prelim[v] + offset[v]
+    left = min(x)
+    return [value - left for value in x]
+
+
+def layout_tree(tree, max_depth: Optional[int] = None, min_size: Optional[int] = None,
+                distance: float = 1.0) -> TreeLayout:
+    """
+    Compute a tidy layout of a rooted tree.
+
+    Args:
+        tree: TreeNode (anything with a children list, labeled by name) or
+              level sequence
+        max_depth: Collapse the subtrees of the nodes at this depth
+        min_size: Collapse subtrees with fewer nodes than this
+        distance: Minimum horizontal distance between nodes of one depth
+
+    Returns:
+        TreeLayout of the visible nodes
+    """
+    parent, labels, depth, hidden = _collapse(*_flatten(tree), max_depth, min_size)
+    return TreeLayout(parent, _buchheim(parent, distance), depth, labels, hidden)
+
+
+def layout_forest(trees: Sequence, max_depth: Optional[int] = None,
+                  min_size: Optional[int] = None, distance: float = 1.0) -> TreeLayout:
+    """
+    Lay out several trees side by side, e.g. all trees with n nodes.
+
+    The trees hang from a hidden common root, so they are packed as tightly
+    as the subtrees of one node. Depths in max_depth count from each tree's
+    own root.
+    """
+    parent = [-1]
+    labels = ['']
+    depth = [0]
+    for tree in trees:
+        sub_parent, sub_labels, sub_depth = _flatten(tree)
+        base = len(parent)
+        parent.extend(p + base if p >= 0 else 0 for p in sub_parent)
+        labels.extend(sub_labels)
+        depth.extend(d + 1 for d in sub_depth)
+    if max_depth is not None:
+        max_depth += 1
+    parent, labels, depth, hidden = _collapse(parent, labels, depth, max_depth, min_size)
+    x = _buchheim(parent, distance)
+    return TreeLayout(parent, x, depth, labels, hidden, hide_root=True)
+
+
+def write_svg(layout: TreeLayout, out: TextIO, spacing: float = 24.0,
+              level_height: float = 48.0, radius: float = 5.0,
+              show_labels: bool = False, chunk: int = 4096) -> None:
+    """
+    Stream a layout as SVG to a text file object.
+
+    Args:
+        layout: Result of layout_tree() or layout_forest()
+        out: Writable text file
+        spacing: Pixels per unit of horizontal distance
+        level_height: Pixels between depths
+        radius: Node radius in pixels
+        show_labels: Write node labels next to the nodes
+        chunk: Number of elements buffered between writes
+    """
+    margin = 2 * radius + (60 if show_labels else 0)
+    top = 1 if layout.hide_root else 0
+    width = layout.width * spacing + 2 * margin
+    height = (layout.height - top) * level_height + 2 * margin
+
+    def px(v):
+        return layout.x[v] * spacing + margin, (layout.y[v] - top) * level_height + margin
+
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" '
+              f'height="{height:.0f}" viewBox="0 0 {width:.1f} {height:.1f}">\n')
+    out.write('<g stroke="#888" stroke-width="1">\n')
+    buffer: List[str] = []
+    for v in range(1, len(layout)):
+        up = layout.parent[v]
+        if layout.hide_root and up == 0:
+            continue
+        x1, y1 = px(up)
+        x2, y2 = px(v)
+        buffer.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+        if len(buffer) >= chunk:
+            out.write(''.join(buffer))
+            buffer.clear()
+    out.write(''.join(buffer))
+    buffer.clear()
+    out.write('</g>\n<g fill="#4a7ab5">\n')
+    for v in range(top, len(layout)):
+        cx, cy = px(v)
+        hidden = layout.hidden[v]
+        if hidden:
+            # Collapsed subtree: a triangle below the node
+            buffer.append(f'<path d="M{cx:.1f},{cy:.1f} l{-radius:.1f},{2 * radius:.1f} '
+                          f'h{2 * radius:.1f} z" fill="#b5664a"><title>{hidden} hidden'
+                          f'</title></path>\n')
+        buffer.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{radius:.1f}"/>\n')
+        if show_labels and (layout.labels[v] or hidden):
+            text = escape(layout.labels[v]) + (f" (+{hidden})" if hidden else "")
+            buffer.append(f'<text x="{cx + radius + 2:.1f}" y="{cy + 4:.1f}" '
+                          f'font-size="10" fill="#333">{text}</text>\n')
+        if len(buffer) >= chunk:
+            out.write(''.join(buffer))
+            buffer.clear()
+    out.write(''.join(buffer))
+    out.write('</g>\n</svg>\n')
+
+
+def save_svg(layout: TreeLayout, path: str, **options) -> None:
+    """Write a layout as an SVG file (see write_svg for the options)."""
+    with open(path, 'w', encoding='utf-8') as out:
+        write_svg(layout, out, **options)
+
+
+def main():
+    """CLI: draw a vault's folder tree, a level sequence or all trees of a size."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description='Tidy tree layout rendered as SVG'
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--vault', help='Draw the folder tree of this vault')
+    source.add_argument('--levels', help="Draw one level sequence, e.g. '0 1 2 1'")
+    source.add_argument('--all', type=int, metavar='N',
+                        help='Draw every rooted tree with N nodes side by side')
+    parser.add_argument('-o', '--output', default='tree.svg',
+                        help='Output SVG file (default: tree.svg)')
+    parser.add_argument('--max-depth', type=int, help='Collapse subtrees below this depth')
+    parser.add_argument('--min-size', type=int, help='Collapse subtrees smaller than this')
+    parser.add_argument('--labels', action='store_true', help='Show node labels')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        if args.vault:
+            from obsidian_vault import MarkdownVault
+            from vault_tree_bijection import VaultTreeBijection
+            vault = MarkdownVault(args.vault)
+            vault.scan()
+            tree = VaultTreeBijection(vault).folder_structure_to_tree()
+            layout = layout_tree(tree, args.max_depth, args.min_size)
+        elif args.levels:
+            levels = [int(d) for d in args.levels.replace(',', ' ').split()]
+            layout = layout_tree(levels, args.max_depth, args.min_size)
+        else:
+            from rootrees.levelseq import generate_level_sequences
+            layout = layout_forest(list(generate_level_sequences(args.all)),
+                                   args.max_depth, args.min_size)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    save_svg(layout, args.output, show_labels=args.labels)
+    print(f"{len(layout)} nodes laid out in {elapsed:.3f}s -> {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
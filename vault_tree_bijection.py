@@ -18,7 +18,7 @@ link structure, similar to how Obsidian vaults work.
 import sys
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
-from obsidian_vault import MarkdownVault
+from obsidian_vault import MarkdownVault, add_scan_arguments, scan_from_args
 
 
 class TreeNode:
@@ -162,13 +162,19 @@ class VaultTreeBijection:
         self.link_graph = root
         return root
     
-    def compare_structures(self) -> Dict[str, any]:
+    def compare_structures(self, distance_mode: Optional[str] = None) -> Dict[str, any]:
         """
         Compare the folder tree and link graph structures.
         
+        Args:
+            distance_mode: 'auto', 'bounds' or None for 'bounds' on large
+                           trees (see tree_distance.tree_distance)
+        
         Returns:
             Dictionary with comparison metrics
         """
+        from tree_distance import tree_distance
+        
         if not self.folder_tree:
             self.folder_structure_to_tree()
         if not self.link_graph:
@@ -204,7 +210,8 @@ class VaultTreeBijection:
                 'depth': max_depth(self.link_graph),
                 'avg_branching': avg_branching(self.link_graph),
                 'parentheses': self.link_graph.to_parentheses()
-            }
+            },
+            'distance': tree_distance(self.folder_tree, self.link_graph, distance_mode)
         }
     
     def print_tree(self, node: TreeNode, prefix: str = "", is_last: bool = True):
@@ -327,6 +334,12 @@ def main():
         action='store_true',
         help='Compare folder and link structures'
     )
+    parser.add_argument(
+        '--distance-mode',
+        choices=['auto', 'bounds'],
+        help='Tree distance for --compare: bounded Zhang-Shasha or fast bounds '
+             '(default: bounds for large trees)'
+    )
     parser.add_argument(
         '--suggest-links',
         action='store_true',
@@ -337,13 +350,25 @@ def main():
         action='store_true',
         help='Suggest folder structure based on links'
     )
+    parser.add_argument(
+        '--svg',
+        metavar='FILE',
+        help='Draw the folder tree as SVG (tidy layout, for large vaults)'
+    )
+    parser.add_argument(
+        '--svg-max-depth',
+        type=int,
+        help='Collapse folders below this depth in the SVG'
+    )
+    add_scan_arguments(parser)
     
     args = parser.parse_args()
     
     # Create vault and bijection
-    print(f"🔍 Analyzing vault at: {args.path}\n")
+    print(f"🔍 Analyzing vault at: {args.path}")
     vault = MarkdownVault(args.path)
-    vault.scan()
+    scan_from_args(vault, args)
+    print()
     
     bijection = VaultTreeBijection(vault)
     
@@ -353,7 +378,8 @@ def main():
         args.show_link_tree,
         args.compare,
         args.suggest_links,
-        args.suggest_folders
+        args.suggest_folders,
+        args.svg
     ])
     
     if args.show_folder_tree or show_all:
@@ -370,7 +396,7 @@ def main():
     
     if args.compare or show_all:
         print("📊 Structure Comparison:")
-        comparison = bijection.compare_structures()
+        comparison = bijection.compare_structures(args.distance_mode)
         
         print("\nFolder Tree:")
         for key, value in comparison['folder_tree'].items():
@@ -382,6 +408,13 @@ def main():
             if key != 'parentheses':
                 print(f"  {key}: {value}")
         
+        distance = comparison['distance']
+        print("\nTree Distance:")
+        print(f"  edits: {distance['distance']} (lower bound {distance['lower_bound']})")
+        print(f"  similarity: {distance['similarity']:.3f}")
+        print(f"  nodes in identical subtrees: {distance['matched_nodes']}")
+        print(f"  mode: {distance['mode']}")
+        
         print(f"\nFolder tree (parentheses): {comparison['folder_tree']['parentheses']}")
         print(f"Link graph (parentheses): {comparison['link_graph']['parentheses']}")
         print()
@@ -407,6 +440,12 @@ def main():
                 if len(files) > 5:
                     print(f"    ... and {len(files) - 5} more")
             print()
+    
+    if args.svg:
+        from tree_layout import layout_tree, save_svg
+        layout = layout_tree(bijection.folder_structure_to_tree(), max_depth=args.svg_max_depth)
+        save_svg(layout, args.svg, show_labels=len(layout) <= 2000)
+        print(f"🖼  Folder tree ({len(layout)} nodes) written to {args.svg}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Pruning Directory Walker for Markdown Vaults
+
+Finds the markdown files of a vault with os.scandir instead of
+Path.rglob, so excluded and ignored directories are pruned before they are
+entered (a vault inside a monorepo never walks .git or node_modules):
+- Directory names in exclude_dirs are skipped without being opened
+- .gitignore and .obsidianignore files are honored in every directory,
+  with the usual pattern rules (see IgnoreRules)
+- Symlinked directories are followed, but every real directory is walked
+  only once, so symlink loops terminate
+- The os.DirEntry of every file is yielded, so its stat data (cached by
+  the entry) can be used without another system call
+
+The files of a directory come first, in name order, then its subdirectories
+depth first in name order, so scans are reproducible.
+"""
+
+import os
+import re
+import stat
+import sys
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
+
+
+IGNORE_FILES = ('.gitignore', '.obsidianignore')
+DEFAULT_EXCLUDE_DIRS = {'.git', '.github', 'node_modules', '__pycache__'}
+
+
+def _translate(pattern: str) -> str:
+    """Regular expression for a gitignore glob (without leading/trailing slashes)."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.*')
+            i += 3
+            continue
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+class IgnoreRules:
+    """
+    Patterns from one ignore file, relative to the directory holding it.
+
+    Supports the gitignore syntax: blank lines and # comments are skipped,
+    ! negates, a trailing / matches directories only, a pattern with a
+    slash elsewhere is anchored to the directory of the file, otherwise it
+    matches the name at any depth; *, ?, [...] and ** work as in git.
+    """
+
+    def __init__(self, base: str, lines: Sequence[str]):
+        self.base = base
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.strip('/') if dir_only else line
+            if not line:
+                continue
+            anchored = '/' in line
+            body = _translate(line.lstrip('/'))
+            regex = re.compile(body + '$' if anchored else '(?:.*/)?' + body + '$')
+            self.rules.append((regex, negate, dir_only))
+
+    @classmethod
+    def load(cls, directory: str, base: str, names: Sequence[str] = IGNORE_FILES) -> Optional['IgnoreRules']:
+        """Rules of the ignore files in a directory, or None if it has none."""
+        lines: List[str] = []
+        for name in names:
+            try:
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    lines.extend(f)
+            except (OSError, UnicodeDecodeError):
+                continue
+        rules = cls(base, lines)
+        return rules if rules.rules else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Decision of the last matching pattern for a vault-relative path.
+
+        Returns:
+            True (ignored), False (re-included by !) or None (no pattern matches)
+        """
+        if self.base:
+            if not path.startswith(self.base + '/'):
+                return None
+            path = path[len(self.base) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                result = not negate
+        return result
+
+
+def is_ignored(path: str, is_dir: bool, rules: Sequence[IgnoreRules]) -> bool:
+    """Whether the ignore files in effect (outermost first) exclude a path."""
+    ignored = False
+    for rule in rules:
+        decision = rule.match(path, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+def walk_vault(root, suffix: str = '.md', exclude_dirs: Optional[Set[str]] = None,
+               ignore_files: Sequence[str] = IGNORE_FILES) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Find the files of a vault, pruning excluded directories.
+
+    Args:
+        root: Vault root directory
+        suffix: File name suffix to keep
+        exclude_dirs: Directory names never entered (default: .git,
+                      .github, node_modules, __pycache__)
+        ignore_files: Names of ignore files to honor (empty to ignore none)
+
+    Yields:
+        (path relative to root with / separators, os.DirEntry); a
+        directory's files in name order, then its subdirectories
+    """
+    if exclude_dirs is None:
+        exclude_dirs = DEFAULT_EXCLUDE_DIRS
+    root = os.fspath(root)
+    try:
+        info = os.stat(root)
+    except OSError as e:
+        print(f"Warning: Could not read {root}: {e}")
+        return
+    seen = {(info.st_dev, info.st_ino)}
+    # (directory, its vault-relative path, ignore rules in effect)
+    stack = [(root, '', [])]
+    while stack:
+        directory, relative, rules = stack.pop()
+        if ignore_files:
+            local = IgnoreRules.load(directory, relative, ignore_files)
+            if local is not None:
+                rules = rules + [local]
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Warning: Could not read {directory}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            path = f"{relative}/{entry.name}" if relative else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in exclude_dirs or is_ignored(path, True, rules):
+                    continue
+                try:
+                    target = entry.stat()
+                except OSError:
+                    # Broken symlink
+                    continue
+                key = (target.st_dev, target.st_ino)
+                if key in seen:
+                    continue
+                seen.add(key)
+                subdirs.append((entry.path, path, rules))
+            elif entry.name.endswith(suffix) and not is_ignored(path, False, rules):
+                try:
+                    if not stat.S_ISREG(entry.stat().st_mode):
+                        continue
+                except OSError:
+                    continue
+                yield path, entry
+        # Depth first, in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def main():
+    """CLI: list the markdown files a vault scan would read."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='List the markdown files of a vault, honoring ignore files'
+    )
+    parser.add_argument(
+        'path',
+        nargs='?',
+        default='.',
+        help='Root path of the vault'
+    )
+    parser.add_argument(
+        '--no-ignore',
+        action='store_true',
+        help='Do not read .gitignore/.obsidianignore files'
+    )
+
+    args = parser.parse_args()
+
+    total = count = 0
+    for path, entry in walk_vault(args.path, ignore_files=() if args.no_ignore else IGNORE_FILES):
+        print(path)
+        count += 1
+        total += entry.stat().st_size
+    print(f"{count} files, {total} bytes", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()